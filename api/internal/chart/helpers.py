@@ -2,8 +2,9 @@ from datetime import datetime
 
 from cerberus import Validator
 from dateutil import parser
+from django.conf import settings
 from django.db import connection
-from django.db.models import Case, F, FloatField, Value, When
+from django.db.models import Case, F, FloatField, Min, Value, When
 from django.db.models.fields.json import KeyTextTransform
 from django.db.models.functions import Cast, Trunc
 from django.utils import timezone
@@ -11,7 +12,12 @@ from django.utils.functional import cached_property
 from rest_framework.exceptions import ValidationError
 
 from codecov_auth.models import Owner
-from core.models import Commit, Repository
+from core.models import (
+    Commit,
+    CommitChartSnapshot,
+    CommitChartSnapshotRebuild,
+    Repository,
+)
 
 
 class ChartParamValidator(Validator):
@@ -197,9 +203,9 @@ class ChartQueryRunner:
         return ""
 
     @cached_property
-    def repoids(self):
+    def repository_ids(self):
         """
-        Returns a string of repoids of the repositories being queried.
+        Returns the repoids of the repositories being queried.
         """
         organization = Owner.objects.get(
             service=self.request_params["service"],
@@ -215,13 +221,29 @@ class ChartQueryRunner:
         if self.request_params.get("repositories", []):
             repos = repos.filter(name__in=self.request_params.get("repositories", []))
 
-        if repos:
+        return list(repos.values_list("repoid", flat=True))
+
+    @cached_property
+    def repoids(self):
+        """
+        Returns a string of repoids of the repositories being queried.
+        """
+        if self.repository_ids:
             # Get repoids into a format easily plugged into raw SQL
-            return (
-                "("
-                + ",".join(map(str, list(repos.values_list("repoid", flat=True))))
-                + ")"
-            )
+            return "(" + ",".join(map(str, self.repository_ids)) + ")"
+
+    @cached_property
+    def use_snapshots(self):
+        """
+        Whether the chart can be computed from the `CommitChartSnapshot`
+        buckets (i.e. none of the repos' snapshots are waiting for a rebuild).
+        """
+        return (
+            settings.CHART_SNAPSHOTS_ENABLED
+            and not CommitChartSnapshotRebuild.objects.filter(
+                repository_id__in=self.repository_ids
+            ).exists()
+        )
 
     @cached_property
     def first_complete_commit_date(self):
@@ -229,6 +251,12 @@ class ChartQueryRunner:
         Date of first commit made to any repo in 'self.repoids'. Used as initial
         date for date_spine query.
         """
+        if self.use_snapshots:
+            return CommitChartSnapshot.objects.filter(
+                repository_id__in=self.repository_ids,
+                grouping_unit=self.grouping_unit,
+            ).aggregate(first_bucket=Min("bucket"))["first_bucket"]
+
         with connection.cursor() as cursor:
             cursor.execute(
                 f"""
@@ -290,6 +318,82 @@ class ChartQueryRunner:
         if not self.first_complete_commit_date:
             return []
 
+        if self.use_snapshots:
+            return self.run_snapshots_query()
+        return self.run_commits_query()
+
+    def run_snapshots_query(self):
+        """
+        Computes the chart from the precomputed `CommitChartSnapshot` buckets.
+        The totals of each repo's snapshots are turned into changes from its
+        previous snapshot so that summing the changes of all the repos up to
+        a date gives the totals carried forward to that date.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                WITH date_series AS (
+                    SELECT
+                        t::date AS "date"
+                    FROM generate_series(
+                        timestamp '{self.first_complete_commit_date}',
+                        timestamp '{self.end_date}',
+                        '{self.interval}'
+                    ) t
+                ), snapshot_changes AS (
+                    SELECT
+                        s.bucket,
+                        s.hits - COALESCE(LAG(s.hits) OVER w, 0) AS hits,
+                        s.misses - COALESCE(LAG(s.misses) OVER w, 0) AS misses,
+                        s.partials - COALESCE(LAG(s.partials) OVER w, 0) AS partials,
+                        s.lines - COALESCE(LAG(s.lines) OVER w, 0) AS lines
+                    FROM commit_chart_snapshots s
+                    WHERE s.repoid IN {self.repoids}
+                        AND s.grouping_unit = '{self.grouping_unit}'
+                        AND s.bucket <= '{self.end_date}'
+                        AND s.lines IS NOT NULL
+                    WINDOW w AS (PARTITION BY s.repoid ORDER BY s.bucket)
+                ), bucket_changes AS (
+                    SELECT
+                        bucket,
+                        SUM(hits) AS hits,
+                        SUM(misses) AS misses,
+                        SUM(partials) AS partials,
+                        SUM(lines) AS lines
+                    FROM snapshot_changes
+                    GROUP BY bucket
+                ), summed_totals AS (
+                    SELECT
+                        ds.date::timestamp at time zone 'UTC' AS date,
+                        SUM(COALESCE(bc.hits, 0)) OVER w AS total_hits,
+                        SUM(COALESCE(bc.misses, 0)) OVER w AS total_misses,
+                        SUM(COALESCE(bc.partials, 0)) OVER w AS total_partials,
+                        SUM(COALESCE(bc.lines, 0)) OVER w AS total_lines
+                    FROM date_series ds
+                    LEFT JOIN bucket_changes bc ON bc.bucket = ds.date
+                    WINDOW w AS (ORDER BY ds.date)
+                )
+
+                SELECT
+                    date,
+                    total_hits,
+                    total_misses,
+                    total_partials,
+                    total_lines,
+                    ROUND((total_hits + total_partials) / NULLIF(total_lines, 0) * 100, 2) AS coverage
+                FROM summed_totals
+                WHERE date >= DATE_TRUNC('{self.grouping_unit}', timestamp '{self.start_date}')
+                ORDER BY date {self.ordering};
+                """
+            )
+
+            return self._dictfetchall(cursor)
+
+    def run_commits_query(self):
+        """
+        Computes the chart from the commits themselves.  This is much slower
+        than `run_snapshots_query` and is kept to verify the snapshots.
+        """
         with connection.cursor() as cursor:
             cursor.execute(
                 f"""
@@ -391,7 +495,7 @@ class ChartQueryRunner:
                         SUM(misses) AS total_misses,
                         SUM(partials) AS total_partials,
                         SUM(lines) AS total_lines,
-                        ROUND((SUM(hits) + SUM(partials)) / SUM(lines) * 100, 2) AS coverage
+                        ROUND((SUM(hits) + SUM(partials)) / NULLIF(SUM(lines), 0) * 100, 2) AS coverage
                     FROM
                         parsed_totals
                     GROUP BY spine_date
@@ -7,7 +7,7 @@ from unittest.mock import patch
 import pytest
 from dateutil.relativedelta import relativedelta
 from ddf import G
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils import timezone
 from factory.faker import faker
 from pytz import UTC
@@ -22,7 +22,7 @@ from api.internal.chart.helpers import (
     validate_params,
 )
 from codecov.tests.base_test import InternalAPITest
-from core.models import Commit
+from core.models import Commit, CommitChartSnapshotRebuild
 from core.tests.factories import OwnerFactory, RepositoryFactory
 from utils.test_utils import Client
 
@@ -646,6 +646,122 @@ class TestChartQueryRunnerQuery(TestCase):
         assert len(results) == 2
         assert results[0]["date"] > results[1]["date"]
 
+    def test_snapshots_query_matches_commits_query(self):
+        now = timezone.now()
+        for repo, days_ago, totals, state in [
+            (self.repo1, 40, {"h": 50, "n": 100, "p": 5, "m": 45}, "complete"),
+            (self.repo1, 12, {"h": 60, "n": 100, "p": 5, "m": 35}, "complete"),
+            (self.repo1, 12, {"h": 1, "n": 100, "p": 5, "m": 94}, "pending"),
+            (self.repo2, 9, {"h": 10, "n": 25, "p": 6, "m": 9}, "complete"),
+            (self.repo2, 3, None, "complete"),
+            (self.repo4, 20, {"h": 30, "n": 40, "p": 0, "m": 10}, "complete"),
+        ]:
+            G(
+                model=Commit,
+                repository=repo,
+                totals=totals,
+                branch=repo.branch,
+                state=state,
+                timestamp=now - timedelta(days=days_ago, hours=randint(0, 5)),
+            )
+        # not on the default branch
+        G(
+            model=Commit,
+            repository=self.repo4,
+            totals={"h": 1, "n": 40, "p": 0, "m": 39},
+            branch="feature",
+            state="complete",
+            timestamp=now - timedelta(days=2),
+        )
+
+        for grouping_unit in ["day", "week", "month", "quarter", "year"]:
+            for ordering in ["increasing", "decreasing"]:
+                request_params = {
+                    "owner_username": self.org.username,
+                    "service": self.org.service,
+                    "start_date": str(now - timedelta(days=30)),
+                    "end_date": str(now),
+                    "grouping_unit": grouping_unit,
+                    "coverage_timestamp_ordering": ordering,
+                }
+                commits_query_runner = ChartQueryRunner(
+                    user=self.user, request_params=request_params
+                )
+                expected = commits_query_runner.run_query()
+                with override_settings(CHART_SNAPSHOTS_ENABLED=True):
+                    query_runner = ChartQueryRunner(
+                        user=self.user, request_params=request_params
+                    )
+                    assert (
+                        query_runner.first_complete_commit_date
+                        == commits_query_runner.first_complete_commit_date
+                    )
+                    assert query_runner.run_query() == expected
+
+    def test_snapshots_query_matches_commits_query_without_start_date(self):
+        now = timezone.now()
+        for repo, days_ago, totals in [
+            # the first complete commit has no totals
+            (self.repo1, 400, None),
+            (self.repo1, 40, {"h": 50, "n": 100, "p": 5, "m": 45}),
+            (self.repo2, 9, {"h": 10, "n": 25, "p": 6, "m": 9}),
+        ]:
+            G(
+                model=Commit,
+                repository=repo,
+                totals=totals,
+                branch=repo.branch,
+                state="complete",
+                timestamp=now - timedelta(days=days_ago),
+            )
+
+        for grouping_unit in ["day", "week", "month", "quarter", "year"]:
+            request_params = {
+                "owner_username": self.org.username,
+                "service": self.org.service,
+                "grouping_unit": grouping_unit,
+            }
+            commits_query_runner = ChartQueryRunner(
+                user=self.user, request_params=request_params
+            )
+            if grouping_unit == "day":
+                assert commits_query_runner.first_complete_commit_date == (
+                    (now - timedelta(days=400)).date()
+                )
+            expected = commits_query_runner.run_query()
+            with override_settings(CHART_SNAPSHOTS_ENABLED=True):
+                query_runner = ChartQueryRunner(
+                    user=self.user, request_params=request_params
+                )
+                assert (
+                    query_runner.first_complete_commit_date
+                    == commits_query_runner.first_complete_commit_date
+                )
+                assert query_runner.run_query() == expected
+            if grouping_unit != "year":
+                # only the commit without totals is in the first bucket
+                assert expected[0]["coverage"] is None
+
+    @override_settings(CHART_SNAPSHOTS_ENABLED=True)
+    def test_snapshots_pending_rebuild(self):
+        request_params = {
+            "owner_username": self.org.username,
+            "service": self.org.service,
+            "grouping_unit": "day",
+        }
+        assert ChartQueryRunner(
+            user=self.user, request_params=request_params
+        ).use_snapshots
+
+        CommitChartSnapshotRebuild.objects.create(
+            repository_id=self.repo1.pk, requested_at=timezone.now()
+        )
+        query_runner = ChartQueryRunner(user=self.user, request_params=request_params)
+        assert not query_runner.use_snapshots
+        with patch.object(ChartQueryRunner, "run_snapshots_query") as snapshots_query:
+            query_runner.run_query()
+            snapshots_query.assert_not_called()
+
     def test_query_doesnt_crash_if_no_commits(self):
         with self.subTest("no repos case"):
             self.org.repository_set.all().delete()
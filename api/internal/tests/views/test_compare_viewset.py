@@ -1,4 +1,6 @@
+import json
 from unittest.mock import PropertyMock, patch
+from urllib.parse import parse_qs, urlparse
 
 from rest_framework import status
 from rest_framework.reverse import reverse
@@ -225,6 +227,87 @@ class TestCompareViewSetRetrieve(APITestCase):
         assert response.data["files"] == self.expected_files
         assert response.data["has_unmerged_base_commits"] is True
 
+    def test_paginates_files_by_name(
+        self, adapter_mock, base_report_mock, head_report_mock
+    ):
+        adapter_mock.return_value = self.mocked_compare_adapter
+        base_report_mock.return_value = self.base_report
+        another_file = ReportFile(
+            name="another.py", totals=[1, 1, 0, 0, 100, 0, 0, 0, 1, 0, 0, 0]
+        )
+        another_file._lines = [[1, "", [[1, 1, 0, 0, 0]], 0, 0]]
+        self.head_report.mocked_files["another.py"] = another_file
+        head_report_mock.return_value = self.head_report
+
+        response = self._get_comparison(
+            query_params={
+                "base": self.base.commitid,
+                "head": self.head.commitid,
+                "page_size": 1,
+            }
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert [file["name"]["head"] for file in response.data["files"]] == [
+            "another.py"
+        ]
+        assert response.data["next"] is not None
+
+        cursor = parse_qs(urlparse(response.data["next"]).query)["cursor"][0]
+        response = self._get_comparison(
+            query_params={
+                "base": self.base.commitid,
+                "head": self.head.commitid,
+                "page_size": 1,
+                "cursor": cursor,
+            }
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["files"] == self.expected_files
+        assert response.data["next"] is None
+
+    def test_invalid_cursor_returns_404(
+        self, adapter_mock, base_report_mock, head_report_mock
+    ):
+        adapter_mock.return_value = self.mocked_compare_adapter
+        base_report_mock.return_value = self.base_report
+        head_report_mock.return_value = self.head_report
+
+        response = self._get_comparison(
+            query_params={
+                "base": self.base.commitid,
+                "head": self.head.commitid,
+                "cursor": "!!!",
+            }
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_streams_files_as_ndjson(
+        self, adapter_mock, base_report_mock, head_report_mock
+    ):
+        adapter_mock.return_value = self.mocked_compare_adapter
+        base_report_mock.return_value = self.base_report
+        head_report_mock.return_value = self.head_report
+
+        response = self._get_comparison(
+            query_params={
+                "base": self.base.commitid,
+                "head": self.head.commitid,
+                "format": "ndjson",
+            }
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "application/x-ndjson"
+
+        lines = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).splitlines()
+        ]
+        assert len(lines) == 2
+        assert lines[0]["head_commit"] == self.head.commitid
+        assert "files" not in lines[0]
+        assert lines[1]["name"] == {"base": self.file_name, "head": self.file_name}
+        assert len(lines[1]["lines"]) == len(self.expected_files[0]["lines"])
+
     def test_returns_404_if_base_or_head_references_not_found(
         self, adapter_mock, base_report_mock, head_report_mock
     ):
@@ -268,6 +351,34 @@ class TestCompareViewSetRetrieve(APITestCase):
         assert response.status_code == status.HTTP_200_OK
         assert response.data["files"] == self.expected_files
 
+    @patch("redis.Redis.get", lambda self, key: None)
+    @patch("services.comparison.PullRequestComparison._set_files_with_changes_in_cache")
+    def test_pullid_caches_files_with_changes(
+        self,
+        set_files_with_changes_in_cache,
+        adapter_mock,
+        base_report_mock,
+        head_report_mock,
+    ):
+        adapter_mock.return_value = self.mocked_compare_adapter
+        base_report_mock.return_value = self.base_report
+        head_report_mock.return_value = self.head_report
+
+        response = self._get_comparison(
+            query_params={
+                "pullid": PullFactory(
+                    base=self.base.commitid,
+                    head=self.head.commitid,
+                    compared_to=self.base.commitid,
+                    pullid=2,
+                    repository=self.repo,
+                ).pullid
+            }
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        set_files_with_changes_in_cache.assert_called_once()
+
     def test_pullid_with_nonexistent_base_returns_404(
         self, adapter_mock, base_report_mock, head_report_mock
     ):
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Iterable
 
 from rest_framework import serializers
 
@@ -7,20 +7,20 @@ from api.shared.commit.serializers import ReportTotalsSerializer
 from api.shared.compare.serializers import (
     ComparisonSerializer as BaseComparisonSerializer,
 )
-from api.shared.compare.serializers import FileComparisonSerializer
-from services.comparison import Comparison
+from services.comparison import Comparison, FileComparison
 
 
 class ComparisonSerializer(BaseComparisonSerializer):
     commit_uploads = CommitSerializer(many=True, source="upload_commits")
 
-    def get_files(self, comparison: Comparison) -> List[dict]:
-        data = []
-        for filename in comparison.head_report.files:
-            file = comparison.get_file_comparison(filename, bypass_max_diff=True)
-            if self._should_include_file(file):
-                data.append(FileComparisonSerializer(file).data)
-        return data
+    def _get_file_comparisons(self, comparison: Comparison) -> Iterable[FileComparison]:
+        for file_name in comparison.head_report.files:
+            yield self._get_file_comparison(comparison, file_name)
+
+    def _get_file_comparison(
+        self, comparison: Comparison, file_name: str
+    ) -> FileComparison:
+        return comparison.get_file_comparison(file_name, bypass_max_diff=True)
 
 
 class ComponentComparisonSerializer(serializers.Serializer):
@@ -1,5 +1,7 @@
 from datetime import datetime
 
+from django.utils import timezone
+from django_filters.utils import translate_validation
 from drf_spectacular.utils import extend_schema
 from rest_framework import mixins, viewsets
 from rest_framework.exceptions import APIException
@@ -50,16 +52,32 @@ class CoverageViewSet(
     queryset = MeasurementSummary1Day.objects.none()
 
     def get_queryset(self):
+        interval = self.get_measurement_interval()
+        filters = self.get_filters()
         return repository_coverage_measurements_with_fallback(
             self.repo,
-            self.get_measurement_interval(),
-            start_date=self.request.query_params.get(
-                "start_date", datetime(2000, 1, 1)
-            ),
-            end_date=self.request.query_params.get("end_date", datetime.now()),
-            branch=self.request.query_params.get("branch"),
+            interval,
+            start_date=filters.get("start_date")
+            or datetime(2000, 1, 1, tzinfo=timezone.utc),
+            end_date=filters.get("end_date") or timezone.now(),
+            branch=filters.get("branch") or None,
         )
 
+    def get_filters(self) -> dict:
+        filterset = self.filterset_class(
+            self.request.query_params, queryset=self.queryset, request=self.request
+        )
+        if not filterset.is_valid():
+            raise translate_validation(filterset.errors)
+        return filterset.form.cleaned_data
+
+    def filter_queryset(self, queryset):
+        if isinstance(queryset, list):
+            # measurements served from the cache (the filters are all applied by
+            # the timeseries helpers in `get_queryset`)
+            return queryset
+        return super().filter_queryset(queryset)
+
     def get_measurement_interval(self) -> Interval:
         interval_name = self.request.query_params.get("interval")
         if interval_name not in intervals:
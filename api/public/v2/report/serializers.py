@@ -4,10 +4,13 @@ from api.shared.commit.serializers import ReportFileSerializer, ReportSerializer
 
 
 class CoverageReportSerializer(ReportSerializer):
-    commit_file_url = serializers.CharField(
+    commit_file_url = serializers.SerializerMethodField(
         label="Codecov url to see file coverage on commit. Can be unreliable with partial path names."
     )
 
+    def get_commit_file_url(self, obj):
+        return self.context["commit_file_url"]
+
 
 class FileReportSerializer(ReportFileSerializer):
     commit_sha = serializers.SerializerMethodField(
@@ -131,8 +131,19 @@ class BaseReportViewSet(
 
         return report
 
+    def get_serializer_context(self, *args, **kwargs):
+        context = super().get_serializer_context(*args, **kwargs)
+        if getattr(self, "commit", None) is not None:
+            # passed in the context since the report may be the (shared) cached
+            # report of the commit
+            context["commit_file_url"] = self._commit_file_url(
+                self.commit, self.request.query_params.get("path", None)
+            )
+        return context
+
     def get_object(self):
         commit = self.get_commit()
+        self.commit = commit
         report = commit.full_report
 
         if report is None:
@@ -147,9 +158,6 @@ class BaseReportViewSet(
             component_id=self.request.query_params.get("component_id", None),
         )
 
-        # Add commit url to report object
-        report.commit_file_url = self._commit_file_url(commit, path)
-
         return report
 
     def retrieve(self, request, *args, **kwargs):
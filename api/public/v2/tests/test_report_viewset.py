@@ -471,6 +471,23 @@ class ReportViewSetTestCase(TestCase):
 
         build_report_from_commit.assert_called_once_with(self.commit1)
 
+    @patch("services.report.build_report_from_commit")
+    def test_report_does_not_modify_the_report(
+        self, build_report_from_commit, get_repo_permissions
+    ):
+        get_repo_permissions.return_value = (True, True)
+        report = sample_report()
+        build_report_from_commit.return_value = report
+
+        res = self._request_report()
+        assert res.status_code == 200
+        assert (
+            res.json()["commit_file_url"]
+            == f"{settings.CODECOV_DASHBOARD_URL}/{self.service}/{self.username}/{self.repo_name}/commit/{self.commit1.commitid}/tree/"
+        )
+        # the (possibly cached) report of the commit is shared by requests
+        assert not hasattr(report, "commit_file_url")
+
     @patch("services.report.build_report_from_commit")
     def test_report_invalid_path(self, build_report_from_commit, get_repo_permissions):
         get_repo_permissions.return_value = (True, True)
@@ -1,9 +1,16 @@
-from rest_framework import mixins, viewsets
+import json
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework import mixins, renderers, viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import NotFound, PermissionDenied
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
 
 from api.shared.mixins import CompareSlugMixin
+from api.shared.pagination import FileNameCursorPagination
 from api.shared.permissions import RepositoryArtifactPermissions
 from services.comparison import (
     Comparison,
@@ -16,8 +23,24 @@ from services.decorators import torngit_safe
 from .serializers import FileComparisonSerializer, FlagComparisonSerializer
 
 
+class NDJSONRenderer(renderers.BaseRenderer):
+    """
+    Newline delimited JSON.  Comparisons are streamed by the view directly so
+    this only renders non-streamed responses (i.e. errors) as a single line.
+    """
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def render(self, data, media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return (json.dumps(data, cls=JSONEncoder) + "\n").encode(self.charset)
+
+
 class CompareViewSetMixin(CompareSlugMixin, viewsets.GenericViewSet):
     permission_classes = [RepositoryArtifactPermissions]
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer]
 
     def get_object(self) -> Comparison:
         compare_data = self.get_compare_data()
@@ -45,6 +68,8 @@ class CompareViewSetMixin(CompareSlugMixin, viewsets.GenericViewSet):
     @torngit_safe
     def retrieve(self, request, *args, **kwargs):
         comparison = self.get_object()
+        if settings.COMPARISON_PREFETCH_ENABLED:
+            comparison.prefetch()
 
         # Some checks here for pseudo-comparisons. Basically, when pseudo-comparing,
         # we sometimes might need to tweak the base report if the user allows us to
@@ -64,13 +89,58 @@ class CompareViewSetMixin(CompareSlugMixin, viewsets.GenericViewSet):
                     },
                     status=400,
                 )
-        serializer = self.get_serializer(comparison)
-
         try:
-            return Response(serializer.data)
+            if self._wants_ndjson(request):
+                return self._stream_comparison(comparison)
+            return self._comparison_response(comparison)
         except MissingComparisonReport:
             raise NotFound("Raw report not found for base or head reference.")
 
+    def _wants_ndjson(self, request) -> bool:
+        return isinstance(request.accepted_renderer, NDJSONRenderer)
+
+    def _paginate_file_names(self, comparison: Comparison, paginator):
+        if not paginator.is_requested(self.request):
+            return None
+        return paginator.paginate_file_names(comparison.head_report.files, self.request)
+
+    def _comparison_response(self, comparison: Comparison) -> Response:
+        paginator = FileNameCursorPagination()
+        context = self.get_serializer_context()
+        context["file_names"] = self._paginate_file_names(comparison, paginator)
+
+        data = self.get_serializer(comparison, context=context).data
+        if context["file_names"] is not None:
+            data["next"] = paginator.get_next_link()
+        return Response(data)
+
+    def _stream_comparison(self, comparison: Comparison) -> StreamingHttpResponse:
+        """
+        Streams the comparison as newline delimited JSON: the first line is the
+        comparison without its files followed by one line per file comparison.
+        Each file comparison is serialized as it's computed so that the full list
+        is never held in memory.
+        """
+        paginator = FileNameCursorPagination()
+        file_names = self._paginate_file_names(comparison, paginator)
+
+        context = self.get_serializer_context()
+        context["file_names"] = []
+        serializer = self.get_serializer(comparison, context=context)
+
+        # computed before streaming starts so that errors still produce a response
+        header = dict(serializer.data)
+        del header["files"]
+        if file_names is not None:
+            header["next"] = paginator.get_next_link()
+
+        def lines():
+            yield json.dumps(header, cls=JSONEncoder) + "\n"
+            for data in serializer.iter_files(comparison, file_names):
+                yield json.dumps(data, cls=JSONEncoder) + "\n"
+
+        return StreamingHttpResponse(lines(), content_type="application/x-ndjson")
+
     @action(
         detail=False,
         methods=["get"],
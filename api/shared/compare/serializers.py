@@ -1,4 +1,4 @@
-from typing import List
+from typing import Iterable, Iterator, List, Optional
 
 from rest_framework import serializers
 
@@ -54,11 +54,35 @@ class ComparisonSerializer(serializers.Serializer):
         return {"git_commits": comparison.git_commits}
 
     def get_files(self, comparison: Comparison) -> List[dict]:
-        return [
-            FileComparisonSerializer(file).data
-            for file in comparison.files
-            if self._should_include_file(file)
-        ]
+        return list(self.iter_files(comparison, self.context.get("file_names")))
+
+    def iter_files(
+        self, comparison: Comparison, file_names: Optional[Iterable[str]] = None
+    ) -> Iterator[dict]:
+        """
+        Serializes the file comparisons one at a time, for all the files in the
+        head report unless `file_names` is given
+        """
+        if file_names is None:
+            files = self._get_file_comparisons(comparison)
+        else:
+            files = (
+                self._get_file_comparison(comparison, file_name)
+                for file_name in file_names
+            )
+        for file in files:
+            if self._should_include_file(file):
+                yield FileComparisonSerializer(file).data
+
+    def _get_file_comparisons(self, comparison: Comparison) -> Iterable[FileComparison]:
+        # `PullRequestComparison.files` caches the files with changes once
+        # they've all been compared
+        return comparison.files
+
+    def _get_file_comparison(
+        self, comparison: Comparison, file_name: str
+    ) -> FileComparison:
+        return comparison.get_file_comparison(file_name)
 
     def _should_include_file(self, file: FileComparison):
         if "has_diff" in self.context:
@@ -1,4 +1,10 @@
+import bisect
+from base64 import b64decode, b64encode
+from typing import Iterable, List, Optional
+
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.utils.urls import replace_query_param
 
 
 class CodecovCursorPagination(CursorPagination):
@@ -35,3 +41,73 @@ class PaginationMixin:
                 else:
                     self._paginator = self.pagination_class()
         return self._paginator
+
+
+class FileNameCursorPagination:
+    """
+    Cursor based pagination over a list of file names.  Files are ordered by name
+    and the cursor encodes the last file name of the previous page.
+
+    Pagination only applies when a `page_size` or `cursor` query string parameter
+    is specified.
+    """
+
+    page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+    page_size = 100
+    max_page_size = 1000
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self):
+        self.next_cursor = None
+
+    def is_requested(self, request) -> bool:
+        return (
+            self.page_size_query_param in request.query_params
+            or self.cursor_query_param in request.query_params
+        )
+
+    def paginate_file_names(self, file_names: Iterable[str], request) -> List[str]:
+        self.request = request
+        file_names = sorted(file_names)
+
+        start = 0
+        after = self.decode_cursor(request)
+        if after is not None:
+            start = bisect.bisect_right(file_names, after)
+
+        page = file_names[start : start + self.get_page_size(request)]
+        if page and start + len(page) < len(file_names):
+            self.next_cursor = page[-1]
+        return page
+
+    def get_page_size(self, request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def decode_cursor(self, request) -> Optional[str]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            return b64decode(
+                encoded.encode("ascii"), altchars=b"-_", validate=True
+            ).decode("utf-8")
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, file_name: str) -> str:
+        return b64encode(file_name.encode("utf-8"), altchars=b"-_").decode("ascii")
+
+    def get_next_link(self) -> Optional[str]:
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.next_cursor)
+        )
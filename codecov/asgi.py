@@ -0,0 +1,28 @@
+"""
+ASGI config for codecov project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+Async views (i.e. the GraphQL API) run directly on the event loop while sync
+views are run in a thread by Django.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+from utils.config import get_settings_module
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", get_settings_module())
+if (
+    os.getenv("OPENTELEMETRY_ENDPOINT")
+    and os.getenv("OPENTELEMETRY_TOKEN")
+    and os.getenv("OPENTELEMETRY_CODECOV_RATE")
+):
+    from open_telemetry import instrument
+
+    instrument()
+
+application = get_asgi_application()
@@ -1,9 +1,15 @@
+import asyncio
+import contextvars
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 
-from asgiref.sync import SyncToAsync
+from asgiref.sync import AsyncToSync, SyncToAsync
 from django.conf import settings
-from django.db import close_old_connections
+from django.db import close_old_connections, connections
+from django.db.backends.signals import connection_created
 from django.db.models import Field, Lookup
+from shared.metrics import metrics
 
 log = logging.getLogger(__name__)
 
@@ -71,11 +77,86 @@ class IsNot(Lookup):
         return "%s is not %s" % (lhs, rhs), params
 
 
+_request_scope: "contextvars.ContextVar[Optional[RequestConnectionScope]]" = (
+    contextvars.ContextVar("request_connection_scope", default=None)
+)
+
+
+class RequestConnectionScope:
+    """
+    Async context manager wrapping the handling of a request that counts the
+    database connections opened while it's active.
+
+    With connection affinity, all the `sync_to_async` calls made within the scope
+    run on a single thread (a dedicated one unless there's already a sync request
+    thread, i.e. when served over WSGI) and reuse its database connection instead
+    of closing it after every call.  The connection is closed when the scope exits.
+    """
+
+    def __init__(self, name: str, affinity: Optional[bool] = None):
+        self.name = name
+        self.affinity = (
+            settings.DATABASE_CONNECTION_AFFINITY if affinity is None else affinity
+        )
+        self.connections = 0
+        self.executor = None
+        self._token = None
+
+    async def __aenter__(self):
+        if self.affinity and not hasattr(AsyncToSync.executors, "current"):
+            self.executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="request-db"
+            )
+        self._token = _request_scope.set(self)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        _request_scope.reset(self._token)
+        try:
+            if self.executor is not None:
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(self.executor, connections.close_all)
+            elif self.affinity:
+                await SyncToAsync(connections.close_all)()
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown(wait=False)
+
+        mode = "affinity" if self.affinity else "default"
+        metrics.incr(f"{self.name}.database.{mode}.requests")
+        metrics.incr(f"{self.name}.database.{mode}.connections", self.connections)
+
+
+def _count_connection(sender, connection, **kwargs):
+    scope = _request_scope.get()
+    if scope is not None:
+        scope.connections += 1
+
+
+connection_created.connect(_count_connection)
+
+
 class DatabaseSyncToAsync(SyncToAsync):
     """
     SyncToAsync version that cleans up old database connections.
+
+    Within a `RequestConnectionScope` with connection affinity the connection is
+    kept open for the duration of the scope instead.
     """
 
+    async def __call__(self, *args, **kwargs):
+        scope = _request_scope.get()
+        if scope is None or not scope.affinity:
+            return await super().__call__(*args, **kwargs)
+
+        if scope.executor is None or hasattr(AsyncToSync.executors, "current"):
+            # run in the request's sync thread (or, when nested, the thread that's
+            # blocked waiting on us)
+            return await SyncToAsync(self.func)(*args, **kwargs)
+        return await SyncToAsync(
+            self.func, thread_sensitive=False, executor=scope.executor
+        )(*args, **kwargs)
+
     def thread_handler(self, loop, *args, **kwargs):
         close_old_connections()
         try:
@@ -80,6 +80,8 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "codecov.wsgi.application"
+# used when running with SERVER_MODE=asgi (see prod.sh)
+ASGI_APPLICATION = "codecov.asgi.application"
 
 # Database
 # https://docs.djangoproject.com/en/2.1/ref/settings/#databases
@@ -132,6 +134,32 @@ TIMESERIES_ENABLED = get_config("setup", "timeseries", "enabled", default=False)
 TIMESERIES_REAL_TIME_AGGREGATES = get_config(
     "setup", "timeseries", "real_time_aggregates", default=False
 )
+# chart owners from the owner-level measurements (written by the worker for the
+# commits on the default branches) instead of the measurements of each repo
+TIMESERIES_OWNER_MEASUREMENTS_ENABLED = get_config(
+    "setup", "timeseries", "owner_measurements", "enabled", default=False
+)
+# read the coverage timeseries fallback from the daily rollup of the commits'
+# coverage (run `manage.py backfill_commit_coverage` before enabling it).  The
+# rollup is kept up to date by a trigger on `commits` whether this is set or not
+COMMIT_COVERAGE_ROLLUP_ENABLED = get_config(
+    "setup", "commit_coverage_rollup", "enabled", default=False
+)
+# compute the organization analytics chart from the commit chart snapshots (run
+# `manage.py backfill_chart_snapshots` before enabling it)
+CHART_SNAPSHOTS_ENABLED = get_config(
+    "setup", "chart_snapshots", "enabled", default=False
+)
+# Redis cache of the closed time bins of repository coverage measurements
+TIMESERIES_MEASUREMENTS_CACHE_ENABLED = get_config(
+    "setup", "timeseries", "measurements_cache", "enabled", default=False
+)
+# closed bins only change when they're backfilled again
+TIMESERIES_MEASUREMENTS_CACHE_TTL = int(
+    get_config(
+        "setup", "timeseries", "measurements_cache", "ttl", default=7 * 24 * 60 * 60
+    )
+)
 
 timeseries_database_url = get_config("services", "timeseries_database_url")
 if timeseries_database_url:
@@ -192,6 +220,12 @@ else:
 # https://docs.djangoproject.com/en/3.1/ref/settings/#conn-max-age
 CONN_MAX_AGE = int(get_config("services", "database", "conn_max_age", default=0))
 
+# keep a single database connection for all the `sync_to_async` calls made while
+# handling a GraphQL request (see `codecov.db.RequestConnectionScope`)
+DATABASE_CONNECTION_AFFINITY = get_config(
+    "services", "database", "connection_affinity", default=False
+)
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -447,6 +481,53 @@ CORS_ALLOWED_ORIGINS = []
 
 GRAPHQL_PLAYGROUND = False
 
+# number of parsed and validated GraphQL documents kept in memory
+GRAPHQL_DOCUMENT_CACHE_SIZE = int(
+    get_config("setup", "graphql", "document_cache_size", default=500)
+)
+# automatic persisted queries (the client can send a query's hash instead of the query)
+GRAPHQL_PERSISTED_QUERIES_ENABLED = get_config(
+    "setup", "graphql", "persisted_queries", "enabled", default=False
+)
+GRAPHQL_PERSISTED_QUERIES_TTL = int(
+    get_config(
+        "setup", "graphql", "persisted_queries", "ttl", default=30 * 24 * 60 * 60
+    )
+)
+# only the most recently registered persisted queries are kept
+GRAPHQL_PERSISTED_QUERIES_MAX_ENTRIES = int(
+    get_config("setup", "graphql", "persisted_queries", "max_entries", default=5000)
+)
+
+# exact `totalCount`s of connections are cached in Redis for this many seconds
+GRAPHQL_COUNT_CACHE_TTL = int(
+    get_config("setup", "graphql", "count_cache_ttl", default=0)
+)
+# connections the database estimates above this many rows get an estimated `totalCount`
+GRAPHQL_COUNT_ESTIMATE_THRESHOLD = get_config(
+    "setup", "graphql", "count_estimate_threshold", default=None
+)
+if GRAPHQL_COUNT_ESTIMATE_THRESHOLD is not None:
+    GRAPHQL_COUNT_ESTIMATE_THRESHOLD = int(GRAPHQL_COUNT_ESTIMATE_THRESHOLD)
+
+# per-owner cache of query responses, invalidated when the underlying data changes.
+# A cached response is stale once an owner, repository, commit or report totals
+# it was built from was updated, or for measurements any commit of their
+# repositories.  Other data (e.g. reports in storage) is only as fresh as those,
+# so only enable it if the worker updates them along with the data they cover.
+GRAPHQL_RESPONSE_CACHE_ENABLED = get_config(
+    "setup", "graphql", "response_cache", "enabled", default=False
+)
+GRAPHQL_RESPONSE_CACHE_TTL = int(
+    get_config("setup", "graphql", "response_cache", "ttl", default=10 * 60)
+)
+# cached responses aren't served if their objects were updated less than this
+# many seconds before they started being built (the change may not have been
+# committed yet when they were built)
+GRAPHQL_RESPONSE_CACHE_CHANGE_MARGIN = int(
+    get_config("setup", "graphql", "response_cache", "change_margin", default=60)
+)
+
 UPLOAD_THROTTLING_ENABLED = True
 
 CANNY_SSO_PRIVATE_TOKEN = get_config("canny", "sso_private_token", default="")
@@ -462,6 +543,35 @@ SENTRY_OAUTH_CLIENT_SECRET = get_config("setup", "sentry", "oauth_client_secret"
 # TODO: we can eventually get rid of this once it's confirmed working well for many repos
 REPORT_BUILDER_REPO_IDS = get_config("setup", "report_builder", "repo_ids", default=[])
 
+# process-wide cache of built reports (see `services.report.ReportCache`)
+REPORT_CACHE_ENABLED = get_config("setup", "report_cache", "enabled", default=False)
+# approximate memory budget of the cache in bytes
+REPORT_CACHE_MAX_SIZE = int(
+    get_config("setup", "report_cache", "max_size", default=256 * 1024 * 1024)
+)
+
+# concurrently load the base/head reports and git comparison on the compare endpoints
+COMPARISON_PREFETCH_ENABLED = get_config(
+    "setup", "comparison_prefetch", "enabled", default=False
+)
+
+# use the index stored next to the worker's comparison data so that single
+# impacted file lookups only parse that file's entry (see
+# `ComparisonReport.impacted_file`)
+COMPARISON_INDEX_SIDECAR_ENABLED = get_config(
+    "setup", "comparison_index_sidecar", "enabled", default=False
+)
+
+# Redis cache of computed file comparison segments (see `Comparison.get_file_segments`)
+SEGMENTS_CACHE_ENABLED = get_config("setup", "segments_cache", "enabled", default=False)
+SEGMENTS_CACHE_TTL = int(
+    get_config("setup", "segments_cache", "ttl", default=7 * 24 * 60 * 60)
+)
+# segments are not cached if their compressed size (in bytes) exceeds this
+SEGMENTS_CACHE_MAX_SIZE = int(
+    get_config("setup", "segments_cache", "max_size", default=1024 * 1024)
+)
+
 SENTRY_ENV = os.environ.get("CODECOV_ENV", False)
 SENTRY_DSN = os.environ.get("SERVICES__SENTRY__SERVER_DSN", None)
 if SENTRY_DSN is not None:
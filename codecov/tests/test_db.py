@@ -0,0 +1,49 @@
+import threading
+from unittest.mock import call, patch
+
+from django.db.backends.signals import connection_created
+from django.test import TestCase
+
+from codecov.db import RequestConnectionScope, sync_to_async
+
+
+@sync_to_async
+def current_thread():
+    return threading.get_ident()
+
+
+@sync_to_async
+def connect():
+    connection_created.send(sender=None, connection=None)
+
+
+@patch("codecov.db.connections")
+@patch("codecov.db.metrics")
+class RequestConnectionScopeTest(TestCase):
+    async def test_counts_connections(self, metrics, connections):
+        async with RequestConnectionScope("test", affinity=False) as scope:
+            await connect()
+            await connect()
+
+        assert scope.connections == 2
+        metrics.incr.assert_has_calls(
+            [
+                call("test.database.default.requests"),
+                call("test.database.default.connections", 2),
+            ]
+        )
+        connections.close_all.assert_not_called()
+
+    async def test_affinity(self, metrics, connections):
+        async with RequestConnectionScope("test", affinity=True) as scope:
+            threads = {await current_thread() for _ in range(3)}
+            await connect()
+
+        assert len(threads) == 1
+        assert scope.connections == 1
+        connections.close_all.assert_called_once()
+        metrics.incr.assert_any_call("test.database.affinity.connections", 1)
+
+    async def test_outside_scope(self, metrics, connections):
+        await connect()
+        metrics.incr.assert_not_called()
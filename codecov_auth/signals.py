@@ -4,6 +4,7 @@ from datetime import datetime
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
+import services.response_cache as response_cache
 from codecov_auth.models import Owner, OwnerProfile
 
 
@@ -16,3 +17,8 @@ def create_owner_profile_when_owner_is_created(
             owner_id=instance.ownerid,
             terms_agreement=False,
         )
+
+
+@receiver(post_save, sender=Owner)
+def invalidate_owner_responses(sender, instance: Owner, **kwargs):
+    response_cache.invalidate(response_cache.owner_tag(instance.ownerid))
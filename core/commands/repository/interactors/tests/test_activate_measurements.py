@@ -1,5 +1,5 @@
 from datetime import datetime
-from unittest.mock import patch
+from unittest.mock import call, patch
 
 import pytest
 from asgiref.sync import async_to_sync
@@ -105,11 +105,20 @@ class ActivateMeasurementsInteractorTest(TransactionTestCase):
             name=MeasurementName.FLAG_COVERAGE.value,
             repository_id=self.repo.pk,
         ).first()
-        backfill_dataset.assert_called_once_with(
+        assert dataset.backfill_start_date == timezone.datetime(2000, 1, 1)
+        assert dataset.backfill_end_date == timezone.datetime(2022, 1, 1)
+        # backfilled in 90 day windows, newest first
+        assert backfill_dataset.call_count == 90
+        assert backfill_dataset.call_args_list[0] == call(
             dataset,
-            start_date=timezone.datetime(2000, 1, 1),
+            start_date=timezone.datetime(2021, 10, 3),
             end_date=timezone.datetime(2022, 1, 1),
         )
+        assert backfill_dataset.call_args_list[-1] == call(
+            dataset,
+            start_date=timezone.datetime(2000, 1, 1),
+            end_date=timezone.datetime(2000, 1, 27),
+        )
 
     @patch("services.task.TaskService.backfill_dataset")
     def test_no_commits(self, backfill_dataset):
@@ -0,0 +1,73 @@
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connection, transaction
+
+from core.models import CommitChartSnapshotRebuild, Repository
+
+
+def backfill_repository(repoid: int) -> int:
+    """
+    Rebuilds the chart snapshots of the given repository from its commits.
+    Returns the number of snapshots.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("select rebuild_commit_chart_snapshots(%s)", [repoid])
+        return cursor.fetchone()[0]
+
+
+def rebuild_pending_repository(repoid: int) -> bool:
+    """
+    Rebuilds the chart snapshots of the given repository if they're still
+    marked for a rebuild.  Returns whether they were rebuilt.
+    """
+    with transaction.atomic():
+        # a change of the default branch while this runs waits for the rebuild
+        # and marks the repository again
+        deleted, _ = CommitChartSnapshotRebuild.objects.filter(
+            repository_id=repoid
+        ).delete()
+        if not deleted:
+            return False
+        backfill_repository(repoid)
+        return True
+
+
+class Command(BaseCommand):
+    """
+    Builds the analytics chart snapshots (see `CommitChartSnapshot`) for the
+    existing commits.  New and updated commits are snapshotted by a trigger so
+    this only needs to run once before enabling `CHART_SNAPSHOTS_ENABLED`, and
+    then periodically with `--pending` to rebuild the repositories whose default
+    branch changed.
+    """
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        # this can be used to retry if there's an error - restart the command
+        # from the last ID printed before failure
+        parser.add_argument("--starting-repoid", type=int)
+        parser.add_argument("--repoid", type=int, action="append", dest="repoids")
+        parser.add_argument(
+            "--pending",
+            action="store_true",
+            help="only rebuild the repositories marked for a rebuild",
+        )
+
+    def handle(self, *args, **options):
+        if options["pending"]:
+            repoids = CommitChartSnapshotRebuild.objects.order_by(
+                "repository_id"
+            ).values_list("repository_id", flat=True)
+            for repoid in list(repoids):
+                if rebuild_pending_repository(repoid):
+                    self.stdout.write(f"repoid: {repoid} (rebuilt)")
+            return
+
+        repoids = Repository.objects.order_by("repoid").values_list("pk", flat=True)
+
+        if options["starting_repoid"]:
+            repoids = repoids.filter(pk__gte=options["starting_repoid"])
+        if options["repoids"]:
+            repoids = repoids.filter(pk__in=options["repoids"])
+
+        for repoid in repoids.iterator():
+            count = backfill_repository(repoid)
+            self.stdout.write(f"repoid: {repoid} ({count} snapshots)")
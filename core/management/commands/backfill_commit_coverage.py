@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import transaction
+from django.db.models import Count, FloatField, Max, Min, Sum
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import Cast, TruncDate
+
+from core.models import Commit, CommitCoverageDaily, Repository
+
+
+def backfill_repository(repoid: int) -> int:
+    """
+    Rebuilds the daily coverage rollup of the given repository from its commits.
+    Returns the number of rollup rows.
+    """
+    days = (
+        Commit.objects.filter(repository_id=repoid, branch__isnull=False)
+        .annotate(
+            day=TruncDate("timestamp"),
+            coverage=Cast(KeyTextTransform("c", "totals"), output_field=FloatField()),
+        )
+        .filter(coverage__isnull=False)
+        .values("branch", "day")
+        .annotate(
+            coverage_min=Min("coverage"),
+            coverage_max=Max("coverage"),
+            coverage_sum=Sum("coverage"),
+            commit_count=Count("coverage"),
+        )
+        .order_by()
+    )
+
+    with transaction.atomic():
+        CommitCoverageDaily.objects.filter(repository_id=repoid).delete()
+        rows = CommitCoverageDaily.objects.bulk_create(
+            [CommitCoverageDaily(repository_id=repoid, **day) for day in days],
+            batch_size=1000,
+        )
+    return len(rows)
+
+
+class Command(BaseCommand):
+    """
+    Builds the daily rollup of the commits' coverage (see `CommitCoverageDaily`)
+    for the existing commits.  New and updated commits are rolled up by a trigger
+    so this only needs to run once before enabling `COMMIT_COVERAGE_ROLLUP_ENABLED`.
+    """
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        # this can be used to retry if there's an error - restart the command
+        # from the last ID printed before failure
+        parser.add_argument("--starting-repoid", type=int)
+        parser.add_argument("--repoid", type=int, action="append", dest="repoids")
+
+    def handle(self, *args, **options):
+        repoids = Repository.objects.order_by("repoid").values_list("pk", flat=True)
+
+        if options["starting_repoid"]:
+            repoids = repoids.filter(pk__gte=options["starting_repoid"])
+        if options["repoids"]:
+            repoids = repoids.filter(pk__in=options["repoids"])
+
+        for repoid in repoids.iterator():
+            count = backfill_repository(repoid)
+            self.stdout.write(f"repoid: {repoid} ({count} days)")
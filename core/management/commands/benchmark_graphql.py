@@ -0,0 +1,92 @@
+import asyncio
+import time
+from typing import List
+
+import httpx
+from django.core.management.base import BaseCommand, CommandParser
+
+DEFAULT_QUERY = "{ config { isTimescaleEnabled seatsUsed seatsLimit } }"
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> dict:
+    """
+    Summarizes the request latencies (in seconds) of a benchmark run.
+    """
+    latencies = sorted(latencies)
+
+    def percentile(p: float) -> float:
+        if not latencies:
+            return 0.0
+        idx = min(len(latencies) - 1, int(round(p * (len(latencies) - 1))))
+        return latencies[idx] * 1000
+
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "elapsed": elapsed,
+        "throughput": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "p50": percentile(0.50),
+        "p95": percentile(0.95),
+        "p99": percentile(0.99),
+    }
+
+
+class Command(BaseCommand):
+    """
+    Load benchmark for the GraphQL endpoint of a running API server.  Run it
+    against the same deployment started with `SERVER_MODE=wsgi` and with
+    `SERVER_MODE=asgi` (see `prod.sh`) to compare their throughput under
+    concurrent load:
+
+        python manage.py benchmark_graphql --url http://localhost:8000/graphql/gh --concurrency 100
+    """
+
+    help = "Load test the GraphQL endpoint of a running API server"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--url", default="http://localhost:8000/graphql/gh")
+        parser.add_argument("--query", default=DEFAULT_QUERY)
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--token", help="API token sent as a bearer token")
+
+    def handle(self, *args, **options):
+        stats = asyncio.run(self.run_benchmark(**options))
+        self.stdout.write(
+            "requests: {requests} errors: {errors} elapsed: {elapsed:.2f}s "
+            "throughput: {throughput:.1f} req/s p50: {p50:.1f}ms p95: {p95:.1f}ms "
+            "p99: {p99:.1f}ms".format(**stats)
+        )
+
+    async def run_benchmark(
+        self, url, query, requests, concurrency, token=None, **kwargs
+    ) -> dict:
+        headers = {}
+        if token:
+            headers["Authorization"] = f"bearer {token}"
+
+        latencies = []
+        errors = 0
+        remaining = iter(range(requests))
+
+        async def worker(client: httpx.AsyncClient):
+            nonlocal errors
+            for _ in remaining:
+                start = time.perf_counter()
+                try:
+                    res = await client.post(url, json={"query": query})
+                    res.raise_for_status()
+                except httpx.HTTPError:
+                    errors += 1
+                else:
+                    latencies.append(time.perf_counter() - start)
+
+        limits = httpx.Limits(max_connections=concurrency)
+        async with httpx.AsyncClient(
+            headers=headers, limits=limits, timeout=60
+        ) as client:
+            start = time.perf_counter()
+            await asyncio.gather(*[worker(client) for _ in range(concurrency)])
+            elapsed = time.perf_counter() - start
+
+        return summarize(latencies, errors, elapsed)
@@ -0,0 +1,88 @@
+from datetime import date, datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.models import CommitChartSnapshot, CommitChartSnapshotRebuild
+from core.tests.factories import CommitFactory, RepositoryFactory
+
+
+class BackfillChartSnapshotsTestCase(TestCase):
+    def setUp(self):
+        self.repo = RepositoryFactory(branch="main")
+        for branch, timestamp, hits, state in [
+            ("main", datetime(2022, 1, 1, 1, 0, 0), 80, "complete"),
+            ("main", datetime(2022, 1, 1, 2, 0, 0), 90, "complete"),
+            ("main", datetime(2022, 1, 1, 3, 0, 0), 10, "pending"),
+            ("main", datetime(2022, 1, 4, 1, 0, 0), 70, "complete"),
+            ("other", datetime(2022, 1, 5, 1, 0, 0), 60, "complete"),
+        ]:
+            CommitFactory(
+                repository=self.repo,
+                branch=branch,
+                timestamp=timestamp,
+                state=state,
+                totals={"h": hits, "m": 100 - hits, "p": 0, "n": 100},
+            )
+
+    def _snapshots(self, grouping_unit):
+        return list(
+            CommitChartSnapshot.objects.filter(
+                repository_id=self.repo.pk, grouping_unit=grouping_unit
+            )
+            .order_by("bucket")
+            .values_list("bucket", "hits", "misses", "lines")
+        )
+
+    def test_maintained_by_trigger(self):
+        assert self._snapshots("day") == [
+            (date(2022, 1, 1), 90, 10, 100),
+            (date(2022, 1, 4), 70, 30, 100),
+        ]
+        # 2022-01-03 is a Monday
+        assert self._snapshots("week") == [
+            (date(2021, 12, 27), 90, 10, 100),
+            (date(2022, 1, 3), 70, 30, 100),
+        ]
+        assert self._snapshots("year") == [(date(2022, 1, 1), 70, 30, 100)]
+
+        # changing the default branch marks the snapshots for a rebuild
+        self.repo.branch = "other"
+        self.repo.save()
+        assert self._snapshots("year") == [(date(2022, 1, 1), 70, 30, 100)]
+        assert CommitChartSnapshotRebuild.objects.filter(
+            repository_id=self.repo.pk
+        ).exists()
+
+        out = StringIO()
+        call_command("backfill_chart_snapshots", pending=True, stdout=out)
+        assert self._snapshots("year") == [(date(2022, 1, 1), 60, 40, 100)]
+        assert not CommitChartSnapshotRebuild.objects.exists()
+        assert f"repoid: {self.repo.pk} (rebuilt)" in out.getvalue()
+
+    def test_commit_without_totals(self):
+        CommitFactory(
+            repository=self.repo,
+            branch="main",
+            timestamp=datetime(2022, 1, 4, 2, 0, 0),
+            state="complete",
+            totals=None,
+        )
+        assert self._snapshots("day") == [
+            (date(2022, 1, 1), 90, 10, 100),
+            (date(2022, 1, 4), None, None, None),
+        ]
+
+    def test_backfill_command(self):
+        expected = {
+            unit: self._snapshots(unit)
+            for unit in ["day", "week", "month", "quarter", "year"]
+        }
+        CommitChartSnapshot.objects.all().delete()
+
+        out = StringIO()
+        call_command("backfill_chart_snapshots", repoids=[self.repo.pk], stdout=out)
+        for unit, snapshots in expected.items():
+            assert self._snapshots(unit) == snapshots
+        assert f"repoid: {self.repo.pk} (7 snapshots)" in out.getvalue()
@@ -0,0 +1,92 @@
+from datetime import date, datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.models import Commit, CommitCoverageDaily
+from core.tests.factories import CommitFactory, RepositoryFactory
+
+
+class CommitCoverageDailyTestCase(TestCase):
+    def setUp(self):
+        self.repo = RepositoryFactory()
+        self.commits = [
+            CommitFactory(
+                repository=self.repo,
+                branch=branch,
+                timestamp=timestamp,
+                totals={"c": coverage},
+            )
+            for branch, timestamp, coverage in [
+                ("main", datetime(2022, 1, 1, 1, 0, 0), "80.00"),
+                ("main", datetime(2022, 1, 1, 2, 0, 0), "90.00"),
+                ("main", datetime(2022, 1, 2, 1, 0, 0), "70.00"),
+                ("other", datetime(2022, 1, 1, 1, 0, 0), "60.00"),
+            ]
+        ]
+        # no coverage
+        CommitFactory(
+            repository=self.repo,
+            branch="main",
+            timestamp=datetime(2022, 1, 3, 1, 0, 0),
+            totals=None,
+        )
+
+    def _rollup(self):
+        return list(
+            CommitCoverageDaily.objects.filter(repository_id=self.repo.pk)
+            .order_by("branch", "day")
+            .values_list(
+                "branch",
+                "day",
+                "coverage_min",
+                "coverage_max",
+                "coverage_sum",
+                "commit_count",
+            )
+        )
+
+    def test_maintained_by_trigger(self):
+        assert self._rollup() == [
+            ("main", date(2022, 1, 1), 80.0, 90.0, 170.0, 2),
+            ("main", date(2022, 1, 2), 70.0, 70.0, 70.0, 1),
+            ("other", date(2022, 1, 1), 60.0, 60.0, 60.0, 1),
+        ]
+
+        commit = self.commits[1]
+        commit.totals = {"c": "100.00"}
+        commit.save()
+        assert self._rollup()[0] == ("main", date(2022, 1, 1), 80.0, 100.0, 180.0, 2)
+
+        commit.branch = "other"
+        commit.save()
+        assert self._rollup() == [
+            ("main", date(2022, 1, 1), 80.0, 80.0, 80.0, 1),
+            ("main", date(2022, 1, 2), 70.0, 70.0, 70.0, 1),
+            ("other", date(2022, 1, 1), 60.0, 100.0, 160.0, 2),
+        ]
+
+        Commit.objects.filter(pk=self.commits[2].pk).delete()
+        assert self._rollup() == [
+            ("main", date(2022, 1, 1), 80.0, 80.0, 80.0, 1),
+            ("other", date(2022, 1, 1), 60.0, 100.0, 160.0, 2),
+        ]
+
+    def test_backfill_command(self):
+        expected = self._rollup()
+        CommitCoverageDaily.objects.all().delete()
+        CommitCoverageDaily.objects.create(
+            repository_id=self.repo.pk,
+            branch="stale",
+            day=date(2021, 1, 1),
+            coverage_min=1,
+            coverage_max=1,
+            coverage_sum=1,
+            commit_count=1,
+        )
+
+        out = StringIO()
+        call_command("backfill_commit_coverage", repoids=[self.repo.pk], stdout=out)
+        assert self._rollup() == expected
+        assert f"repoid: {self.repo.pk} (3 days)" in out.getvalue()
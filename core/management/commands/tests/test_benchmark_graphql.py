@@ -0,0 +1,29 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.management.commands.benchmark_graphql import summarize
+
+
+class BenchmarkGraphqlTestCase(TestCase):
+    def test_summarize(self):
+        stats = summarize([0.3, 0.1, 0.2, 0.4], errors=1, elapsed=2.0)
+        assert stats["requests"] == 5
+        assert stats["errors"] == 1
+        assert stats["throughput"] == 2.0
+        assert round(stats["p50"]) == 300
+        assert round(stats["p99"]) == 400
+
+    def test_summarize_no_requests(self):
+        stats = summarize([], errors=0, elapsed=0)
+        assert stats["throughput"] == 0.0
+        assert stats["p95"] == 0.0
+
+    @patch("core.management.commands.benchmark_graphql.Command.run_benchmark")
+    def test_command_output(self, run_benchmark):
+        run_benchmark.return_value = summarize([0.1, 0.2], errors=0, elapsed=1.0)
+        out = StringIO()
+        call_command("benchmark_graphql", "--requests", "2", stdout=out)
+        assert "throughput: 2.0 req/s" in out.getvalue()
@@ -0,0 +1,129 @@
+# Generated by Django 4.2.2 on 2023-08-08 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    The rollup is maintained by a trigger (rather than in Django) since commits are
+    completed by the worker.  Each change to a commit's coverage, branch or
+    timestamp recomputes the affected (repoid, branch, day) rows from the commits
+    of that day.
+    """
+
+    dependencies = [
+        ("core", "0031_auto_20230731_1627"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CommitCoverageDaily",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("repository_id", models.IntegerField(db_column="repoid")),
+                ("branch", models.TextField()),
+                ("day", models.DateField()),
+                ("coverage_min", models.FloatField()),
+                ("coverage_max", models.FloatField()),
+                ("coverage_sum", models.FloatField()),
+                ("commit_count", models.IntegerField()),
+            ],
+            options={
+                "db_table": "commit_coverage_daily",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="commitcoveragedaily",
+            constraint=models.UniqueConstraint(
+                fields=("repository_id", "branch", "day"),
+                name="commit_coverage_daily_repoid_branch_day",
+            ),
+        ),
+        migrations.RunSQL(
+            """
+            create or replace function refresh_commit_coverage_daily(
+                _repoid integer, _branch text, _day date
+            ) returns void as $$
+            declare
+                _min double precision;
+                _max double precision;
+                _sum double precision;
+                _count integer;
+            begin
+                if _branch is null or _day is null then
+                    return;
+                end if;
+
+                select min(coverage), max(coverage), sum(coverage), count(coverage)
+                into _min, _max, _sum, _count
+                from (
+                    select (totals->>'c')::double precision as coverage
+                    from commits
+                    where repoid = _repoid
+                    and branch = _branch
+                    and timestamp >= _day
+                    and timestamp < _day + 1
+                ) commits_coverage;
+
+                if _count = 0 then
+                    delete from commit_coverage_daily
+                    where repoid = _repoid and branch = _branch and day = _day;
+                else
+                    insert into commit_coverage_daily (
+                        repoid, branch, day, coverage_min, coverage_max, coverage_sum, commit_count
+                    )
+                    values (_repoid, _branch, _day, _min, _max, _sum, _count)
+                    on conflict (repoid, branch, day) do update
+                    set coverage_min = excluded.coverage_min,
+                        coverage_max = excluded.coverage_max,
+                        coverage_sum = excluded.coverage_sum,
+                        commit_count = excluded.commit_count;
+                end if;
+            end;
+            $$ language plpgsql;
+
+            create or replace function commits_update_coverage_daily() returns trigger as $$
+            begin
+                if tg_op = 'INSERT' then
+                    if new.totals->>'c' is not null then
+                        perform refresh_commit_coverage_daily(
+                            new.repoid, new.branch, new.timestamp::date
+                        );
+                    end if;
+                elsif tg_op = 'DELETE' then
+                    if old.totals->>'c' is not null then
+                        perform refresh_commit_coverage_daily(
+                            old.repoid, old.branch, old.timestamp::date
+                        );
+                    end if;
+                elsif (new.totals->>'c', new.repoid, new.branch, new.timestamp::date)
+                    is distinct from
+                    (old.totals->>'c', old.repoid, old.branch, old.timestamp::date) then
+                    perform refresh_commit_coverage_daily(
+                        old.repoid, old.branch, old.timestamp::date
+                    );
+                    if (new.repoid, new.branch, new.timestamp::date)
+                        is distinct from
+                        (old.repoid, old.branch, old.timestamp::date) then
+                        perform refresh_commit_coverage_daily(
+                            new.repoid, new.branch, new.timestamp::date
+                        );
+                    end if;
+                end if;
+
+                return null;
+            end;
+            $$ language plpgsql;
+
+            create trigger commits_update_coverage_daily
+            after insert or update or delete on commits
+            for each row
+            execute procedure commits_update_coverage_daily();
+            """,
+            reverse_sql="""
+            drop trigger if exists commits_update_coverage_daily on commits;
+            drop function if exists commits_update_coverage_daily();
+            drop function if exists refresh_commit_coverage_daily(integer, text, date);
+            """,
+        ),
+    ]
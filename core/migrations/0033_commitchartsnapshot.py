@@ -0,0 +1,224 @@
+# Generated by Django 4.2.2 on 2023-08-16 11:05
+
+from django.db import migrations, models
+
+import core.models
+
+
+class Migration(migrations.Migration):
+    """
+    The snapshots are maintained by triggers (rather than in Django) since
+    commits are completed by the worker.  Each change to a complete commit on a
+    default branch recomputes the buckets (of every grouping unit) containing
+    it, and a change of a repository's default branch rebuilds its snapshots.
+    """
+
+    dependencies = [
+        ("core", "0032_commitcoveragedaily"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CommitChartSnapshot",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("repository_id", models.IntegerField(db_column="repoid")),
+                ("grouping_unit", models.TextField()),
+                ("bucket", models.DateField()),
+                ("commit_timestamp", core.models.DateTimeWithoutTZField()),
+                ("hits", models.BigIntegerField()),
+                ("misses", models.BigIntegerField()),
+                ("partials", models.BigIntegerField()),
+                ("lines", models.BigIntegerField()),
+            ],
+            options={
+                "db_table": "commit_chart_snapshots",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="commitchartsnapshot",
+            constraint=models.UniqueConstraint(
+                fields=("repository_id", "grouping_unit", "bucket"),
+                name="commit_chart_snapshots_repoid_unit_bucket",
+            ),
+        ),
+        migrations.RunSQL(
+            """
+            create or replace function refresh_commit_chart_snapshot(
+                _repoid integer, _unit text, _bucket date
+            ) returns void as $$
+            declare
+                _timestamp timestamp;
+                _totals jsonb;
+            begin
+                select c.timestamp, c.totals::jsonb
+                into _timestamp, _totals
+                from commits c
+                inner join repos r on r.repoid = c.repoid and r.branch = c.branch
+                where c.repoid = _repoid
+                and c.state = 'complete'
+                and c.timestamp >= _bucket
+                and c.timestamp < _bucket + case
+                    when _unit = 'quarter' then interval '3 months'
+                    else ('1 ' || _unit)::interval
+                end
+                order by c.timestamp desc
+                limit 1;
+
+                -- the chart carries the previous bucket forward if the latest
+                -- commit of a bucket has no totals
+                if _totals is null then
+                    delete from commit_chart_snapshots
+                    where repoid = _repoid and grouping_unit = _unit and bucket = _bucket;
+                else
+                    insert into commit_chart_snapshots (
+                        repoid, grouping_unit, bucket, commit_timestamp,
+                        hits, misses, partials, lines
+                    )
+                    values (
+                        _repoid, _unit, _bucket, _timestamp,
+                        coalesce((_totals->>'h')::numeric::bigint, 0),
+                        coalesce((_totals->>'m')::numeric::bigint, 0),
+                        coalesce((_totals->>'p')::numeric::bigint, 0),
+                        coalesce((_totals->>'n')::numeric::bigint, 0)
+                    )
+                    on conflict (repoid, grouping_unit, bucket) do update
+                    set commit_timestamp = excluded.commit_timestamp,
+                        hits = excluded.hits,
+                        misses = excluded.misses,
+                        partials = excluded.partials,
+                        lines = excluded.lines;
+                end if;
+            end;
+            $$ language plpgsql;
+
+            create or replace function refresh_commit_chart_snapshots(
+                _repoid integer, _timestamp timestamp
+            ) returns void as $$
+            declare
+                _unit text;
+            begin
+                foreach _unit in array array['day', 'week', 'month', 'quarter', 'year'] loop
+                    perform refresh_commit_chart_snapshot(
+                        _repoid, _unit, date_trunc(_unit, _timestamp)::date
+                    );
+                end loop;
+            end;
+            $$ language plpgsql;
+
+            create or replace function rebuild_commit_chart_snapshots(_repoid integer)
+            returns integer as $$
+            declare
+                _count integer;
+            begin
+                delete from commit_chart_snapshots where repoid = _repoid;
+
+                insert into commit_chart_snapshots (
+                    repoid, grouping_unit, bucket, commit_timestamp,
+                    hits, misses, partials, lines
+                )
+                select
+                    repoid,
+                    unit,
+                    bucket,
+                    timestamp,
+                    coalesce((totals->>'h')::numeric::bigint, 0),
+                    coalesce((totals->>'m')::numeric::bigint, 0),
+                    coalesce((totals->>'p')::numeric::bigint, 0),
+                    coalesce((totals->>'n')::numeric::bigint, 0)
+                from (
+                    select distinct on (u.unit, date_trunc(u.unit, c.timestamp))
+                        c.repoid,
+                        u.unit,
+                        date_trunc(u.unit, c.timestamp)::date as bucket,
+                        c.timestamp,
+                        c.totals::jsonb as totals
+                    from commits c
+                    inner join repos r on r.repoid = c.repoid and r.branch = c.branch
+                    cross join unnest(
+                        array['day', 'week', 'month', 'quarter', 'year']
+                    ) as u(unit)
+                    where c.repoid = _repoid
+                    and c.state = 'complete'
+                    and c.timestamp is not null
+                    order by u.unit, date_trunc(u.unit, c.timestamp), c.timestamp desc
+                ) latest_commits
+                where totals is not null;
+
+                get diagnostics _count = row_count;
+                return _count;
+            end;
+            $$ language plpgsql;
+
+            create or replace function commits_update_chart_snapshots() returns trigger as $$
+            declare
+                _old_charted boolean := false;
+                _new_charted boolean := false;
+                _same_commit boolean := false;
+            begin
+                if tg_op <> 'INSERT' then
+                    _old_charted := old.state = 'complete'
+                        and old.timestamp is not null
+                        and exists (
+                            select 1 from repos
+                            where repoid = old.repoid and branch = old.branch
+                        );
+                end if;
+                if tg_op <> 'DELETE' then
+                    _new_charted := new.state = 'complete'
+                        and new.timestamp is not null
+                        and exists (
+                            select 1 from repos
+                            where repoid = new.repoid and branch = new.branch
+                        );
+                end if;
+                if tg_op = 'UPDATE' then
+                    _same_commit := old.repoid = new.repoid
+                        and old.timestamp is not distinct from new.timestamp;
+                end if;
+
+                if _old_charted and _new_charted and _same_commit
+                    and old.totals::jsonb is not distinct from new.totals::jsonb then
+                    return null;
+                end if;
+
+                if _old_charted then
+                    perform refresh_commit_chart_snapshots(old.repoid, old.timestamp);
+                end if;
+                if _new_charted and not (_old_charted and _same_commit) then
+                    perform refresh_commit_chart_snapshots(new.repoid, new.timestamp);
+                end if;
+
+                return null;
+            end;
+            $$ language plpgsql;
+
+            create trigger commits_update_chart_snapshots
+            after insert or update or delete on commits
+            for each row
+            execute procedure commits_update_chart_snapshots();
+
+            create or replace function repos_update_chart_snapshots() returns trigger as $$
+            begin
+                perform rebuild_commit_chart_snapshots(new.repoid);
+                return null;
+            end;
+            $$ language plpgsql;
+
+            create trigger repos_update_chart_snapshots
+            after update of branch on repos
+            for each row
+            when (new.branch is distinct from old.branch)
+            execute procedure repos_update_chart_snapshots();
+            """,
+            reverse_sql="""
+            drop trigger if exists repos_update_chart_snapshots on repos;
+            drop trigger if exists commits_update_chart_snapshots on commits;
+            drop function if exists repos_update_chart_snapshots();
+            drop function if exists commits_update_chart_snapshots();
+            drop function if exists rebuild_commit_chart_snapshots(integer);
+            drop function if exists refresh_commit_chart_snapshots(integer, timestamp);
+            drop function if exists refresh_commit_chart_snapshot(integer, text, date);
+            """,
+        ),
+    ]
@@ -0,0 +1,110 @@
+# Generated by Django 4.2.2 on 2023-08-16 14:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Refreshing a day reads the commits of the day and then writes the rollup so
+    two transactions changing commits of the same day could each write the
+    coverage without the other's commit.  The refreshes of a (repoid, branch,
+    day) now take a transaction-level advisory lock first so the second one
+    reads the commits after the first one commits.
+    """
+
+    dependencies = [
+        ("core", "0033_commitchartsnapshot"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            """
+            create or replace function refresh_commit_coverage_daily(
+                _repoid integer, _branch text, _day date
+            ) returns void as $$
+            declare
+                _min double precision;
+                _max double precision;
+                _sum double precision;
+                _count integer;
+            begin
+                if _branch is null or _day is null then
+                    return;
+                end if;
+
+                -- serialize the refreshes of a day so a concurrent one can't
+                -- overwrite it with the coverage it read before this commit
+                perform pg_advisory_xact_lock(_repoid, hashtext(_branch || ':' || _day));
+
+                select min(coverage), max(coverage), sum(coverage), count(coverage)
+                into _min, _max, _sum, _count
+                from (
+                    select (totals->>'c')::double precision as coverage
+                    from commits
+                    where repoid = _repoid
+                    and branch = _branch
+                    and timestamp >= _day
+                    and timestamp < _day + 1
+                ) commits_coverage;
+
+                if _count = 0 then
+                    delete from commit_coverage_daily
+                    where repoid = _repoid and branch = _branch and day = _day;
+                else
+                    insert into commit_coverage_daily (
+                        repoid, branch, day, coverage_min, coverage_max, coverage_sum, commit_count
+                    )
+                    values (_repoid, _branch, _day, _min, _max, _sum, _count)
+                    on conflict (repoid, branch, day) do update
+                    set coverage_min = excluded.coverage_min,
+                        coverage_max = excluded.coverage_max,
+                        coverage_sum = excluded.coverage_sum,
+                        commit_count = excluded.commit_count;
+                end if;
+            end;
+            $$ language plpgsql;
+            """,
+            reverse_sql="""
+            create or replace function refresh_commit_coverage_daily(
+                _repoid integer, _branch text, _day date
+            ) returns void as $$
+            declare
+                _min double precision;
+                _max double precision;
+                _sum double precision;
+                _count integer;
+            begin
+                if _branch is null or _day is null then
+                    return;
+                end if;
+
+                select min(coverage), max(coverage), sum(coverage), count(coverage)
+                into _min, _max, _sum, _count
+                from (
+                    select (totals->>'c')::double precision as coverage
+                    from commits
+                    where repoid = _repoid
+                    and branch = _branch
+                    and timestamp >= _day
+                    and timestamp < _day + 1
+                ) commits_coverage;
+
+                if _count = 0 then
+                    delete from commit_coverage_daily
+                    where repoid = _repoid and branch = _branch and day = _day;
+                else
+                    insert into commit_coverage_daily (
+                        repoid, branch, day, coverage_min, coverage_max, coverage_sum, commit_count
+                    )
+                    values (_repoid, _branch, _day, _min, _max, _sum, _count)
+                    on conflict (repoid, branch, day) do update
+                    set coverage_min = excluded.coverage_min,
+                        coverage_max = excluded.coverage_max,
+                        coverage_sum = excluded.coverage_sum,
+                        commit_count = excluded.commit_count;
+                end if;
+            end;
+            $$ language plpgsql;
+            """,
+        ),
+    ]
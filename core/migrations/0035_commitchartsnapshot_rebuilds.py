@@ -0,0 +1,277 @@
+# Generated by Django 4.2.2 on 2023-08-16 15:40
+
+from django.db import migrations, models
+
+import core.models
+
+
+class Migration(migrations.Migration):
+    """
+    - The refreshes of a bucket take an advisory lock so concurrent ones can't
+      overwrite each other's snapshot with the commits they read before.
+    - Buckets whose latest complete commit has no totals keep a snapshot
+      without totals so the chart starts at the same date as from the commits.
+    - Changing a repository's default branch no longer rebuilds its snapshots
+      in the transaction updating it - the repository is marked for a rebuild
+      (and charted from the commits until then).
+    """
+
+    dependencies = [
+        ("core", "0034_commitcoveragedaily_lock"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CommitChartSnapshotRebuild",
+            fields=[
+                (
+                    "repository_id",
+                    models.IntegerField(
+                        db_column="repoid", primary_key=True, serialize=False
+                    ),
+                ),
+                ("requested_at", core.models.DateTimeWithoutTZField()),
+            ],
+            options={
+                "db_table": "commit_chart_snapshot_rebuilds",
+            },
+        ),
+        migrations.AlterField(
+            model_name="commitchartsnapshot",
+            name="hits",
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AlterField(
+            model_name="commitchartsnapshot",
+            name="misses",
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AlterField(
+            model_name="commitchartsnapshot",
+            name="partials",
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AlterField(
+            model_name="commitchartsnapshot",
+            name="lines",
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.RunSQL(
+            """
+            create or replace function refresh_commit_chart_snapshot(
+                _repoid integer, _unit text, _bucket date
+            ) returns void as $$
+            declare
+                _timestamp timestamp;
+                _totals jsonb;
+            begin
+                -- a rebuild of the repo replaces all its snapshots
+                perform pg_advisory_xact_lock_shared(_repoid, hashtext('chart'));
+                -- serialize the refreshes of a bucket so a concurrent one can't
+                -- overwrite it with the commits it read before this one
+                perform pg_advisory_xact_lock(
+                    _repoid, hashtext('chart:' || _unit || ':' || _bucket)
+                );
+
+                select c.timestamp, c.totals::jsonb
+                into _timestamp, _totals
+                from commits c
+                inner join repos r on r.repoid = c.repoid and r.branch = c.branch
+                where c.repoid = _repoid
+                and c.state = 'complete'
+                and c.timestamp >= _bucket
+                and c.timestamp < _bucket + case
+                    when _unit = 'quarter' then interval '3 months'
+                    else ('1 ' || _unit)::interval
+                end
+                order by c.timestamp desc
+                limit 1;
+
+                -- the latest commit of a bucket may have no totals (the chart
+                -- carries the previous bucket forward) but the bucket is still
+                -- kept since the chart starts at the first complete commit
+                if _timestamp is null then
+                    delete from commit_chart_snapshots
+                    where repoid = _repoid and grouping_unit = _unit and bucket = _bucket;
+                else
+                    insert into commit_chart_snapshots (
+                        repoid, grouping_unit, bucket, commit_timestamp,
+                        hits, misses, partials, lines
+                    )
+                    values (
+                        _repoid, _unit, _bucket, _timestamp,
+                        case when _totals is not null then coalesce((_totals->>'h')::numeric::bigint, 0) end,
+                        case when _totals is not null then coalesce((_totals->>'m')::numeric::bigint, 0) end,
+                        case when _totals is not null then coalesce((_totals->>'p')::numeric::bigint, 0) end,
+                        case when _totals is not null then coalesce((_totals->>'n')::numeric::bigint, 0) end
+                    )
+                    on conflict (repoid, grouping_unit, bucket) do update
+                    set commit_timestamp = excluded.commit_timestamp,
+                        hits = excluded.hits,
+                        misses = excluded.misses,
+                        partials = excluded.partials,
+                        lines = excluded.lines;
+                end if;
+            end;
+            $$ language plpgsql;
+
+            create or replace function rebuild_commit_chart_snapshots(_repoid integer)
+            returns integer as $$
+            declare
+                _count integer;
+            begin
+                perform pg_advisory_xact_lock(_repoid, hashtext('chart'));
+
+                delete from commit_chart_snapshots where repoid = _repoid;
+
+                insert into commit_chart_snapshots (
+                    repoid, grouping_unit, bucket, commit_timestamp,
+                    hits, misses, partials, lines
+                )
+                select
+                    repoid,
+                    unit,
+                    bucket,
+                    timestamp,
+                    case when totals is not null then coalesce((totals->>'h')::numeric::bigint, 0) end,
+                    case when totals is not null then coalesce((totals->>'m')::numeric::bigint, 0) end,
+                    case when totals is not null then coalesce((totals->>'p')::numeric::bigint, 0) end,
+                    case when totals is not null then coalesce((totals->>'n')::numeric::bigint, 0) end
+                from (
+                    select distinct on (u.unit, date_trunc(u.unit, c.timestamp))
+                        c.repoid,
+                        u.unit,
+                        date_trunc(u.unit, c.timestamp)::date as bucket,
+                        c.timestamp,
+                        c.totals::jsonb as totals
+                    from commits c
+                    inner join repos r on r.repoid = c.repoid and r.branch = c.branch
+                    cross join unnest(
+                        array['day', 'week', 'month', 'quarter', 'year']
+                    ) as u(unit)
+                    where c.repoid = _repoid
+                    and c.state = 'complete'
+                    and c.timestamp is not null
+                    order by u.unit, date_trunc(u.unit, c.timestamp), c.timestamp desc
+                ) latest_commits;
+
+                get diagnostics _count = row_count;
+                return _count;
+            end;
+            $$ language plpgsql;
+
+            create or replace function repos_update_chart_snapshots() returns trigger as $$
+            begin
+                -- rebuilding the snapshots reads all the commits of the repo so
+                -- it's left to `backfill_chart_snapshots --pending`
+                insert into commit_chart_snapshot_rebuilds (repoid, requested_at)
+                values (new.repoid, now())
+                on conflict (repoid) do nothing;
+                return null;
+            end;
+            $$ language plpgsql;
+            """,
+            reverse_sql="""
+            delete from commit_chart_snapshots where lines is null;
+
+            create or replace function refresh_commit_chart_snapshot(
+                _repoid integer, _unit text, _bucket date
+            ) returns void as $$
+            declare
+                _timestamp timestamp;
+                _totals jsonb;
+            begin
+                select c.timestamp, c.totals::jsonb
+                into _timestamp, _totals
+                from commits c
+                inner join repos r on r.repoid = c.repoid and r.branch = c.branch
+                where c.repoid = _repoid
+                and c.state = 'complete'
+                and c.timestamp >= _bucket
+                and c.timestamp < _bucket + case
+                    when _unit = 'quarter' then interval '3 months'
+                    else ('1 ' || _unit)::interval
+                end
+                order by c.timestamp desc
+                limit 1;
+
+                -- the chart carries the previous bucket forward if the latest
+                -- commit of a bucket has no totals
+                if _totals is null then
+                    delete from commit_chart_snapshots
+                    where repoid = _repoid and grouping_unit = _unit and bucket = _bucket;
+                else
+                    insert into commit_chart_snapshots (
+                        repoid, grouping_unit, bucket, commit_timestamp,
+                        hits, misses, partials, lines
+                    )
+                    values (
+                        _repoid, _unit, _bucket, _timestamp,
+                        coalesce((_totals->>'h')::numeric::bigint, 0),
+                        coalesce((_totals->>'m')::numeric::bigint, 0),
+                        coalesce((_totals->>'p')::numeric::bigint, 0),
+                        coalesce((_totals->>'n')::numeric::bigint, 0)
+                    )
+                    on conflict (repoid, grouping_unit, bucket) do update
+                    set commit_timestamp = excluded.commit_timestamp,
+                        hits = excluded.hits,
+                        misses = excluded.misses,
+                        partials = excluded.partials,
+                        lines = excluded.lines;
+                end if;
+            end;
+            $$ language plpgsql;
+
+            create or replace function rebuild_commit_chart_snapshots(_repoid integer)
+            returns integer as $$
+            declare
+                _count integer;
+            begin
+                delete from commit_chart_snapshots where repoid = _repoid;
+
+                insert into commit_chart_snapshots (
+                    repoid, grouping_unit, bucket, commit_timestamp,
+                    hits, misses, partials, lines
+                )
+                select
+                    repoid,
+                    unit,
+                    bucket,
+                    timestamp,
+                    coalesce((totals->>'h')::numeric::bigint, 0),
+                    coalesce((totals->>'m')::numeric::bigint, 0),
+                    coalesce((totals->>'p')::numeric::bigint, 0),
+                    coalesce((totals->>'n')::numeric::bigint, 0)
+                from (
+                    select distinct on (u.unit, date_trunc(u.unit, c.timestamp))
+                        c.repoid,
+                        u.unit,
+                        date_trunc(u.unit, c.timestamp)::date as bucket,
+                        c.timestamp,
+                        c.totals::jsonb as totals
+                    from commits c
+                    inner join repos r on r.repoid = c.repoid and r.branch = c.branch
+                    cross join unnest(
+                        array['day', 'week', 'month', 'quarter', 'year']
+                    ) as u(unit)
+                    where c.repoid = _repoid
+                    and c.state = 'complete'
+                    and c.timestamp is not null
+                    order by u.unit, date_trunc(u.unit, c.timestamp), c.timestamp desc
+                ) latest_commits
+                where totals is not null;
+
+                get diagnostics _count = row_count;
+                return _count;
+            end;
+            $$ language plpgsql;
+
+            create or replace function repos_update_chart_snapshots() returns trigger as $$
+            begin
+                perform rebuild_commit_chart_snapshots(new.repoid);
+                return null;
+            end;
+            $$ language plpgsql;
+            """,
+        ),
+    ]
@@ -241,7 +241,8 @@ class Commit(models.Model):
         # reports above have `code=None`.  In the case that the reports were not
         # prefetched we'll filter again in memory.
         reports = [report for report in reports if report.code is None]
-        return reports[0] if reports else None
+        # the oldest one if there are several (`ReportLevelTotalsLoader` agrees)
+        return min(reports, key=lambda report: report.id) if reports else None
 
     @cached_property
     def full_report(self) -> Optional[Report]:
@@ -431,3 +432,81 @@ class CommitError(BaseCodecovModel):
     )
     error_code = models.CharField(max_length=100)
     error_params = models.JSONField(default=dict)
+
+
+class CommitCoverageDaily(models.Model):
+    """
+    Daily rollup of the coverage of the commits of a repository branch.
+
+    The rows are maintained by a trigger on the `commits` table (so that commits
+    completed by the worker are included) and can be (re)built for existing
+    commits with the `backfill_commit_coverage` management command.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    # not a true foreign key so that the trigger doesn't get in the way of
+    # deleting repositories
+    repository_id = models.IntegerField(db_column="repoid")
+    branch = models.TextField()
+    day = models.DateField()
+    coverage_min = models.FloatField()
+    coverage_max = models.FloatField()
+    coverage_sum = models.FloatField()
+    commit_count = models.IntegerField()
+
+    class Meta:
+        db_table = "commit_coverage_daily"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["repository_id", "branch", "day"],
+                name="commit_coverage_daily_repoid_branch_day",
+            )
+        ]
+
+
+class CommitChartSnapshot(models.Model):
+    """
+    Totals of the latest complete commit on a repository's default branch in
+    each bucket (day, week, month, quarter or year) - the datapoints of the
+    analytics chart (see `ChartQueryRunner`).
+
+    The rows are maintained by a trigger on the `commits` table and can be
+    (re)built for existing commits with the `backfill_chart_snapshots`
+    management command (see `CommitChartSnapshotRebuild`).
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    # not a true foreign key so that the trigger doesn't get in the way of
+    # deleting repositories
+    repository_id = models.IntegerField(db_column="repoid")
+    grouping_unit = models.TextField()
+    bucket = models.DateField()
+    commit_timestamp = DateTimeWithoutTZField()
+    # null if the commit has no totals (the previous bucket is carried forward)
+    hits = models.BigIntegerField(null=True)
+    misses = models.BigIntegerField(null=True)
+    partials = models.BigIntegerField(null=True)
+    lines = models.BigIntegerField(null=True)
+
+    class Meta:
+        db_table = "commit_chart_snapshots"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["repository_id", "grouping_unit", "bucket"],
+                name="commit_chart_snapshots_repoid_unit_bucket",
+            )
+        ]
+
+
+class CommitChartSnapshotRebuild(models.Model):
+    """
+    Repositories whose chart snapshots are out of date (their default branch
+    changed) and need to be rebuilt with `backfill_chart_snapshots --pending`.
+    They're charted from the commits until then.
+    """
+
+    repository_id = models.IntegerField(db_column="repoid", primary_key=True)
+    requested_at = DateTimeWithoutTZField()
+
+    class Meta:
+        db_table = "commit_chart_snapshot_rebuilds"
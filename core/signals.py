@@ -0,0 +1,30 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+import services.response_cache as response_cache
+from core.models import Branch, Commit, Pull, Repository
+
+# There are intentionally no `post_delete` receivers: those would prevent Django from
+# bulk deleting the (many) commits, pulls and branches when a repository is deleted.
+
+
+@receiver(post_save, sender=Repository)
+def invalidate_repository_responses(sender, instance: Repository, **kwargs):
+    response_cache.invalidate(
+        response_cache.repository_tag(instance.repoid),
+        response_cache.owner_tag(instance.author_id),
+    )
+
+
+@receiver(post_save, sender=Commit)
+def invalidate_commit_responses(sender, instance: Commit, **kwargs):
+    response_cache.invalidate(
+        response_cache.commit_tag(instance.repository_id, instance.commitid),
+        response_cache.repository_tag(instance.repository_id),
+    )
+
+
+@receiver(post_save, sender=Pull)
+@receiver(post_save, sender=Branch)
+def invalidate_repository_child_responses(sender, instance, **kwargs):
+    response_cache.invalidate(response_cache.repository_tag(instance.repository_id))
@@ -21,23 +21,15 @@ def apply_filters_to_queryset(queryset, filters):
 
 
 def list_repository_for_owner(current_owner: Owner, owner: Owner, filters):
-    queryset = (
-        Repository.objects.viewable_repos(current_owner)
-        .with_recent_coverage()
-        .with_latest_commit_at()
-        .filter(author=owner)
-    )
+    queryset = Repository.objects.viewable_repos(current_owner).filter(author=owner)
     queryset = apply_filters_to_queryset(queryset, filters)
     return queryset
 
 
 def search_repos(current_owner, filters):
     authors_from = [current_owner.ownerid] + (current_owner.organizations or [])
-    queryset = (
-        Repository.objects.viewable_repos(current_owner)
-        .with_recent_coverage()
-        .with_latest_commit_at()
-        .filter(author__ownerid__in=authors_from)
+    queryset = Repository.objects.viewable_repos(current_owner).filter(
+        author__ownerid__in=authors_from
     )
     queryset = apply_filters_to_queryset(queryset, filters)
     return queryset
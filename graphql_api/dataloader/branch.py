@@ -0,0 +1,16 @@
+from core.models import Branch
+
+from .loader import BaseLoader
+
+
+class BranchLoader(BaseLoader):
+    @classmethod
+    def key(cls, branch):
+        return branch.name
+
+    def __init__(self, info, repository_id, *args, **kwargs):
+        self.repository_id = repository_id
+        return super().__init__(info, *args, **kwargs)
+
+    def batch_queryset(self, keys):
+        return Branch.objects.filter(name__in=keys, repository_id=self.repository_id)
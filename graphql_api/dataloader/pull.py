@@ -0,0 +1,16 @@
+from core.models import Pull
+
+from .loader import BaseLoader
+
+
+class PullLoader(BaseLoader):
+    @classmethod
+    def key(cls, pull):
+        return pull.pullid
+
+    def __init__(self, info, repository_id, *args, **kwargs):
+        self.repository_id = repository_id
+        return super().__init__(info, *args, **kwargs)
+
+    def batch_queryset(self, keys):
+        return Pull.objects.filter(pullid__in=keys, repository_id=self.repository_id)
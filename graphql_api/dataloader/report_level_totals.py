@@ -0,0 +1,24 @@
+from reports.models import ReportLevelTotals
+
+from .loader import BaseLoader
+
+
+class ReportLevelTotalsLoader(BaseLoader):
+    """
+    Loads the totals of a commit's report keyed by the commit id.  If a commit
+    has several reports without a code the oldest one is used, like
+    `Commit.commitreport` does.
+    """
+
+    @classmethod
+    def key(cls, totals):
+        return totals.report.commit_id
+
+    def batch_queryset(self, keys):
+        return (
+            ReportLevelTotals.objects.filter(
+                report__commit_id__in=keys, report__code=None
+            ).select_related("report")
+            # `batch_load_fn` keeps the last record of each key
+            .order_by("-report_id")
+        )
@@ -0,0 +1,30 @@
+from core.models import Repository
+
+from .loader import BaseLoader
+
+
+class RepositoryLoader(BaseLoader):
+    """
+    Loads repositories by `(author_id, name)` among the repositories viewable by
+    the current owner.
+    """
+
+    @classmethod
+    def key(cls, repository):
+        return (repository.author_id, repository.name)
+
+    def batch_queryset(self, keys):
+        current_owner = self.info.context["request"].current_owner
+
+        # this may select a few more repositories than requested (all combinations
+        # of the given authors and names) - those are ignored in `batch_load_fn`
+        return (
+            Repository.objects.viewable_repos(current_owner)
+            .filter(
+                author_id__in={author_id for author_id, _ in keys},
+                name__in={name for _, name in keys},
+            )
+            .with_recent_coverage()
+            .with_oldest_commit_at()
+            .select_related("author")
+        )
@@ -0,0 +1,8 @@
+from reports.models import RepositoryFlag
+
+from .loader import BaseLoader
+
+
+class RepositoryFlagLoader(BaseLoader):
+    def batch_queryset(self, keys):
+        return RepositoryFlag.objects.filter(id__in=keys)
@@ -0,0 +1,39 @@
+import asyncio
+
+from django.test import TransactionTestCase
+
+from core.tests.factories import BranchFactory, RepositoryFactory
+from graphql_api.dataloader.branch import BranchLoader
+
+
+class GraphQLResolveInfo:
+    def __init__(self):
+        self.context = {}
+
+
+class BranchLoaderTestCase(TransactionTestCase):
+    def setUp(self):
+        self.repository = RepositoryFactory()
+        self.branches = [
+            BranchFactory(repository=self.repository, name="main"),
+            BranchFactory(repository=self.repository, name="feature-1"),
+            BranchFactory(repository=self.repository, name="feature-2"),
+        ]
+        # same name in another repository
+        BranchFactory(name="feature-1")
+        self.info = GraphQLResolveInfo()
+
+    async def test_a_set_of_branches(self):
+        loader = BranchLoader.loader(self.info, self.repository.pk)
+        branches = await asyncio.gather(
+            loader.load("feature-2"),
+            loader.load("missing"),
+            loader.load("main"),
+            loader.load("feature-1"),
+        )
+        assert branches == [
+            self.branches[2],
+            None,
+            self.branches[0],
+            self.branches[1],
+        ]
@@ -0,0 +1,39 @@
+import asyncio
+
+from django.test import TransactionTestCase
+
+from core.tests.factories import PullFactory, RepositoryFactory
+from graphql_api.dataloader.pull import PullLoader
+
+
+class GraphQLResolveInfo:
+    def __init__(self):
+        self.context = {}
+
+
+class PullLoaderTestCase(TransactionTestCase):
+    def setUp(self):
+        self.repository = RepositoryFactory()
+        self.pulls = [
+            PullFactory(repository=self.repository, pullid=1),
+            PullFactory(repository=self.repository, pullid=2),
+            PullFactory(repository=self.repository, pullid=3),
+        ]
+        # same pullid in another repository
+        PullFactory(pullid=2)
+        self.info = GraphQLResolveInfo()
+
+    async def test_a_set_of_pulls(self):
+        loader = PullLoader.loader(self.info, self.repository.pk)
+        pulls = await asyncio.gather(
+            loader.load(3),
+            loader.load(1),
+            loader.load(4),
+            loader.load(2),
+        )
+        assert [pull.id if pull else None for pull in pulls] == [
+            self.pulls[2].id,
+            self.pulls[0].id,
+            None,
+            self.pulls[1].id,
+        ]
@@ -0,0 +1,51 @@
+import asyncio
+
+from django.test import TransactionTestCase
+
+from core.tests.factories import CommitFactory
+from graphql_api.dataloader.report_level_totals import ReportLevelTotalsLoader
+from reports.tests.factories import CommitReportFactory, ReportLevelTotalsFactory
+
+
+class GraphQLResolveInfo:
+    def __init__(self):
+        self.context = {}
+
+
+class ReportLevelTotalsLoaderTestCase(TransactionTestCase):
+    def setUp(self):
+        self.commit_1 = CommitFactory()
+        self.commit_2 = CommitFactory(repository=self.commit_1.repository)
+        self.commit_without_totals = CommitFactory(repository=self.commit_1.repository)
+        self.totals_1 = ReportLevelTotalsFactory(
+            report=CommitReportFactory(commit=self.commit_1)
+        )
+        self.totals_2 = ReportLevelTotalsFactory(
+            report=CommitReportFactory(commit=self.commit_2)
+        )
+        CommitReportFactory(commit=self.commit_without_totals)
+        self.commit_with_reports = CommitFactory(repository=self.commit_1.repository)
+        self.first_totals = ReportLevelTotalsFactory(
+            report=CommitReportFactory(commit=self.commit_with_reports)
+        )
+        ReportLevelTotalsFactory(
+            report=CommitReportFactory(commit=self.commit_with_reports)
+        )
+        # evaluated in a sync context
+        self.commit_with_reports.commitreport
+        self.info = GraphQLResolveInfo()
+
+    async def test_a_set_of_totals(self):
+        loader = ReportLevelTotalsLoader.loader(self.info)
+        totals = await asyncio.gather(
+            loader.load(self.commit_2.id),
+            loader.load(self.commit_without_totals.id),
+            loader.load(self.commit_1.id),
+        )
+        assert totals == [self.totals_2, None, self.totals_1]
+
+    async def test_several_reports(self):
+        loader = ReportLevelTotalsLoader.loader(self.info)
+        totals = await loader.load(self.commit_with_reports.id)
+        assert totals == self.first_totals
+        assert totals.report == self.commit_with_reports.commitreport
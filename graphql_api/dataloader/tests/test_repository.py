@@ -0,0 +1,47 @@
+import asyncio
+
+from django.test import TransactionTestCase
+
+from codecov_auth.tests.factories import OwnerFactory
+from core.tests.factories import RepositoryFactory
+from graphql_api.dataloader.repository import RepositoryLoader
+
+
+class Request:
+    def __init__(self, current_owner):
+        self.current_owner = current_owner
+
+
+class GraphQLResolveInfo:
+    def __init__(self, current_owner):
+        self.context = {"request": Request(current_owner)}
+
+
+class RepositoryLoaderTestCase(TransactionTestCase):
+    def setUp(self):
+        self.owner = OwnerFactory()
+        self.other_owner = OwnerFactory()
+        self.repo_1 = RepositoryFactory(author=self.owner, name="repo-1")
+        self.repo_2 = RepositoryFactory(author=self.owner, name="repo-2")
+        self.public_repo = RepositoryFactory(
+            author=self.other_owner, name="repo-1", private=False
+        )
+        self.private_repo = RepositoryFactory(
+            author=self.other_owner, name="repo-2", private=True
+        )
+        self.info = GraphQLResolveInfo(self.owner)
+
+    async def test_a_set_of_repositories(self):
+        loader = RepositoryLoader.loader(self.info)
+        repositories = await asyncio.gather(
+            loader.load((self.other_owner.ownerid, "repo-1")),
+            loader.load((self.owner.ownerid, "repo-2")),
+            loader.load((self.owner.ownerid, "repo-1")),
+            loader.load((self.owner.ownerid, "missing")),
+        )
+        assert repositories == [self.public_repo, self.repo_2, self.repo_1, None]
+
+    async def test_repository_not_viewable(self):
+        loader = RepositoryLoader.loader(self.info)
+        repository = await loader.load((self.other_owner.ownerid, "repo-2"))
+        assert repository is None
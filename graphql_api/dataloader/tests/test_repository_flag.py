@@ -0,0 +1,28 @@
+import asyncio
+
+from django.test import TransactionTestCase
+
+from graphql_api.dataloader.repository_flag import RepositoryFlagLoader
+from reports.tests.factories import RepositoryFlagFactory
+
+
+class GraphQLResolveInfo:
+    def __init__(self):
+        self.context = {}
+
+
+class RepositoryFlagLoaderTestCase(TransactionTestCase):
+    def setUp(self):
+        self.flags = [
+            RepositoryFlagFactory(flag_name="unit"),
+            RepositoryFlagFactory(flag_name="integration"),
+        ]
+        self.info = GraphQLResolveInfo()
+
+    async def test_a_set_of_flags(self):
+        loader = RepositoryFlagLoader.loader(self.info)
+        flags = await asyncio.gather(
+            loader.load(self.flags[1].id),
+            loader.load(self.flags[0].id),
+        )
+        assert [flag.flag_name for flag in flags] == ["integration", "unit"]
@@ -0,0 +1,314 @@
+import hashlib
+import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from inspect import isawaitable
+from typing import Callable, Collection, Hashable, List, Optional, Type
+
+from ariadne.extensions import ExtensionManager
+from ariadne.graphql import (
+    handle_graphql_errors,
+    handle_query_result,
+    validate_data,
+    validate_query,
+)
+from ariadne.types import GraphQLResult, ValidationRules
+from ariadne.validation.introspection_disabled import IntrospectionDisabledRule
+from django.conf import settings
+from graphql import (
+    ASTValidationRule,
+    DocumentNode,
+    GraphQLError,
+    GraphQLSchema,
+    execute,
+    parse,
+    specified_rules,
+)
+from redis.exceptions import RedisError
+from shared.metrics import metrics
+
+from services.redis_configuration import get_redis_connection
+
+log = logging.getLogger(__name__)
+
+
+def query_hash(query: str) -> str:
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+
+class DocumentCache:
+    """
+    LRU cache of parsed and validated GraphQL documents keyed by the sha256 hash
+    of their query and the rules they were validated with.  Validation depends on
+    the schema so each schema gets its own cache.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._schemas = weakref.WeakKeyDictionary()
+
+    def get(self, schema: GraphQLSchema, key: Hashable) -> Optional[DocumentNode]:
+        with self._lock:
+            documents = self._schemas.get(schema)
+            if documents is None or key not in documents:
+                metrics.incr("graphql.document_cache.miss")
+                return None
+            documents.move_to_end(key)
+            metrics.incr("graphql.document_cache.hit")
+            return documents[key]
+
+    def set(self, schema: GraphQLSchema, key: Hashable, document: DocumentNode):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            documents = self._schemas.setdefault(schema, OrderedDict())
+            documents[key] = document
+            documents.move_to_end(key)
+            while len(documents) > self.max_size:
+                documents.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._schemas.clear()
+
+
+document_cache = DocumentCache(max_size=settings.GRAPHQL_DOCUMENT_CACHE_SIZE)
+
+
+def document_cache_key(
+    data: dict,
+    introspection: bool = True,
+    validation_rules: Optional[Collection[Type[ASTValidationRule]]] = None,
+    query_validator: Optional[Callable] = None,
+) -> Hashable:
+    rules = tuple(validation_rules) if validation_rules is not None else None
+    return (query_hash(data["query"]), introspection, rules, query_validator)
+
+
+def _validate(
+    schema: GraphQLSchema,
+    document: DocumentNode,
+    introspection: bool,
+    validation_rules: Optional[Collection[Type[ASTValidationRule]]],
+    query_validator: Optional[Callable],
+) -> List[GraphQLError]:
+    if query_validator is None:
+        return validate_query(
+            schema, document, validation_rules, enable_introspection=introspection
+        )
+    # same rules as `validate_query` but run through the custom validator
+    rules = tuple(validation_rules or ())
+    if not introspection:
+        rules += (IntrospectionDisabledRule,)
+    return query_validator(schema, document, rules=specified_rules + rules)
+
+
+def get_document(
+    schema: GraphQLSchema,
+    data: dict,
+    introspection: bool = True,
+    *,
+    context_value=None,
+    validation_rules: Optional[ValidationRules] = None,
+    query_validator: Optional[Callable] = None,
+) -> Optional[DocumentNode]:
+    """
+    Returns the parsed and validated document for the query in `data`, or `None`
+    if the query can't be parsed or is invalid (in which case the errors should be
+    reported by running the query through ariadne as usual).
+
+    `validation_rules` and `query_validator` are the ones ariadne would use:
+    rules given as a callable are resolved for every request (they may depend on
+    it) so those documents are never cached.
+    """
+    try:
+        validate_data(data)
+    except GraphQLError:
+        return None
+
+    key = None
+    if not callable(validation_rules):
+        key = document_cache_key(data, introspection, validation_rules, query_validator)
+        document = document_cache.get(schema, key)
+        if document is not None:
+            return document
+
+    try:
+        document = parse(data["query"])
+    except GraphQLError:
+        return None
+
+    rules = validation_rules
+    if callable(rules):
+        rules = rules(context_value, document, data)
+    if _validate(schema, document, introspection, rules, query_validator):
+        return None
+
+    if key is not None:
+        document_cache.set(schema, key, document)
+    return document
+
+
+async def execute_document(
+    schema: GraphQLSchema,
+    document: DocumentNode,
+    data: dict,
+    *,
+    context_value=None,
+    root_value=None,
+    debug: bool = False,
+    logger=None,
+    error_formatter=None,
+    extensions=None,
+    middleware=None,
+    middleware_manager_class=None,
+    execution_context_class=None,
+    introspection: bool = True,
+    validation_rules=None,
+    query_validator=None,
+    **kwargs,
+) -> GraphQLResult:
+    """
+    Executes an already validated document.  This mirrors `ariadne.graphql` minus
+    the parsing and validation steps: `document` must come from `get_document`
+    called with the same `introspection`, `validation_rules` and `query_validator`.
+    """
+    extension_manager = ExtensionManager(extensions, context_value)
+
+    with extension_manager.request():
+        try:
+            result = execute(
+                schema,
+                document,
+                root_value=root_value,
+                context_value=context_value,
+                variable_values=data.get("variables"),
+                operation_name=data.get("operationName"),
+                execution_context_class=execution_context_class,
+                middleware=extension_manager.as_middleware_manager(
+                    middleware, middleware_manager_class
+                ),
+                **kwargs,
+            )
+            if isawaitable(result):
+                result = await result
+        except GraphQLError as error:
+            return handle_graphql_errors(
+                [error],
+                logger=logger,
+                error_formatter=error_formatter,
+                debug=debug,
+                extension_manager=extension_manager,
+            )
+
+        return handle_query_result(
+            result,
+            logger=logger,
+            error_formatter=error_formatter,
+            debug=debug,
+            extension_manager=extension_manager,
+        )
+
+
+class PersistedQueryError(Exception):
+    def __init__(self, message: str, code: str, status: int = 400):
+        self.message = message
+        self.code = code
+        self.status = status
+
+    @property
+    def response_data(self) -> dict:
+        return {
+            "errors": [{"message": self.message, "extensions": {"code": self.code}}]
+        }
+
+
+PERSISTED_QUERIES_INDEX_KEY = "graphql/persisted-queries"
+
+
+def _persisted_query_key(sha256_hash: str) -> str:
+    return f"graphql/persisted-queries/{sha256_hash}"
+
+
+def _persist_query(redis, sha256_hash: str, query: str):
+    """
+    Stores `query` and records it in a sorted set (scored by the time it was last
+    registered) so that only the `GRAPHQL_PERSISTED_QUERIES_MAX_ENTRIES` most
+    recently registered queries are kept.
+    """
+    now = time.time()
+    ttl = settings.GRAPHQL_PERSISTED_QUERIES_TTL
+    pipeline = redis.pipeline()
+    pipeline.set(_persisted_query_key(sha256_hash), query, ex=ttl)
+    pipeline.zadd(PERSISTED_QUERIES_INDEX_KEY, {sha256_hash: now})
+    # the queries themselves expire on their own
+    pipeline.zremrangebyscore(PERSISTED_QUERIES_INDEX_KEY, "-inf", now - ttl)
+    pipeline.zcard(PERSISTED_QUERIES_INDEX_KEY)
+    count = pipeline.execute()[-1]
+
+    excess = count - settings.GRAPHQL_PERSISTED_QUERIES_MAX_ENTRIES
+    if excess > 0:
+        evicted = redis.zpopmin(PERSISTED_QUERIES_INDEX_KEY, excess)
+        if evicted:
+            hashes = (h.decode() if isinstance(h, bytes) else h for h, _ in evicted)
+            redis.delete(*(_persisted_query_key(h) for h in hashes))
+            metrics.incr("graphql.persisted_query.evicted", len(evicted))
+
+
+def resolve_persisted_query(data: dict, can_register: bool = False) -> dict:
+    """
+    Implements automatic persisted queries: a client can send the sha256 hash of
+    its query in `extensions.persistedQuery` instead of the query itself.  When the
+    hash is unknown the client is expected to retry with both the hash and the
+    query, which is then stored for subsequent requests if `can_register` (only
+    authenticated users can add queries).  Other clients still get their query
+    executed, they just have to keep sending it.
+    """
+    persisted_query = (data.get("extensions") or {}).get("persistedQuery")
+    if not isinstance(persisted_query, dict):
+        return data
+
+    if persisted_query.get("version") != 1:
+        raise PersistedQueryError(
+            "Unsupported persisted query version", "PERSISTED_QUERY_NOT_SUPPORTED"
+        )
+    sha256_hash = persisted_query.get("sha256Hash")
+    if not isinstance(sha256_hash, str):
+        raise PersistedQueryError(
+            "Missing persisted query hash", "PERSISTED_QUERY_NOT_SUPPORTED"
+        )
+
+    query = data.get("query")
+    if query and query_hash(query) != sha256_hash:
+        raise PersistedQueryError(
+            "Provided sha does not match query", "INVALID_SHA256_HASH"
+        )
+    if query and not can_register:
+        return data
+
+    try:
+        redis = get_redis_connection()
+        if query:
+            _persist_query(redis, sha256_hash, query)
+            return data
+
+        query = redis.get(_persisted_query_key(sha256_hash))
+    except RedisError:
+        log.warning("Failed to access persisted queries", exc_info=True)
+        if data.get("query"):
+            return data
+        query = None
+
+    if query is None:
+        metrics.incr("graphql.persisted_query.miss")
+        raise PersistedQueryError(
+            "PersistedQueryNotFound", "PERSISTED_QUERY_NOT_FOUND", status=200
+        )
+
+    metrics.incr("graphql.persisted_query.hit")
+    if isinstance(query, bytes):
+        query = query.decode("utf-8")
+    return {**data, "query": query}
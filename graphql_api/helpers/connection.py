@@ -1,11 +1,13 @@
 import enum
 from dataclasses import dataclass
 from functools import cached_property
+from typing import Tuple
 
 from cursor_pagination import CursorPage, CursorPaginator
 from django.db.models import QuerySet
 
 from codecov.db import sync_to_async
+from graphql_api.helpers.count import count_queryset
 from graphql_api.types.enums import OrderingDirection
 
 
@@ -15,6 +17,7 @@ def build_connection_graphql(connection_name, type_node):
         type {connection_name} {{
           edges: [{edge_name}]
           totalCount: Int!
+          totalCountIsEstimate: Boolean!
           pageInfo: PageInfo!
         }}
 
@@ -46,9 +49,19 @@ class Connection:
             for pos, node in enumerate(self.page)
         ]
 
+    @cached_property
+    def count(self) -> Tuple[int, bool]:
+        return count_queryset(self.queryset)
+
     @sync_to_async
     def total_count(self, *args, **kwargs):
-        return self.queryset.count()
+        total_count, _ = self.count
+        return total_count
+
+    @sync_to_async
+    def total_count_is_estimate(self, *args, **kwargs):
+        _, is_estimate = self.count
+        return is_estimate
 
     @cached_property
     def start_cursor(self):
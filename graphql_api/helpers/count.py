@@ -0,0 +1,95 @@
+import hashlib
+import json
+import logging
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import QuerySet
+from redis.exceptions import RedisError
+from shared.metrics import metrics
+
+from services.redis_configuration import get_redis_connection
+
+log = logging.getLogger(__name__)
+
+
+def estimate_count(queryset: QuerySet) -> Optional[int]:
+    """
+    Returns the number of rows Postgres estimates the queryset to return (or
+    `None` when the database can't estimate it).  Unfiltered querysets use the
+    table statistics and filtered ones use the query planner's estimate.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            # Inspired by https://code.djangoproject.com/ticket/8408
+            db_table = queryset.model._meta.db_table
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE relname = %s", (db_table,)
+            )
+            result = cursor.fetchone()
+            # `reltuples` is negative for tables that were never analyzed
+            if result and result[0] >= 0:
+                return int(result[0])
+
+        sql, params = queryset.order_by().query.sql_with_params()
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _count_cache_key(queryset: QuerySet) -> str:
+    sql, params = queryset.order_by().query.sql_with_params()
+    signature = hashlib.sha256(f"{sql}:{params!r}".encode("utf-8")).hexdigest()
+    return f"graphql/count/{signature}"
+
+
+def _cached_count(queryset: QuerySet) -> int:
+    key = _count_cache_key(queryset)
+    redis = get_redis_connection()
+    try:
+        count = redis.get(key)
+    except RedisError:
+        log.warning("Failed to read cached count", exc_info=True)
+        count = None
+
+    if count is not None:
+        metrics.incr("graphql.count_cache.hit")
+        return int(count)
+
+    metrics.incr("graphql.count_cache.miss")
+    count = queryset.count()
+    try:
+        redis.set(key, count, ex=settings.GRAPHQL_COUNT_CACHE_TTL)
+    except RedisError:
+        log.warning("Failed to cache count", exc_info=True)
+    return count
+
+
+def count_queryset(queryset: QuerySet) -> Tuple[int, bool]:
+    """
+    Counts the records of the queryset.  Returns the count and whether it's an
+    estimate: querysets that the database estimates above
+    `GRAPHQL_COUNT_ESTIMATE_THRESHOLD` rows get the estimate, others an exact
+    count that is cached for `GRAPHQL_COUNT_CACHE_TTL` seconds.
+    """
+    if queryset.query.is_empty():
+        return 0, False
+
+    threshold = settings.GRAPHQL_COUNT_ESTIMATE_THRESHOLD
+    if threshold:
+        estimate = estimate_count(queryset)
+        if estimate is not None and estimate >= threshold:
+            metrics.incr("graphql.count.estimate")
+            return estimate, True
+
+    if settings.GRAPHQL_COUNT_CACHE_TTL:
+        return _cached_count(queryset), False
+
+    return queryset.count(), False
@@ -2,6 +2,7 @@ from typing import Iterable, Optional
 
 from graphql.language.ast import (
     FragmentSpreadNode,
+    InlineFragmentNode,
     Node,
     SelectionSetNode,
     VariableNode,
@@ -38,6 +39,18 @@ class LookaheadNode:
             args[name] = value
         return args
 
+    @property
+    def selections(self) -> list[str]:
+        """
+        Return the names of this node's selected fields (with fragments expanded)
+        """
+        if not self.node.selection_set:
+            return []
+        return [
+            selection.name.value
+            for selection in self._flatten_selections(self.node.selection_set)
+        ]
+
     def __getitem__(self, name: str) -> Optional["LookaheadNode"]:
         """
         Get a child node by name
@@ -55,8 +68,9 @@ class LookaheadNode:
         for selection in selection_set.selections:
             if isinstance(selection, FragmentSpreadNode):
                 fragment = self.info.fragments[selection.name.value]
-                for selection in fragment.selection_set.selections:
-                    selections.append(selection)
+                selections += self._flatten_selections(fragment.selection_set)
+            elif isinstance(selection, InlineFragmentNode):
+                selections += self._flatten_selections(selection.selection_set)
             else:
                 selections.append(selection)
         return selections
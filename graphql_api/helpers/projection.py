@@ -0,0 +1,149 @@
+import enum
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Mapping, Optional
+
+from django.db.models import QuerySet
+
+from graphql_api.helpers.lookahead import LookaheadNode
+
+# the `__typename` meta field can be selected on any type
+META_FIELDS = {"__typename"}
+
+
+@dataclass
+class Projection:
+    """
+    Describes which columns and annotations are needed to resolve the fields of
+    a GraphQL type backed by a model.
+
+    `fields` maps GraphQL field names to the names they read from the model
+    instance.  Names found in `annotations` are added by calling the matching
+    queryset method and all other names are columns.  A field missing from
+    `fields` could read anything, so selecting it disables the projection.
+    """
+
+    columns: Iterable[str]
+    fields: Mapping[str, Iterable[str]]
+    annotations: Mapping[str, Callable[[QuerySet], QuerySet]] = field(
+        default_factory=dict
+    )
+
+    def projects(self, node: Optional[LookaheadNode]) -> bool:
+        """
+        Whether `apply` restricts the columns for the fields selected on `node`,
+        in which case the instances must not be shared with other resolvers
+        (e.g. by priming a dataloader) since they could read unloaded columns.
+        """
+        selections = set(node.selections) - META_FIELDS if node else set()
+        return selections.issubset(self.fields.keys())
+
+    def apply(
+        self,
+        queryset: QuerySet,
+        node: Optional[LookaheadNode],
+        ordering: Iterable[str] = (),
+    ) -> QuerySet:
+        """
+        Restricts `queryset` to the columns and annotations needed by the fields
+        selected on `node` (the lookahead node of the objects in the queryset)
+        and by the given `ordering`.
+        """
+        if not self.projects(node):
+            return self._annotate(queryset, self.annotations.keys())
+
+        selections = set(node.selections) - META_FIELDS if node else set()
+        names = {*self.columns}
+        for name in ordering:
+            names.add(name.value if isinstance(name, enum.Enum) else name)
+        for selection in selections:
+            names.update(self.fields[selection])
+
+        queryset = self._annotate(queryset, names & self.annotations.keys())
+        return queryset.only(*(names - self.annotations.keys()))
+
+    def _annotate(self, queryset: QuerySet, names: Iterable[str]) -> QuerySet:
+        # several annotation names are usually added by the same queryset method
+        methods = []
+        for name in names:
+            if self.annotations[name] not in methods:
+                methods.append(self.annotations[name])
+        for method in methods:
+            queryset = method(queryset)
+        return queryset
+
+
+def _with_recent_coverage(queryset: QuerySet) -> QuerySet:
+    return queryset.with_recent_coverage()
+
+
+def _with_latest_commit_at(queryset: QuerySet) -> QuerySet:
+    return queryset.with_latest_commit_at()
+
+
+repository_projection = Projection(
+    columns=("repoid", "author"),
+    fields={
+        "name": ("name",),
+        "active": ("active",),
+        "activated": ("activated",),
+        "private": ("private",),
+        "coverage": ("recent_coverage",),
+        "coverageSha": ("coverage_sha",),
+        "hits": ("hits",),
+        "misses": ("misses",),
+        "lines": ("lines",),
+        "latestCommitAt": ("true_latest_commit_at",),
+        "updatedAt": ("updatestamp",),
+        "author": ("author",),
+        "defaultBranch": ("branch",),
+        "graphToken": ("image_token",),
+        "branch": (),
+        "commit": (),
+        "pull": (),
+        "pulls": (),
+        "commits": (),
+        "branches": ("branch",),
+    },
+    annotations={
+        "recent_coverage": _with_recent_coverage,
+        "coverage": _with_recent_coverage,
+        "coverage_sha": _with_recent_coverage,
+        "hits": _with_recent_coverage,
+        "misses": _with_recent_coverage,
+        "lines": _with_recent_coverage,
+        "true_latest_commit_at": _with_latest_commit_at,
+        "latest_commit_at": _with_latest_commit_at,
+    },
+)
+
+commit_projection = Projection(
+    columns=("id", "commitid", "repository"),
+    fields={
+        "state": ("state",),
+        "message": ("message",),
+        "createdAt": ("timestamp",),
+        "commitid": ("commitid",),
+        "author": ("author",),
+        "totals": (),
+        "parent": ("parent_commit_id",),
+        "pullId": ("pullid",),
+        "branchName": ("branch",),
+        "ciPassed": ("ci_passed",),
+    },
+)
+
+pull_projection = Projection(
+    columns=("id", "pullid", "repository"),
+    fields={
+        "behindBy": ("behind_by",),
+        "behindByCommit": ("behind_by_commit",),
+        "title": ("title",),
+        "state": ("state",),
+        "pullId": ("pullid",),
+        "author": ("author",),
+        "updatestamp": ("updatestamp",),
+        "head": ("head",),
+        "comparedTo": ("compared_to",),
+        "commits": (),
+    },
+)
@@ -0,0 +1,47 @@
+from unittest.mock import patch
+
+import fakeredis
+from django.test import TransactionTestCase, override_settings
+
+from core.models import Repository
+from core.tests.factories import RepositoryFactory
+from graphql_api.helpers.count import count_queryset
+
+
+class CountQuerysetTests(TransactionTestCase):
+    def setUp(self):
+        self.repos = [RepositoryFactory(name=f"repo-{i}") for i in range(3)]
+
+    def test_exact_count(self):
+        assert count_queryset(Repository.objects.all()) == (3, False)
+        assert count_queryset(Repository.objects.filter(name="repo-1")) == (1, False)
+        assert count_queryset(Repository.objects.none()) == (0, False)
+
+    @override_settings(GRAPHQL_COUNT_CACHE_TTL=60)
+    @patch("graphql_api.helpers.count.get_redis_connection")
+    def test_cached_count(self, get_redis_connection):
+        get_redis_connection.return_value = fakeredis.FakeStrictRedis()
+
+        queryset = Repository.objects.filter(name__startswith="repo")
+        assert count_queryset(queryset) == (3, False)
+
+        RepositoryFactory(name="repo-3")
+        # served from the cache
+        assert count_queryset(queryset) == (3, False)
+        # a different queryset has its own count
+        assert count_queryset(queryset.filter(private=True)) == (4, False)
+
+    @override_settings(GRAPHQL_COUNT_ESTIMATE_THRESHOLD=1)
+    @patch("graphql_api.helpers.count.estimate_count")
+    def test_estimated_count(self, estimate_count):
+        estimate_count.return_value = 1000
+        assert count_queryset(Repository.objects.all()) == (1000, True)
+
+        estimate_count.return_value = 0
+        assert count_queryset(Repository.objects.all()) == (3, False)
+
+    @override_settings(GRAPHQL_COUNT_ESTIMATE_THRESHOLD=1)
+    def test_estimated_count_from_planner(self):
+        count, is_estimate = count_queryset(Repository.objects.filter(private=True))
+        assert is_estimate
+        assert count >= 1
@@ -0,0 +1,97 @@
+from django.test import TestCase
+from graphql import parse
+
+from core.models import Repository
+from core.tests.factories import RepositoryFactory
+from graphql_api.helpers.lookahead import lookahead
+from graphql_api.helpers.projection import commit_projection, repository_projection
+from graphql_api.types.enums import RepositoryOrdering
+
+
+class GraphQLResolveInfo:
+    def __init__(self, query):
+        document = parse(query)
+        self.field_nodes = [document.definitions[0].selection_set.selections[0]]
+        self.fragments = {
+            definition.name.value: definition for definition in document.definitions[1:]
+        }
+        self.variable_values = {}
+
+
+def node(query):
+    return lookahead(GraphQLResolveInfo(query), ("edges", "node"))
+
+
+class RepositoryProjectionTests(TestCase):
+    def test_only_selected_columns(self):
+        queryset = repository_projection.apply(
+            Repository.objects.all(),
+            node("{ repositories { edges { node { __typename name } } } }"),
+        )
+        assert queryset.query.annotations == {}
+        loaded, defer = queryset.query.deferred_loading
+        assert not defer
+        assert set(loaded) == {"repoid", "author", "name"}
+
+    def test_fragments(self):
+        queryset = repository_projection.apply(
+            Repository.objects.all(),
+            node(
+                """
+                { repositories { edges { node { ...F ... on Repository { private } } } } }
+                fragment F on Repository { coverage }
+                """
+            ),
+        )
+        assert "recent_coverage" in queryset.query.annotations
+        assert "true_latest_commit_at" not in queryset.query.annotations
+        loaded, _ = queryset.query.deferred_loading
+        assert set(loaded) == {"repoid", "author", "private"}
+
+    def test_ordering_annotation(self):
+        queryset = repository_projection.apply(
+            Repository.objects.all(),
+            node("{ repositories { totalCount } }"),
+            ordering=(RepositoryOrdering.COMMIT_DATE,),
+        )
+        assert "latest_commit_at" in queryset.query.annotations
+        assert "coverage" not in queryset.query.annotations
+
+    def test_unknown_field(self):
+        queryset = repository_projection.apply(
+            Repository.objects.all(),
+            node("{ repositories { edges { node { name yaml } } } }"),
+        )
+        assert "recent_coverage" in queryset.query.annotations
+        assert "true_latest_commit_at" in queryset.query.annotations
+        assert queryset.query.deferred_loading == (frozenset(), True)
+
+    def test_branches(self):
+        queryset = repository_projection.apply(
+            Repository.objects.all(),
+            node(
+                "{ repositories { edges { node { name branches { totalCount } } } } }"
+            ),
+        )
+        loaded, _ = queryset.query.deferred_loading
+        assert set(loaded) == {"repoid", "author", "name", "branch"}
+
+    def test_queryset_results(self):
+        repo = RepositoryFactory(name="test-repo")
+        queryset = repository_projection.apply(
+            Repository.objects.all(),
+            node("{ repositories { edges { node { name coverage } } } }"),
+        )
+        assert [(r.name, r.recent_coverage) for r in queryset] == [(repo.name, None)]
+
+
+class CommitProjectionTests(TestCase):
+    def test_projects(self):
+        assert commit_projection.projects(
+            node("{ commits { edges { node { commitid parent { message } } } } }")
+        )
+        assert not commit_projection.projects(
+            node(
+                "{ commits { edges { node { commitid compareWithParent { state } } } } }"
+            )
+        )
@@ -0,0 +1,417 @@
+"""
+Incremental delivery (`@defer` and `@stream`) of GraphQL responses.
+
+graphql-core 3.2 doesn't implement incremental delivery, so it is emulated on
+top of the regular executor: the deferred fragments and streamed fields are
+removed from the operation, which is executed first, and each of them is then
+executed as a separate operation that only selects the path leading to it.
+The ancestors along those paths are resolved again, but they are cheap.  Each
+execution gets its own context since the resolvers store request state in it
+(e.g. the comparison of a pull) and the deferred parts run concurrently.
+
+Only queries can be delivered incrementally: the deferred parts of a mutation
+would run it again.
+
+Responses are sent as `multipart/mixed` following the incremental delivery
+over HTTP proposal: an initial payload with `hasNext: true` followed by
+payloads with `incremental` results.
+"""
+
+import asyncio
+import json
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple, Union
+
+from ariadne.types import GraphQLResult
+from graphql import (
+    DocumentNode,
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    GraphQLInterfaceType,
+    GraphQLNamedType,
+    GraphQLObjectType,
+    GraphQLSchema,
+    InlineFragmentNode,
+    NamedTypeNode,
+    OperationDefinitionNode,
+    OperationType,
+    SelectionSetNode,
+    get_named_type,
+    get_nullable_type,
+    get_operation_ast,
+    is_list_type,
+)
+from graphql.execution.execute import get_field_def
+from graphql.execution.values import get_directive_values, get_variable_values
+
+MULTIPART_CONTENT_TYPE = 'multipart/mixed; boundary="-"'
+
+# a field along the path to a deferred selection, or the type condition of a
+# fragment along that path
+PathSegment = Union[FieldNode, Optional[NamedTypeNode]]
+
+
+@dataclass
+class DeferredPart:
+    path: List[PathSegment]
+    # an inline fragment for `@defer` and the field for `@stream`
+    selection: Union[InlineFragmentNode, FieldNode]
+    label: Optional[str] = None
+    # the number of items of a streamed list sent with the initial payload
+    initial_count: Optional[int] = None
+
+    @property
+    def is_stream(self) -> bool:
+        return self.initial_count is not None
+
+
+@dataclass
+class IncrementalPlan:
+    # the operation without the deferred parts
+    document: DocumentNode
+    parts: List[DeferredPart]
+
+
+def accepts_multipart(request) -> bool:
+    return "multipart/mixed" in request.headers.get("Accept", "")
+
+
+def _response_key(field: FieldNode) -> str:
+    return field.alias.value if field.alias else field.name.value
+
+
+class _Planner:
+    def __init__(self, schema: GraphQLSchema, fragments: dict, variables: dict):
+        self.schema = schema
+        self.defer = schema.get_directive("defer")
+        self.stream = schema.get_directive("stream")
+        self.fragments = fragments
+        self.variables = variables
+        self.parts = []
+
+    def _directive(self, directive, node) -> Optional[dict]:
+        if directive is None:
+            return None
+        values = get_directive_values(directive, node, self.variables)
+        if values is None or not values.get("if", True):
+            return None
+        return values
+
+    def selection_set(
+        self,
+        selection_set: Optional[SelectionSetNode],
+        path: List[PathSegment],
+        parent_type: Optional[GraphQLNamedType],
+    ) -> Optional[SelectionSetNode]:
+        if selection_set is None:
+            return None
+
+        selections = []
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                field_def = None
+                if isinstance(parent_type, (GraphQLObjectType, GraphQLInterfaceType)):
+                    field_def = get_field_def(self.schema, parent_type, selection)
+                field_type = field_def.type if field_def else None
+
+                stream = self._directive(self.stream, selection)
+                if stream is not None and not is_list_type(
+                    get_nullable_type(field_type)
+                ):
+                    raise GraphQLError(
+                        "@stream can only be used on list fields", selection
+                    )
+                if stream is not None:
+                    self.parts.append(
+                        DeferredPart(
+                            path=path,
+                            selection=selection,
+                            label=stream.get("label"),
+                            initial_count=max(stream.get("initialCount") or 0, 0),
+                        )
+                    )
+                    if not stream.get("initialCount"):
+                        continue
+                selections.append(
+                    FieldNode(
+                        alias=selection.alias,
+                        name=selection.name,
+                        arguments=selection.arguments,
+                        directives=selection.directives,
+                        selection_set=self.selection_set(
+                            selection.selection_set,
+                            [*path, selection],
+                            get_named_type(field_type),
+                        ),
+                    )
+                )
+                continue
+
+            if isinstance(selection, FragmentSpreadNode):
+                fragment: FragmentDefinitionNode = self.fragments[selection.name.value]
+                # the fragment is inlined since the same fragment could be
+                # deferred in one place and not in another
+                fragment_selection = InlineFragmentNode(
+                    type_condition=fragment.type_condition,
+                    directives=selection.directives,
+                    selection_set=fragment.selection_set,
+                )
+            else:
+                fragment_selection = selection
+            fragment_type = parent_type
+            if fragment_selection.type_condition is not None:
+                fragment_type = self.schema.get_type(
+                    fragment_selection.type_condition.name.value
+                )
+
+            defer = self._directive(self.defer, fragment_selection)
+            if defer is not None:
+                self.parts.append(
+                    DeferredPart(
+                        path=path,
+                        selection=InlineFragmentNode(
+                            type_condition=fragment_selection.type_condition,
+                            directives=[
+                                directive
+                                for directive in fragment_selection.directives
+                                if directive.name.value != "defer"
+                            ],
+                            selection_set=fragment_selection.selection_set,
+                        ),
+                        label=defer.get("label"),
+                    )
+                )
+                continue
+
+            selections.append(
+                InlineFragmentNode(
+                    type_condition=fragment_selection.type_condition,
+                    directives=fragment_selection.directives,
+                    selection_set=self.selection_set(
+                        fragment_selection.selection_set,
+                        [*path, fragment_selection.type_condition],
+                        fragment_type,
+                    ),
+                )
+            )
+
+        return SelectionSetNode(selections=selections)
+
+
+def plan_incremental_delivery(
+    schema: GraphQLSchema, document: DocumentNode, data: dict
+) -> Optional[IncrementalPlan]:
+    """
+    Splits the (validated) document into the operation to execute first and the
+    deferred parts.  Returns `None` if nothing is deferred, and raises a
+    `GraphQLError` if something is deferred in an operation that isn't a query
+    or if `@stream` is used on a field that isn't a list.
+    """
+    operation = get_operation_ast(document, data.get("operationName"))
+    if operation is None:
+        return None
+
+    variables = get_variable_values(
+        schema, operation.variable_definitions or [], data.get("variables") or {}
+    )
+    if isinstance(variables, list):
+        # invalid variables are reported by the regular execution
+        return None
+
+    fragments = {
+        definition.name.value: definition
+        for definition in document.definitions
+        if isinstance(definition, FragmentDefinitionNode)
+    }
+    planner = _Planner(schema, fragments, variables)
+    selection_set = planner.selection_set(
+        operation.selection_set, [], schema.get_root_type(operation.operation)
+    )
+    if not planner.parts:
+        return None
+    if operation.operation != OperationType.QUERY:
+        raise GraphQLError(
+            "@defer and @stream are only supported on queries", operation
+        )
+
+    return IncrementalPlan(
+        document=_document(document, operation, selection_set),
+        parts=planner.parts,
+    )
+
+
+def _document(
+    document: DocumentNode,
+    operation: OperationDefinitionNode,
+    selection_set: SelectionSetNode,
+) -> DocumentNode:
+    operation = OperationDefinitionNode(
+        operation=operation.operation,
+        name=operation.name,
+        variable_definitions=operation.variable_definitions,
+        directives=operation.directives,
+        selection_set=selection_set,
+    )
+    fragments = [
+        definition
+        for definition in document.definitions
+        if isinstance(definition, FragmentDefinitionNode)
+    ]
+    return DocumentNode(definitions=[operation, *fragments])
+
+
+def part_document(
+    document: DocumentNode, data: dict, part: DeferredPart
+) -> DocumentNode:
+    """
+    Returns an operation that selects the deferred part along its path.
+    """
+    operation = get_operation_ast(document, data.get("operationName"))
+    selection = part.selection
+    for segment in reversed(part.path):
+        if isinstance(segment, FieldNode):
+            selection = FieldNode(
+                alias=segment.alias,
+                name=segment.name,
+                arguments=segment.arguments,
+                directives=segment.directives,
+                selection_set=SelectionSetNode(selections=[selection]),
+            )
+        else:
+            selection = InlineFragmentNode(
+                type_condition=segment,
+                directives=[],
+                selection_set=SelectionSetNode(selections=[selection]),
+            )
+    return _document(document, operation, SelectionSetNode(selections=[selection]))
+
+
+def _objects_at_path(
+    data, path: List[PathSegment], response_path: list
+) -> List[Tuple[list, dict]]:
+    """
+    Returns the objects (and their response paths) found in `data` at `path`,
+    with lists expanded into their items.
+    """
+    if data is None:
+        return []
+    if isinstance(data, list):
+        return [
+            obj
+            for idx, item in enumerate(data)
+            for obj in _objects_at_path(item, path, [*response_path, idx])
+        ]
+    if not path:
+        return [(response_path, data)]
+
+    segment, path = path[0], path[1:]
+    if isinstance(segment, FieldNode):
+        key = _response_key(segment)
+        if key not in data:
+            return []
+        return _objects_at_path(data[key], path, [*response_path, key])
+    return _objects_at_path(data, path, response_path)
+
+
+def prepare_initial_result(result: dict, parts: List[DeferredPart]) -> List[dict]:
+    """
+    Moves the streamed items past their `initialCount` out of the initial result
+    (and sets the streamed fields that were not executed to empty lists).
+    Returns the incremental results for the moved items.
+    """
+    incremental = []
+    # nested streamed fields first, so that the moved items include their changes
+    for part in reversed(parts):
+        if not part.is_stream:
+            continue
+        key = _response_key(part.selection)
+        for response_path, obj in _objects_at_path(result.get("data"), part.path, []):
+            if not part.initial_count:
+                obj[key] = []
+            elif isinstance(obj.get(key), list):
+                items = obj[key][part.initial_count :]
+                obj[key] = obj[key][: part.initial_count]
+                if items:
+                    incremental.append(
+                        _incremental_result(
+                            part,
+                            {"items": items},
+                            [*response_path, key, part.initial_count],
+                        )
+                    )
+    return incremental
+
+
+def _incremental_result(part: DeferredPart, payload: dict, path: list) -> dict:
+    result = {**payload, "path": path}
+    if part.label is not None:
+        result["label"] = part.label
+    return result
+
+
+def part_results(part: DeferredPart, result: dict) -> List[dict]:
+    """
+    Returns the incremental results of an executed deferred part.
+    """
+    incremental = []
+    for response_path, obj in _objects_at_path(result.get("data"), part.path, []):
+        if part.is_stream:
+            key = _response_key(part.selection)
+            items = obj.get(key)
+            if not isinstance(items, list):
+                continue
+            incremental.append(
+                _incremental_result(part, {"items": items}, [*response_path, key, 0])
+            )
+        elif obj:
+            incremental.append(_incremental_result(part, {"data": obj}, response_path))
+
+    if result.get("errors") and incremental:
+        incremental[0]["errors"] = result["errors"]
+    elif result.get("errors"):
+        incremental.append(_incremental_result(part, {"errors": result["errors"]}, []))
+    return incremental
+
+
+def _multipart_chunk(payload: dict) -> bytes:
+    return (
+        "\r\n---\r\nContent-Type: application/json; charset=utf-8\r\n\r\n"
+        + json.dumps(payload)
+    ).encode("utf-8")
+
+
+async def incremental_response(
+    execute: Callable[[DocumentNode], Awaitable[GraphQLResult]],
+    plan: IncrementalPlan,
+    document: DocumentNode,
+    data: dict,
+) -> AsyncIterator[bytes]:
+    """
+    Yields the multipart response body.  `execute` runs a document and returns
+    the `(success, result)` tuple of ariadne.
+    """
+    _, result = await execute(plan.document)
+    stream_results = prepare_initial_result(result, plan.parts)
+
+    parts = [
+        part for part in plan.parts if not part.is_stream or not part.initial_count
+    ]
+    yield _multipart_chunk({**result, "hasNext": bool(parts or stream_results)})
+
+    if stream_results:
+        yield _multipart_chunk({"incremental": stream_results, "hasNext": bool(parts)})
+
+    async def execute_part(part: DeferredPart):
+        _, part_result = await execute(part_document(document, data, part))
+        return part_results(part, part_result)
+
+    pending = [asyncio.ensure_future(execute_part(part)) for part in parts]
+    for idx, future in enumerate(asyncio.as_completed(pending)):
+        incremental = await future
+        has_next = idx < len(pending) - 1
+        if incremental or not has_next:
+            yield _multipart_chunk({"incremental": incremental, "hasNext": has_next})
+
+    yield b"\r\n-----\r\n"
@@ -0,0 +1,91 @@
+import hashlib
+import json
+from typing import Iterable, Optional
+
+from graphql import DocumentNode, OperationType, get_operation_ast
+
+from codecov_auth.models import Owner
+from core.models import Branch, Commit, Pull, Repository
+from reports.models import ReportLevelTotals, RepositoryFlag
+from services.response_cache import (
+    commit_tag,
+    measurements_tag,
+    owner_measurements_tag,
+    owner_tag,
+    repository_tag,
+    totals_tag,
+)
+
+from .documents import query_hash
+
+
+def response_cache_key(request, document: DocumentNode, data: dict) -> Optional[str]:
+    """
+    Returns the key under which the response to `data` is cached for the current
+    owner, or `None` if the operation should not be cached (only queries are).
+    """
+    operation = get_operation_ast(document, data.get("operationName"))
+    if operation is None or operation.operation != OperationType.QUERY:
+        return None
+
+    current_owner = request.current_owner
+    key = json.dumps(
+        [
+            query_hash(data["query"]),
+            data.get("operationName"),
+            data.get("variables"),
+            request.resolver_match.kwargs["service"],
+            current_owner.ownerid if current_owner else None,
+        ],
+        sort_keys=True,
+    )
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+# the fields whose resolvers read measurements from Timescale (the flag
+# measurements are loaded by `Repository.flags`)
+MEASUREMENT_FIELDS = {
+    "Owner": {"measurements"},
+    "Repository": {"measurements", "flags"},
+    "Flag": {"measurements", "percentCovered", "percentChange"},
+}
+
+
+def cache_tags(obj, field_name: Optional[str] = None) -> Iterable[str]:
+    """
+    Returns the tags of the model `obj` whose field `field_name` is resolved.
+    Objects that aren't tagged (e.g. dicts) are only as fresh as the tagged
+    objects they were resolved from.
+    """
+    tags = []
+    if isinstance(obj, Owner):
+        tags.append(owner_tag(obj.ownerid))
+        if field_name in MEASUREMENT_FIELDS["Owner"]:
+            tags.append(owner_measurements_tag(obj.ownerid))
+    elif isinstance(obj, Repository):
+        tags.append(repository_tag(obj.repoid))
+        if field_name in MEASUREMENT_FIELDS["Repository"]:
+            tags.append(measurements_tag(obj.repoid))
+    elif isinstance(obj, Commit):
+        tags.append(commit_tag(obj.repository_id, obj.commitid))
+    elif isinstance(obj, (Branch, Pull)):
+        tags.append(repository_tag(obj.repository_id))
+    elif isinstance(obj, ReportLevelTotals):
+        tags.append(totals_tag(obj.id))
+    elif isinstance(obj, RepositoryFlag):
+        if field_name in MEASUREMENT_FIELDS["Flag"]:
+            tags.append(measurements_tag(obj.repository_id))
+    return tags
+
+
+class CacheTagsMiddleware:
+    """
+    Collects the cache tags of every model whose fields are resolved into the
+    `cache_tags` set of the request context.
+    """
+
+    def resolve(self, next, root, info, **kwargs):
+        tags = info.context.get("cache_tags")
+        if tags is not None and root is not None:
+            tags.update(cache_tags(root, info.field_name))
+        return next(root, info, **kwargs)
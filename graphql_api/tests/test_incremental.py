@@ -0,0 +1,179 @@
+import json
+from inspect import isawaitable
+
+from ariadne import ObjectType, format_error, make_executable_schema
+from ariadne.graphql import handle_query_result
+from django.test import TestCase
+from graphql import GraphQLError, execute, parse
+
+from ..incremental import incremental_response, plan_incremental_delivery
+
+types = """
+directive @defer(label: String, if: Boolean! = true) on FRAGMENT_SPREAD | INLINE_FRAGMENT
+directive @stream(label: String, if: Boolean! = true, initialCount: Int = 0) on FIELD
+
+type Query {
+    repository(name: String!): Repository
+}
+
+type Mutation {
+    touch(name: String!): Repository
+}
+
+type Repository {
+    name: String
+    coverage: Float
+    pulls: [Pull]
+}
+
+type Pull {
+    pullId: Int
+    files: [String]
+}
+"""
+
+query_bindable = ObjectType("Query")
+query_bindable.set_field("repository", lambda _, info, name: {"name": name})
+
+mutation_bindable = ObjectType("Mutation")
+mutation_bindable.set_field("touch", lambda _, info, name: {"name": name})
+
+repository_bindable = ObjectType("Repository")
+repository_bindable.set_field("coverage", lambda *_: 75.5)
+repository_bindable.set_field(
+    "pulls", lambda *_: [{"pullId": 1}, {"pullId": 2}, {"pullId": 3}]
+)
+
+pull_bindable = ObjectType("Pull")
+pull_bindable.set_field(
+    "files", lambda pull, *_: [f"{pull['pullId']}-{idx}" for idx in range(3)]
+)
+
+schema = make_executable_schema(
+    types, query_bindable, mutation_bindable, repository_bindable, pull_bindable
+)
+
+
+async def run(query, variables=None):
+    data = {"query": query, "variables": variables}
+    document = parse(query)
+    plan = plan_incremental_delivery(schema, document, data)
+    if plan is None:
+        return None
+
+    async def execute_document(document):
+        result = execute(schema, document, variable_values=variables)
+        if isawaitable(result):
+            result = await result
+        return handle_query_result(
+            result, logger=None, error_formatter=format_error, debug=False
+        )
+
+    body = b""
+    async for chunk in incremental_response(execute_document, plan, document, data):
+        body += chunk
+
+    parts = body.decode("utf-8").split("\r\n---")
+    assert parts[0] == ""
+    assert parts[-1] == "--\r\n"
+    return [json.loads(part.split("\r\n\r\n", 1)[1]) for part in parts[1:-1]]
+
+
+class IncrementalDeliveryTestCase(TestCase):
+    async def test_nothing_deferred(self):
+        assert await run('{ repository(name: "a") { name } }') is None
+
+    async def test_defer(self):
+        query = """
+            query($defer: Boolean!) {
+                repository(name: "a") {
+                    name
+                    ... @defer(label: "coverage", if: $defer) { coverage }
+                    pulls { pullId ...Files @defer }
+                }
+            }
+            fragment Files on Pull { files }
+        """
+        assert await run(query, {"defer": False}) == [
+            {
+                "data": {
+                    "repository": {
+                        "name": "a",
+                        "coverage": 75.5,
+                        "pulls": [{"pullId": 1}, {"pullId": 2}, {"pullId": 3}],
+                    }
+                },
+                "hasNext": True,
+            },
+            {
+                "incremental": [
+                    {
+                        "data": {"files": ["1-0", "1-1", "1-2"]},
+                        "path": ["repository", "pulls", 0],
+                    },
+                    {
+                        "data": {"files": ["2-0", "2-1", "2-2"]},
+                        "path": ["repository", "pulls", 1],
+                    },
+                    {
+                        "data": {"files": ["3-0", "3-1", "3-2"]},
+                        "path": ["repository", "pulls", 2],
+                    },
+                ],
+                "hasNext": False,
+            },
+        ]
+
+        initial, *incremental = await run(query, {"defer": True})
+        assert initial["data"] == {
+            "repository": {
+                "name": "a",
+                "pulls": [{"pullId": 1}, {"pullId": 2}, {"pullId": 3}],
+            }
+        }
+        assert {
+            "data": {"coverage": 75.5},
+            "path": ["repository"],
+            "label": "coverage",
+        } in [result for payload in incremental for result in payload["incremental"]]
+        assert incremental[-1]["hasNext"] is False
+
+    async def test_stream(self):
+        query = """
+            {
+                repository(name: "a") {
+                    pulls @stream(initialCount: 1) { pullId files @stream }
+                }
+            }
+        """
+        initial, *incremental = await run(query)
+        assert initial == {
+            "data": {"repository": {"pulls": [{"pullId": 1, "files": []}]}},
+            "hasNext": True,
+        }
+        results = [
+            result for payload in incremental for result in payload["incremental"]
+        ]
+        assert {
+            "items": [{"pullId": 2, "files": []}, {"pullId": 3, "files": []}],
+            "path": ["repository", "pulls", 1],
+        } in results
+        assert {
+            "items": ["1-0", "1-1", "1-2"],
+            "path": ["repository", "pulls", 0, "files", 0],
+        } in results
+
+    async def test_defer_in_mutation(self):
+        query = 'mutation { touch(name: "a") { name ... @defer { coverage } } }'
+        with self.assertRaises(GraphQLError):
+            await run(query)
+        assert (
+            await run(
+                'mutation { touch(name: "a") { ... @defer(if: false) { name } } }'
+            )
+            is None
+        )
+
+    async def test_stream_on_non_list_field(self):
+        with self.assertRaises(GraphQLError):
+            await run('{ repository(name: "a") { name @stream } }')
@@ -7,6 +7,7 @@ from shared.utils.sessions import Session
 
 from core.tests.factories import CommitFactory
 from services.path import Dir, File
+from services.report import ReportRegistry
 
 from ..types.commit.commit import resolve_path_contents
 from ..types.errors.errors import MissingCoverage, UnknownPath
@@ -85,7 +86,9 @@ class TestPathContents(TransactionTestCase):
     def setUp(self):
         request = Mock()
         request.user = Mock()
-        self.info = MockContext({"request": request})
+        self.info = MockContext(
+            {"request": request, "report_registry": ReportRegistry()}
+        )
         self.commit = CommitFactory()
 
     @patch("services.report.build_report_from_commit")
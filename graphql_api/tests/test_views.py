@@ -1,11 +1,17 @@
 import json
+from unittest.mock import patch
 
+import fakeredis
 from ariadne import ObjectType, make_executable_schema
 from django.test import RequestFactory, TestCase, override_settings
 from django.urls import ResolverMatch
+from graphql import GraphQLError, ValidationRule, parse
 
 from codecov.commands.exceptions import Unauthorized
+from codecov.db import sync_to_async
+from codecov_auth.tests.factories import UserFactory
 
+from ..documents import document_cache, document_cache_key, query_hash
 from ..views import AsyncGraphqlView
 from .helper import GraphQLTestHelper
 
@@ -26,15 +32,19 @@ def generate_schema_that_raise_with(exception):
 
 
 class ArianeViewTestCase(GraphQLTestHelper, TestCase):
-    async def do_query(self, schema, query="{ failing }"):
-        view = AsyncGraphqlView.as_view(schema=schema)
+    async def do_query(
+        self, schema, query="{ failing }", data=None, user=None, **view_kwargs
+    ):
+        view = AsyncGraphqlView.as_view(schema=schema, **view_kwargs)
         request = RequestFactory().post(
-            "/graphql/gh", {"query": query}, content_type="application/json"
+            "/graphql/gh",
+            data if data is not None else {"query": query},
+            content_type="application/json",
         )
         match = ResolverMatch(func=lambda: None, args=(), kwargs={"service": "github"})
 
         request.resolver_match = match
-        request.user = None
+        request.user = user
         request.current_owner = None
         res = await view(request, service="gh")
         return json.loads(res.content)
@@ -74,3 +84,181 @@ class ArianeViewTestCase(GraphQLTestHelper, TestCase):
             data["errors"][0]["message"]
             == "Cannot query field 'fieldThatDoesntExist' on type 'Query'."
         )
+
+    @override_settings(DEBUG=False)
+    async def test_caches_parsed_documents(self):
+        document_cache.clear()
+        schema = generate_schema_that_raise_with(Unauthorized())
+
+        with patch("graphql_api.documents.parse", wraps=parse) as parse_mock:
+            first = await self.do_query(schema)
+            second = await self.do_query(schema)
+
+        assert first == second
+        assert second["errors"][0]["type"] == "Unauthorized"
+        parse_mock.assert_called_once()
+
+    @override_settings(DEBUG=False)
+    async def test_invalid_documents_are_not_cached(self):
+        document_cache.clear()
+        schema = generate_schema_that_raise_with(Unauthorized())
+        await self.do_query(schema, " { fieldThatDoesntExist }")
+        assert (
+            document_cache.get(
+                schema, document_cache_key({"query": " { fieldThatDoesntExist }"})
+            )
+            is None
+        )
+
+    @override_settings(DEBUG=False)
+    async def test_documents_are_validated_with_the_view_rules(self):
+        document_cache.clear()
+        schema = generate_schema_that_raise_with(Unauthorized())
+        await self.do_query(schema)
+
+        class NoFailingRule(ValidationRule):
+            def enter_field(self, node, *_):
+                if node.name.value == "failing":
+                    self.report_error(GraphQLError("failing is not allowed"))
+
+        data = await self.do_query(schema, validation_rules=[NoFailingRule])
+        assert data["errors"][0]["message"] == "failing is not allowed"
+
+        data = await self.do_query(schema, validation_rules=lambda *_: [NoFailingRule])
+        assert data["errors"][0]["message"] == "failing is not allowed"
+
+    async def test_incremental_delivery_is_not_streamed_under_wsgi(self):
+        schema = make_executable_schema(
+            """
+            directive @defer(label: String, if: Boolean! = true) on INLINE_FRAGMENT
+            type Query { a: Int, b: Int }
+            """,
+            ObjectType("Query"),
+        )
+        view = AsyncGraphqlView.as_view(schema=schema)
+        request = RequestFactory().post(
+            "/graphql/gh",
+            {"query": "{ a ... @defer { b } }"},
+            content_type="application/json",
+            HTTP_ACCEPT="multipart/mixed",
+        )
+        request.resolver_match = ResolverMatch(
+            func=lambda: None, args=(), kwargs={"service": "github"}
+        )
+        request.user = None
+        request.current_owner = None
+        res = await view(request, service="gh")
+        assert res["Content-Type"] == "application/json"
+        assert json.loads(res.content) == {"data": {"a": None, "b": None}}
+
+    @override_settings(GRAPHQL_PERSISTED_QUERIES_ENABLED=True)
+    @patch("graphql_api.documents.get_redis_connection")
+    async def test_persisted_query(self, get_redis_connection):
+        get_redis_connection.return_value = fakeredis.FakeStrictRedis()
+        user = await sync_to_async(UserFactory)()
+        schema = generate_schema_that_raise_with(Unauthorized())
+        query = "{ failing }"
+        extensions = {"persistedQuery": {"version": 1, "sha256Hash": query_hash(query)}}
+
+        data = await self.do_query(schema, data={"extensions": extensions})
+        assert data["errors"][0]["message"] == "PersistedQueryNotFound"
+        assert data["errors"][0]["extensions"]["code"] == "PERSISTED_QUERY_NOT_FOUND"
+
+        data = await self.do_query(
+            schema, data={"query": query, "extensions": extensions}, user=user
+        )
+        assert data["errors"][0]["type"] == "Unauthorized"
+
+        data = await self.do_query(schema, data={"extensions": extensions})
+        assert data["errors"][0]["type"] == "Unauthorized"
+
+    @override_settings(GRAPHQL_PERSISTED_QUERIES_ENABLED=True)
+    @patch("graphql_api.documents.get_redis_connection")
+    async def test_persisted_query_anonymous_registration(self, get_redis_connection):
+        get_redis_connection.return_value = fakeredis.FakeStrictRedis()
+        schema = generate_schema_that_raise_with(Unauthorized())
+        query = "{ failing }"
+        extensions = {"persistedQuery": {"version": 1, "sha256Hash": query_hash(query)}}
+
+        data = await self.do_query(
+            schema, data={"query": query, "extensions": extensions}
+        )
+        assert data["errors"][0]["type"] == "Unauthorized"
+
+        data = await self.do_query(schema, data={"extensions": extensions})
+        assert data["errors"][0]["extensions"]["code"] == "PERSISTED_QUERY_NOT_FOUND"
+
+    @override_settings(
+        GRAPHQL_PERSISTED_QUERIES_ENABLED=True,
+        GRAPHQL_PERSISTED_QUERIES_MAX_ENTRIES=1,
+    )
+    @patch("graphql_api.documents.get_redis_connection")
+    async def test_persisted_query_max_entries(self, get_redis_connection):
+        get_redis_connection.return_value = fakeredis.FakeStrictRedis()
+        user = await sync_to_async(UserFactory)()
+        schema = generate_schema_that_raise_with(Unauthorized())
+        queries = ["{ failing }", "query Failing { failing }"]
+        extensions = [
+            {"persistedQuery": {"version": 1, "sha256Hash": query_hash(query)}}
+            for query in queries
+        ]
+
+        for query, ext in zip(queries, extensions):
+            await self.do_query(
+                schema, data={"query": query, "extensions": ext}, user=user
+            )
+
+        data = await self.do_query(schema, data={"extensions": extensions[0]})
+        assert data["errors"][0]["extensions"]["code"] == "PERSISTED_QUERY_NOT_FOUND"
+        data = await self.do_query(schema, data={"extensions": extensions[1]})
+        assert data["errors"][0]["type"] == "Unauthorized"
+
+    @override_settings(GRAPHQL_PERSISTED_QUERIES_ENABLED=True)
+    @patch("graphql_api.documents.get_redis_connection")
+    async def test_persisted_query_hash_mismatch(self, get_redis_connection):
+        get_redis_connection.return_value = fakeredis.FakeStrictRedis()
+        schema = generate_schema_that_raise_with(Unauthorized())
+        extensions = {"persistedQuery": {"version": 1, "sha256Hash": "abc"}}
+
+        data = await self.do_query(
+            schema, data={"query": "{ failing }", "extensions": extensions}
+        )
+        assert data["errors"][0]["extensions"]["code"] == "INVALID_SHA256_HASH"
+
+    @override_settings(GRAPHQL_RESPONSE_CACHE_ENABLED=True)
+    @patch("services.response_cache.get_redis_connection")
+    async def test_response_cache(self, get_redis_connection):
+        get_redis_connection.return_value = fakeredis.FakeStrictRedis()
+        calls = []
+
+        query_bindable = ObjectType("Query")
+
+        @query_bindable.field("counter")
+        def resolve_counter(*_):
+            calls.append(1)
+            return len(calls)
+
+        mutation_bindable = ObjectType("Mutation")
+
+        @mutation_bindable.field("increment")
+        def resolve_increment(*_):
+            calls.append(1)
+            return len(calls)
+
+        schema = make_executable_schema(
+            """
+            type Query { counter: Int }
+            type Mutation { increment: Int }
+            """,
+            query_bindable,
+            mutation_bindable,
+        )
+
+        assert await self.do_query(schema, "{ counter }") == {"data": {"counter": 1}}
+        assert await self.do_query(schema, "{ counter }") == {"data": {"counter": 1}}
+
+        # mutations are never cached
+        data = await self.do_query(schema, "mutation { increment }")
+        assert data == {"data": {"increment": 2}}
+        data = await self.do_query(schema, "mutation { increment }")
+        assert data == {"data": {"increment": 3}}
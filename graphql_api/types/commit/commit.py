@@ -5,7 +5,6 @@ from ariadne import ObjectType, convert_kwargs_to_snake_case
 
 import services.components as components
 import services.path as path_service
-import services.report as report_service
 from codecov.db import sync_to_async
 from core.models import Commit
 from graphql_api.actions.commits import commit_uploads
@@ -14,6 +13,7 @@ from graphql_api.actions.path_contents import sort_path_contents
 from graphql_api.dataloader.commit import CommitLoader
 from graphql_api.dataloader.comparison import ComparisonLoader
 from graphql_api.dataloader.owner import OwnerLoader
+from graphql_api.dataloader.report_level_totals import ReportLevelTotalsLoader
 from graphql_api.helpers.connection import (
     queryset_to_connection,
     queryset_to_connection_sync,
@@ -38,7 +38,8 @@ commit_bindable.set_alias("branchName", "branch")
 @commit_bindable.field("coverageFile")
 @sync_to_async
 def resolve_file(commit, info, path, flags=None):
-    commit_report = commit.full_report.filter(flags=flags)
+    report_registry = info.context["report_registry"]
+    commit_report = report_registry.get(commit).filter(flags=flags)
     file_report = commit_report.get(path)
 
     return {
@@ -52,8 +53,11 @@ def resolve_file(commit, info, path, flags=None):
 
 @commit_bindable.field("totals")
 def resolve_totals(commit, info):
-    command = info.context["executor"].get_command("commit")
-    return command.fetch_totals(commit)
+    if "reports" in getattr(commit, "_prefetched_objects_cache", {}):
+        # the report totals were prefetched along with the commit (see `CommitLoader`)
+        command = info.context["executor"].get_command("commit")
+        return command.fetch_totals(commit)
+    return ReportLevelTotalsLoader.loader(info).load(commit.id)
 
 
 @commit_bindable.field("author")
@@ -131,7 +135,7 @@ async def resolve_compare_with_parent(commit: Commit, info, **kwargs):
 @commit_bindable.field("flagNames")
 @sync_to_async
 def resolve_flags(commit, info, **kwargs):
-    return commit.full_report.flags.keys()
+    return info.context["report_registry"].get(commit).flags.keys()
 
 
 @commit_bindable.field("criticalFiles")
@@ -143,7 +147,11 @@ def resolve_critical_files(commit: Commit, info, **kwargs) -> List[CriticalFile]
     The results of this resolver could be different than that of the
     `repository.criticalFiles` resolver.
     """
-    profiling_summary = ProfilingSummary(commit.repository, commit_sha=commit.commitid)
+    profiling_summary = ProfilingSummary(
+        commit.repository,
+        commit_sha=commit.commitid,
+        report_registry=info.context["report_registry"],
+    )
     return profiling_summary.critical_files
 
 
@@ -160,7 +168,7 @@ def resolve_path_contents(commit: Commit, info, path: str = None, filters=None):
     current_owner = info.context["request"].current_owner
 
     # TODO: Might need to add reports here filtered by flags in the future
-    commit_report = report_service.build_report_from_commit(
+    commit_report = info.context["report_registry"].get(
         commit, report_class=ReadOnlyReport
     )
     if not commit_report:
@@ -177,7 +185,7 @@ def resolve_path_contents(commit: Commit, info, path: str = None, filters=None):
         search_term=search_value,
     )
 
-    if len(report_paths.paths) == 0:
+    if not report_paths.exists():
         # we do not know about this path
 
         if path_service.provider_path_exists(path, commit, current_owner) is False:
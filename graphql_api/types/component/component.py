@@ -24,6 +24,6 @@ def resolve_name(component: Component, info) -> str:
 @sync_to_async
 def resolve_totals(component: Component, info) -> Optional[ReportTotals]:
     commit: Commit = info.context["component_commit"]
-    report = commit.full_report
+    report = info.context["report_registry"].get(commit)
     filtered_report = component_filtered_report(report, component)
     return filtered_report.totals
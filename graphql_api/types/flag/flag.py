@@ -1,7 +1,7 @@
 from datetime import datetime
-from typing import Iterable
+from typing import Iterable, Optional
 
-from ariadne import ObjectType
+from ariadne import ObjectType, convert_kwargs_to_snake_case
 
 from reports.models import RepositoryFlag
 from timeseries.helpers import fill_sparse_measurements
@@ -42,10 +42,18 @@ def resolve_percent_change(flag: RepositoryFlag, info) -> float:
 
 
 @flag_bindable.field("measurements")
+@convert_kwargs_to_snake_case
 def resolve_measurements(
-    flag: RepositoryFlag, info, interval: Interval, after: datetime, before: datetime
+    flag: RepositoryFlag,
+    info,
+    interval: Interval,
+    after: datetime,
+    before: datetime,
+    max_points: Optional[int] = None,
 ) -> Iterable[MeasurementSummary]:
     measurements = info.context["flag_measurements"].get(flag.pk, [])
     if len(measurements) == 0:
         return []
-    return fill_sparse_measurements(measurements, interval, after, before)
+    return fill_sparse_measurements(
+        measurements, interval, after, before, max_points=max_points
+    )
@@ -8,7 +8,7 @@ from shared.torngit.exceptions import TorngitClientError
 from codecov.db import sync_to_async
 from graphql_api.types.errors import ProviderError, UnknownPath
 from graphql_api.types.segment_comparison.segment_comparison import SegmentComparisons
-from services.comparison import Comparison, MissingComparisonReport, Segment
+from services.comparison import Comparison, MissingComparisonReport
 from services.profiling import ProfilingSummary
 
 impacted_file_bindable = ObjectType("ImpactedFile")
@@ -71,24 +71,18 @@ def resolve_segments(
         return SegmentComparisons(results=[])
 
     comparison: Comparison = info.context["comparison"]
-    try:
-        comparison.validate()
-    except MissingComparisonReport:
-        return SegmentComparisons(results=[])
     path = impacted_file.head_name
 
     try:
-        file_comparison = comparison.get_file_comparison(
-            path, with_src=True, bypass_max_diff=True
-        )
+        segments = comparison.get_file_segments(path)
+    except MissingComparisonReport:
+        return SegmentComparisons(results=[])
     except TorngitClientError as e:
         if e.code == 404:
             return UnknownPath(f"path does not exist: {path}")
         else:
             return ProviderError()
 
-    segments = file_comparison.segments
-
     if filters.get("has_unintended_changes") is True:
         # segments with no diff changes and at least 1 unintended change
         segments = [segment for segment in segments if segment.has_unintended_changes]
@@ -15,6 +15,8 @@ from graphql_api.helpers.connection import (
     build_connection_graphql,
     queryset_to_connection,
 )
+from graphql_api.helpers.lookahead import lookahead
+from graphql_api.helpers.projection import repository_projection
 from graphql_api.types.enums import OrderingDirection, RepositoryOrdering
 
 me = ariadne_load_local_graphql(__file__, "me.graphql")
@@ -42,13 +44,16 @@ def resolve_owner(user, _):
 @convert_kwargs_to_snake_case
 def resolve_viewable_repositories(
     current_user,
-    _,
+    info,
     filters=None,
     ordering=RepositoryOrdering.ID,
     ordering_direction=OrderingDirection.ASC,
     **kwargs,
 ):
     queryset = search_repos(current_user, filters)
+    queryset = repository_projection.apply(
+        queryset, lookahead(info, ("edges", "node")), ordering=(ordering,)
+    )
     return queryset_to_connection(
         queryset,
         ordering=(ordering, RepositoryOrdering.ID),
@@ -12,11 +12,14 @@ from codecov_auth.helpers import current_user_part_of_org
 from codecov_auth.models import Owner
 from core.models import Repository
 from graphql_api.actions.repository import list_repository_for_owner
+from graphql_api.dataloader.repository import RepositoryLoader
 from graphql_api.helpers.ariadne import ariadne_load_local_graphql
 from graphql_api.helpers.connection import (
     build_connection_graphql,
     queryset_to_connection,
 )
+from graphql_api.helpers.lookahead import lookahead
+from graphql_api.helpers.projection import repository_projection
 from graphql_api.types.enums import OrderingDirection, RepositoryOrdering
 from graphql_api.types.errors.errors import NotFoundError, OwnerNotActivatedError
 from plan.constants import TrialStatus
@@ -43,6 +46,9 @@ def resolve_repositories(
 ):
     current_owner = info.context["request"].current_owner
     queryset = list_repository_for_owner(current_owner, owner, filters)
+    queryset = repository_projection.apply(
+        queryset, lookahead(info, ("edges", "node")), ordering=(ordering,)
+    )
     return queryset_to_connection(
         queryset,
         ordering=(ordering, RepositoryOrdering.ID),
@@ -82,8 +88,9 @@ def resolve_trial_status(owner: Owner, info) -> TrialStatus:
 
 @owner_bindable.field("repository")
 async def resolve_repository(owner, info, name):
-    command = info.context["executor"].get_command("repository")
-    repository: Optional[Repository] = await command.fetch_repository(owner, name)
+    repository: Optional[Repository] = await RepositoryLoader.loader(info).load(
+        (owner.ownerid, name)
+    )
 
     if repository is None:
         return NotFoundError()
@@ -97,22 +104,27 @@ async def resolve_repository(owner, info, name):
         if not is_activated:
             return OwnerNotActivatedError()
 
-    info.context["profiling_summary"] = ProfilingSummary(repository)
+    info.context["profiling_summary"] = ProfilingSummary(
+        repository, report_registry=info.context["report_registry"]
+    )
 
     return repository
 
 
 @owner_bindable.field("repositoryDeprecated")
 async def resolve_repository_deprecated(owner, info, name):
-    command = info.context["executor"].get_command("repository")
-    repository: Optional[Repository] = await command.fetch_repository(owner, name)
+    repository: Optional[Repository] = await RepositoryLoader.loader(info).load(
+        (owner.ownerid, name)
+    )
 
     if repository is not None:
         current_owner = info.context["request"].current_owner
         if repository.private:
             await sync_to_async(activation.try_auto_activate)(owner, current_owner)
 
-        info.context["profiling_summary"] = ProfilingSummary(repository)
+        info.context["profiling_summary"] = ProfilingSummary(
+            repository, report_registry=info.context["report_registry"]
+        )
 
     return repository
 
@@ -149,6 +161,7 @@ def resolve_org_default_org_username(owner: Owner, info, **kwargs) -> int:
 
 
 @owner_bindable.field("measurements")
+@convert_kwargs_to_snake_case
 @sync_to_async
 def resolve_measurements(
     owner: Owner,
@@ -157,6 +170,7 @@ def resolve_measurements(
     after: Optional[datetime] = None,
     before: Optional[datetime] = None,
     repos: Optional[List[str]] = None,
+    max_points: Optional[int] = None,
 ) -> Iterable[MeasurementSummary]:
     current_owner = info.context["request"].current_owner
 
@@ -177,6 +191,7 @@ def resolve_measurements(
         interval,
         start_date=after,
         end_date=before,
+        max_points=max_points,
     )
 
 
@@ -8,6 +8,8 @@ from graphql_api.dataloader.commit import CommitLoader
 from graphql_api.dataloader.comparison import ComparisonLoader
 from graphql_api.dataloader.owner import OwnerLoader
 from graphql_api.helpers.connection import queryset_to_connection_sync
+from graphql_api.helpers.lookahead import lookahead
+from graphql_api.helpers.projection import commit_projection
 from graphql_api.types.comparison.comparison import MissingBaseCommit, MissingHeadCommit
 from graphql_api.types.enums import OrderingDirection, PullRequestState
 from services.comparison import ComparisonReport, PullRequestComparison
@@ -71,6 +73,9 @@ async def resolve_compare_with_base(pull, info, **kwargs):
 @sync_to_async
 def resolve_commits(pull: Pull, info, **kwargs):
     queryset = pull_commits(pull)
+    queryset = commit_projection.apply(
+        queryset, lookahead(info, ("edges", "node")), ordering=("timestamp",)
+    )
 
     return queryset_to_connection_sync(
         queryset,
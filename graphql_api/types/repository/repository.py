@@ -11,13 +11,16 @@ from codecov.db import sync_to_async
 from core.models import Repository
 from graphql_api.actions.commits import repo_commits
 from graphql_api.actions.flags import flag_measurements, flags_for_repo
+from graphql_api.dataloader.branch import BranchLoader
 from graphql_api.dataloader.commit import CommitLoader
 from graphql_api.dataloader.owner import OwnerLoader
+from graphql_api.dataloader.pull import PullLoader
 from graphql_api.helpers.connection import (
     queryset_to_connection,
     queryset_to_connection_sync,
 )
 from graphql_api.helpers.lookahead import lookahead
+from graphql_api.helpers.projection import commit_projection, pull_projection
 from graphql_api.types.enums import OrderingDirection
 from graphql_api.types.errors.errors import NotFoundError, OwnerNotActivatedError
 from services.profiling import CriticalFile, ProfilingSummary
@@ -70,8 +73,7 @@ def resolve_lines(repository: Repository, info) -> Optional[int]:
 
 @repository_bindable.field("branch")
 def resolve_branch(repository, info, name):
-    command = info.context["executor"].get_command("branch")
-    return command.fetch_branch(repository, name)
+    return BranchLoader.loader(info, repository.pk).load(name)
 
 
 @repository_bindable.field("author")
@@ -93,8 +95,7 @@ def resolve_upload_token(repository, info):
 
 @repository_bindable.field("pull")
 def resolve_pull(repository, info, id):
-    command = info.context["executor"].get_command("pull")
-    return command.fetch_pull_request(repository, id)
+    return PullLoader.loader(info, repository.pk).load(id)
 
 
 @repository_bindable.field("pulls")
@@ -104,6 +105,7 @@ async def resolve_pulls(
 ):
     command = info.context["executor"].get_command("pull")
     queryset = await command.fetch_pull_requests(repository, filters)
+    queryset = pull_projection.apply(queryset, lookahead(info, ("edges", "node")))
     return await queryset_to_connection(
         queryset,
         ordering=("pullid",),
@@ -116,6 +118,9 @@ async def resolve_pulls(
 @convert_kwargs_to_snake_case
 async def resolve_commits(repository, info, filters=None, **kwargs):
     queryset = await sync_to_async(repo_commits)(repository, filters)
+    node = lookahead(info, ("edges", "node"))
+    projected = commit_projection.projects(node)
+    queryset = commit_projection.apply(queryset, node, ordering=("timestamp",))
     connection = await queryset_to_connection(
         queryset,
         ordering=("timestamp",),
@@ -123,11 +128,13 @@ async def resolve_commits(repository, info, filters=None, **kwargs):
         **kwargs,
     )
 
-    for edge in connection.edges:
-        commit = edge["node"]
-        # cache all resulting commits in dataloader
-        loader = CommitLoader.loader(info, repository.repoid)
-        loader.cache(commit)
+    # cache all resulting commits in dataloader (unless some columns weren't
+    # loaded, other resolvers of the same commits could read them)
+    if not projected:
+        for edge in connection.edges:
+            commit = edge["node"]
+            loader = CommitLoader.loader(info, repository.repoid)
+            loader.cache(commit)
 
     return connection
 
@@ -172,7 +179,9 @@ def resolve_critical_files(repository: Repository, info) -> List[CriticalFile]:
 
     See the `commit.criticalFiles` resolver for commit-specific files.
     """
-    profiling_summary = ProfilingSummary(repository)
+    profiling_summary = ProfilingSummary(
+        repository, report_registry=info.context["report_registry"]
+    )
     return profiling_summary.critical_files
 
 
@@ -284,6 +293,7 @@ def resolve_flags_measurements_backfilled(repository: Repository, info) -> bool:
 
 
 @repository_bindable.field("measurements")
+@convert_kwargs_to_snake_case
 @sync_to_async
 def resolve_measurements(
     repository: Repository,
@@ -292,6 +302,7 @@ def resolve_measurements(
     before: Optional[datetime] = None,
     after: Optional[datetime] = None,
     branch: Optional[str] = None,
+    max_points: Optional[int] = None,
 ) -> Iterable[MeasurementSummary]:
     return fill_sparse_measurements(
         timeseries_helpers.repository_coverage_measurements_with_fallback(
@@ -304,6 +315,7 @@ def resolve_measurements(
         interval,
         start_date=after,
         end_date=before,
+        max_points=max_points,
     )
 
 
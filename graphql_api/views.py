@@ -1,19 +1,42 @@
-import json
 import logging
 import socket
 from asyncio import iscoroutine
 
-from ariadne import format_error
+from ariadne import format_error, graphql
+from ariadne.exceptions import HttpBadRequestError
 from ariadne_django.views import GraphQLAsyncView
 from django.conf import settings
-from django.http import HttpResponseNotAllowed
+from django.core.handlers.asgi import ASGIRequest
+from django.http import (
+    HttpResponseBadRequest,
+    HttpResponseNotAllowed,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.utils import timezone
+from graphql import GraphQLError
 from sentry_sdk import capture_exception
 
+import services.response_cache as response_cache
 from codecov.commands.exceptions import BaseException
 from codecov.commands.executor import get_executor_from_request
-from codecov.db import sync_to_async
+from codecov.db import RequestConnectionScope, sync_to_async
 from services import ServiceException
+from services.report import ReportRegistry
 
+from .documents import (
+    PersistedQueryError,
+    execute_document,
+    get_document,
+    resolve_persisted_query,
+)
+from .incremental import (
+    MULTIPART_CONTENT_TYPE,
+    accepts_multipart,
+    incremental_response,
+    plan_incremental_delivery,
+)
+from .response_cache import CacheTagsMiddleware, response_cache_key
 from .schema import schema
 
 log = logging.getLogger(__name__)
@@ -30,32 +53,136 @@ class AsyncGraphqlView(GraphQLAsyncView):
         return HttpResponseNotAllowed(["POST"])
 
     async def post(self, request, *args, **kwargs):
-        await self._get_user(request)
-
-        # get request body information
-        req_body = json.loads(request.body.decode("utf-8")) if request.body else {}
-
-        # clean up graphql query to remove new lines and extra spaces
-        req_body["query"] = req_body["query"].replace("\n", " ")
-        req_body["query"] = req_body["query"].replace("  ", "").strip()
-
-        # put everything together for log
-        log_data = {
-            "server_hostname": socket.gethostname(),
-            "request_method": request.method,
-            "request_path": request.get_full_path(),
-            "request_body": req_body,
-        }
-        log.info("GraphQL Request", extra=log_data)
-
-        # request.user = await get_user(request) or AnonymousUser()
-        return await super().post(request, *args, **kwargs)
+        async with RequestConnectionScope("graphql"):
+            await self._get_user(request)
+
+            # get request body information
+            try:
+                req_body = self.extract_data_from_request(request)
+            except HttpBadRequestError as error:
+                return HttpResponseBadRequest(error.message)
+
+            if settings.GRAPHQL_PERSISTED_QUERIES_ENABLED and isinstance(
+                req_body, dict
+            ):
+                try:
+                    req_body = await sync_to_async(resolve_persisted_query)(
+                        req_body,
+                        can_register=bool(
+                            request.user and request.user.is_authenticated
+                        ),
+                    )
+                except PersistedQueryError as error:
+                    return JsonResponse(error.response_data, status=error.status)
+
+            # clean up graphql query to remove new lines and extra spaces
+            log_body = req_body
+            if isinstance(req_body, dict) and isinstance(req_body.get("query"), str):
+                query = req_body["query"].replace("\n", " ")
+                log_body = {**req_body, "query": query.replace("  ", "").strip()}
+
+            # put everything together for log
+            log_data = {
+                "server_hostname": socket.gethostname(),
+                "request_method": request.method,
+                "request_path": request.get_full_path(),
+                "request_body": log_body,
+            }
+            log.info("GraphQL Request", extra=log_data)
+
+            # request.user = await get_user(request) or AnonymousUser()
+            graphql_kwargs = self.get_kwargs_graphql(request)
+            document = get_document(
+                self.schema,
+                req_body,
+                graphql_kwargs["introspection"],
+                context_value=graphql_kwargs["context_value"],
+                validation_rules=graphql_kwargs["validation_rules"],
+                query_validator=graphql_kwargs.get("query_validator"),
+            )
+
+            # the response can only be streamed under ASGI, WSGI servers buffer
+            # the whole body of async streaming responses
+            if (
+                document is not None
+                and isinstance(request, ASGIRequest)
+                and accepts_multipart(request)
+            ):
+                try:
+                    plan = plan_incremental_delivery(self.schema, document, req_body)
+                except GraphQLError as error:
+                    return JsonResponse({"errors": [format_error(error)]}, status=400)
+                if plan is not None:
+                    return StreamingHttpResponse(
+                        self._incremental_response(
+                            request, plan, document, req_body, graphql_kwargs
+                        ),
+                        content_type=MULTIPART_CONTENT_TYPE,
+                    )
+
+            cache_key = None
+            if document is not None and settings.GRAPHQL_RESPONSE_CACHE_ENABLED:
+                cache_key = await sync_to_async(response_cache_key)(
+                    request, document, req_body
+                )
+            if cache_key is not None:
+                result = await sync_to_async(response_cache.get_response)(cache_key)
+                if result is not None:
+                    return JsonResponse(result)
+                built_at = timezone.now()
+                # collect the tags of the objects the response is built from
+                graphql_kwargs["context_value"]["cache_tags"] = set()
+                graphql_kwargs["middleware"] = [
+                    *(graphql_kwargs["middleware"] or []),
+                    CacheTagsMiddleware(),
+                ]
+
+            if document is not None:
+                # parsed and validated (possibly cached) document
+                success, result = await execute_document(
+                    self.schema, document, req_body, **graphql_kwargs
+                )
+            else:
+                # let ariadne report the errors
+                success, result = await graphql(self.schema, req_body, **graphql_kwargs)
+
+            if cache_key is not None and success and not result.get("errors"):
+                tags = graphql_kwargs["context_value"]["cache_tags"]
+                current_owner = request.current_owner
+                if current_owner:
+                    tags.add(response_cache.owner_tag(current_owner.ownerid))
+                await sync_to_async(response_cache.set_response)(
+                    cache_key, result, tags, built_at
+                )
+
+            return JsonResponse(result, status=200 if success else 400)
+
+    async def _incremental_response(
+        self, request, plan, document, req_body, graphql_kwargs
+    ):
+        # the response is streamed after `post` returns
+        async with RequestConnectionScope("graphql"):
+
+            async def execute(part_document):
+                # the deferred parts run concurrently so each gets its own context
+                kwargs = (
+                    graphql_kwargs
+                    if part_document is plan.document
+                    else self.get_kwargs_graphql(request)
+                )
+                return await execute_document(
+                    self.schema, part_document, req_body, **kwargs
+                )
+
+            async for chunk in incremental_response(execute, plan, document, req_body):
+                yield chunk
 
     def context_value(self, request):
         return {
             "request": request,
             "service": request.resolver_match.kwargs["service"],
             "executor": get_executor_from_request(request),
+            "report_registry": ReportRegistry(),
         }
 
     def error_formatter(self, error, debug=False):
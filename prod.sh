@@ -1,10 +1,19 @@
 #!/bin/sh
 
 # Starts the production gunicorn server (no --reload)
+# Set SERVER_MODE=asgi to run the ASGI application on uvicorn workers
 echo "Starting gunicorn in production mode"
 prefix=""
 if [ -f "/usr/local/bin/berglas" ]; then
   prefix="berglas exec --"
 fi
 
-$prefix gunicorn codecov.wsgi:application --workers=2 --bind 0.0.0.0:8000 --access-logfile '-' --statsd-host ${STATSD_HOST}:${STATSD_PORT} --timeout "${GUNICORN_TIMEOUT:-600}"
+application="codecov.wsgi:application"
+worker_class=""
+if [ "$SERVER_MODE" = "asgi" ]; then
+  echo "Using ASGI with uvicorn workers"
+  application="codecov.asgi:application"
+  worker_class="--worker-class uvicorn.workers.UvicornWorker"
+fi
+
+$prefix gunicorn $application $worker_class --workers=${GUNICORN_WORKERS:-2} --bind 0.0.0.0:8000 --access-logfile '-' --statsd-host ${STATSD_HOST}:${STATSD_PORT} --timeout "${GUNICORN_TIMEOUT:-600}"
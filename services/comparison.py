@@ -1,20 +1,28 @@
 import asyncio
-import copy
 import functools
+import hashlib
 import json
 import logging
+import zlib
+from array import array
 from collections import Counter
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import List, Optional
 
 import minio
+import numpy as np
 import pytz
 from asgiref.sync import async_to_sync
+from django.conf import settings
 from django.db.models import Prefetch
 from django.utils.functional import cached_property
+from redis.exceptions import RedisError
 from shared.helpers.yaml import walk
 from shared.reports.types import ReportTotals
+from shared.storage.exceptions import FileNotInStorageError
 from shared.utils.merge import LineType, line_type
 
 import services.report as report_service
@@ -96,14 +104,16 @@ class FileComparisonTraverseManager:
             }
 
             The segment["header"], also known as the hunk-header (https://en.wikipedia.org/wiki/Diff#Unified_format),
-            is an array of strings, which is why we have to use the int() builtin function
-            to compare with self.head_ln and self.base_ln. It is used by this algorithm to
+            is an array of strings. The headers are parsed into integer offsets once, up front, and
+            are used by this algorithm to
               1. Set initial values for the self.base_ln and self.head_ln line-counters, and
               2. Detect if self.base and/or self.head refer to lines in the diff at any given time
 
             This algorithm relies on the fact that segments are returned in ascending
             order for each file, which means that the "nearest" segment to the current line
-            being traversed is located at segments[0].
+            being traversed is the one at the segment cursor. The segments are never copied
+            or modified - a cursor into the current segment and a cursor into its lines are
+            advanced instead.
 
         src -- this is the source code of the file at the head-reference, where each line
             is a cell in the array. If we are not traversing a segment, and src is provided,
@@ -111,83 +121,111 @@ class FileComparisonTraverseManager:
         """
         self.head_file_eof = head_file_eof
         self.base_file_eof = base_file_eof
-        self.segments = copy.deepcopy(segments)
+        self.segments = segments
         self.src = src
 
-        if self.segments:
+        # (base start, base end, head start, head end) offsets for each segment,
+        # end offsets are exclusive
+        self.headers = [self._parse_header(segment["header"]) for segment in segments]
+
+        # index of the segment being traversed and of its next line to be visited
+        self.segment_idx = 0
+        self.segment_line_idx = 0
+
+        if self.headers:
             # Base offsets can be 0 if files are added or removed
-            self.base_ln = min(1, int(self.segments[0]["header"][0]))
-            self.head_ln = min(1, int(self.segments[0]["header"][2]))
+            self.base_ln = min(1, self.headers[0][0])
+            self.head_ln = min(1, self.headers[0][2])
         else:
             self.base_ln, self.head_ln = 1, 1
 
+    @staticmethod
+    def _parse_header(header):
+        base_offset, head_offset = int(header[0]), int(header[2])
+        return (
+            base_offset,
+            base_offset + int(header[1] or 1),
+            head_offset,
+            head_offset + int(header[3] or 1),
+        )
+
+    def _has_segments(self):
+        return self.segment_idx < len(self.headers)
+
     def traverse_finished(self):
-        if self.segments:
+        if self._has_segments():
             return False
         if self.src:
             return self.head_ln > len(self.src)
         return self.head_ln >= self.head_file_eof and self.base_ln >= self.base_file_eof
 
     def traversing_diff(self):
-        if self.segments == []:
+        if not self._has_segments():
             return False
 
-        base_ln_within_offset = (
-            int(self.segments[0]["header"][0])
-            <= self.base_ln
-            < int(self.segments[0]["header"][0])
-            + int(self.segments[0]["header"][1] or 1)
-        )
-        head_ln_within_offset = (
-            int(self.segments[0]["header"][2])
-            <= self.head_ln
-            < int(self.segments[0]["header"][2])
-            + int(self.segments[0]["header"][3] or 1)
+        base_start, base_end, head_start, head_end = self.headers[self.segment_idx]
+        return (
+            base_start <= self.base_ln < base_end
+            or head_start <= self.head_ln < head_end
         )
-        return base_ln_within_offset or head_ln_within_offset
 
     def pop_line(self):
         if self.traversing_diff():
-            return self.segments[0]["lines"].pop(0)
+            line_value = self.segments[self.segment_idx]["lines"][self.segment_line_idx]
+            self.segment_line_idx += 1
+            return line_value
 
         if self.src:
             return self.src[self.head_ln - 1]
 
-    def apply(self, visitors):
+    def traverse(self):
         """
-        Traverses the lines in a file comparison while accounting for the diff.
+        Lazily traverses the lines in a file comparison while accounting for the diff,
+        yielding a (base_ln, head_ln, line_value, is_diff) tuple for each line.
         If a line only appears in the base file (removed in head), it is prefixed
         with '-', and we only increment self.base_ln. If a line only appears in
         the head file, it is newly added and prefixed with '+', and we only
         increment self.head_ln.
-
-        visitors -- A list of visitors applied to each line.
         """
         while not self.traverse_finished():
             line_value = self.pop_line()
             is_diff = self.traversing_diff()
+            added = is_diff and _is_added(line_value)
+            removed = is_diff and _is_removed(line_value)
+
+            yield (
+                None if added else self.base_ln,
+                None if removed else self.head_ln,
+                line_value,
+                is_diff,  # TODO(pierce): remove when upon combining diff + changes tabs in UI
+            )
 
-            for visitor in visitors:
-                visitor(
-                    None if is_diff and _is_added(line_value) else self.base_ln,
-                    None if is_diff and _is_removed(line_value) else self.head_ln,
-                    line_value,
-                    is_diff,  # TODO(pierce): remove when upon combining diff + changes tabs in UI
-                )
-
-            if is_diff and _is_added(line_value):
+            if added:
                 self.head_ln += 1
-            elif is_diff and _is_removed(line_value):
+            elif removed:
                 self.base_ln += 1
             else:
                 self.head_ln += 1
                 self.base_ln += 1
 
-            if self.segments and not self.segments[0]["lines"]:
+            if self._has_segments() and self.segment_line_idx >= len(
+                self.segments[self.segment_idx].get("lines", [])
+            ):
                 # Either the segment has no lines (and is therefore of no use)
-                # or all lines have been popped and visited, which means we are
+                # or all lines have been visited, which means we are
                 # done traversing it
-                self.segments.pop(0)
+                self.segment_idx += 1
+                self.segment_line_idx = 0
+
+    def apply(self, visitors):
+        """
+        Applies each of the visitors to every line yielded by `.traverse()`.
+
+        visitors -- A list of visitors applied to each line.
+        """
+        for base_ln, head_ln, line_value, is_diff in self.traverse():
+            for visitor in visitors:
+                visitor(base_ln, head_ln, line_value, is_diff)
 
 
 class FileComparisonVisitor:
@@ -239,14 +277,14 @@ class FileComparisonVisitor:
 
 class CreateLineComparisonVisitor(FileComparisonVisitor):
     """
-    A visitor that creates LineComparisons, and stores the
-    result in self.lines. Only operates on lines that have
+    A visitor that collects line comparisons, and stores the
+    result in self.lines (a `LineComparisons`). Only operates on lines that have
     code-values derived from segments or src in FileComparisonTraverseManager.
     """
 
     def __init__(self, base_file, head_file):
         self.base_file, self.head_file = base_file, head_file
-        self.lines = []
+        self.lines = LineComparisons()
 
     def __call__(self, base_ln, head_ln, value, is_diff):
         if value is None:
@@ -255,14 +293,12 @@ class CreateLineComparisonVisitor(FileComparisonVisitor):
         base_line, head_line = self._get_lines(base_ln, head_ln)
 
         self.lines.append(
-            LineComparison(
-                base_line=base_line,
-                head_line=head_line,
-                base_ln=base_ln,
-                head_ln=head_ln,
-                value=value,
-                is_diff=is_diff,
-            )
+            base_line=base_line,
+            head_line=head_line,
+            base_ln=base_ln,
+            head_ln=head_ln,
+            value=value,
+            is_diff=is_diff,
         )
 
 
@@ -377,6 +413,118 @@ class LineComparison:
             return ids
 
 
+# coverage types as stored in the `LineComparisons` coverage arrays
+COVERAGE_TYPES = [None, *LineType]
+COVERAGE_CODES = {
+    coverage_type: code for code, coverage_type in enumerate(COVERAGE_TYPES)
+}
+
+
+class LineComparisons(Sequence):
+    """
+    Compact, columnar representation of the lines in a FileComparison.
+
+    Line numbers, coverage types and diff flags are stored in parallel arrays
+    (one cell per line) and `LineComparison` instances are only created when a
+    line is accessed, i.e. when serializing the lines of a single segment.
+    """
+
+    # stored in the line number arrays in place of `None`
+    NO_LINE = -1
+
+    # bits of the `flags` array
+    IS_DIFF = 1
+    ADDED = 2
+    REMOVED = 4
+
+    def __init__(self):
+        self.base_ln = array("l")
+        self.head_ln = array("l")
+        self.base_coverage = array("b")
+        self.head_coverage = array("b")
+        self.flags = array("B")
+        self.values = []
+
+        # references to the underlying `ReportLine` arrays of the base and head files
+        self.base_lines = []
+        self.head_lines = []
+
+    def append(self, base_line, head_line, base_ln, head_ln, value, is_diff):
+        added = is_diff and _is_added(value)
+        removed = is_diff and _is_removed(value)
+
+        self.base_ln.append(self.NO_LINE if base_ln is None else base_ln)
+        self.head_ln.append(self.NO_LINE if head_ln is None else head_ln)
+        self.base_coverage.append(
+            COVERAGE_CODES[None if added or not base_line else line_type(base_line[0])]
+        )
+        self.head_coverage.append(
+            COVERAGE_CODES[
+                None if removed or not head_line else line_type(head_line[0])
+            ]
+        )
+        self.flags.append(
+            (self.IS_DIFF if is_diff else 0)
+            | (self.ADDED if added else 0)
+            | (self.REMOVED if removed else 0)
+        )
+        self.values.append(value)
+        self.base_lines.append(base_line)
+        self.head_lines.append(head_line)
+
+    def changed_mask(self) -> np.ndarray:
+        """
+        Returns a boolean array which is `True` for each line that was added,
+        removed or had its coverage changed.
+        """
+        if len(self) == 0:
+            return np.zeros(0, dtype=bool)
+
+        flags = np.frombuffer(self.flags, dtype=np.uint8)
+        base_coverage = np.frombuffer(self.base_coverage, dtype=np.int8)
+        head_coverage = np.frombuffer(self.head_coverage, dtype=np.int8)
+        return ((flags & (self.ADDED | self.REMOVED)) != 0) | (
+            base_coverage != head_coverage
+        )
+
+    def _line_comparison(self, idx):
+        base_ln, head_ln = self.base_ln[idx], self.head_ln[idx]
+        return LineComparison(
+            base_line=self.base_lines[idx],
+            head_line=self.head_lines[idx],
+            base_ln=None if base_ln == self.NO_LINE else base_ln,
+            head_ln=None if head_ln == self.NO_LINE else head_ln,
+            value=self.values[idx],
+            is_diff=bool(self.flags[idx] & self.IS_DIFF),
+        )
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self._line_comparison(i) for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("line comparison index out of range")
+        return self._line_comparison(idx)
+
+    def __eq__(self, other):
+        if isinstance(other, LineComparisons):
+            return (
+                self.base_ln == other.base_ln
+                and self.head_ln == other.head_ln
+                and self.flags == other.flags
+                and self.values == other.values
+                and self.base_lines == other.base_lines
+                and self.head_lines == other.head_lines
+            )
+        if isinstance(other, Sequence):
+            return list(self) == list(other)
+        return NotImplemented
+
+
 class Segment:
     """
     A segment represents a contiguous subset of lines in a file where either
@@ -393,39 +541,40 @@ class Segment:
     def segments(cls, file_comparison):
         lines = file_comparison.lines
 
-        # line numbers of interest (i.e. coverage changed or code changed)
-        line_numbers = []
-        for idx, line in enumerate(lines):
-            if (
-                line.coverage["base"] != line.coverage["head"]
-                or line.added
-                or line.removed
-            ):
-                line_numbers.append(idx)
-
-        segmented_lines = []
-        if len(line_numbers) > 0:
-            segmented_lines, last = [[]], None
-            for line_number in line_numbers:
-                if last is None or line_number - last <= cls.line_distance:
-                    segmented_lines[-1].append(line_number)
-                else:
-                    segmented_lines.append([line_number])
-                last = line_number
-
-        segments = []
-        for group in segmented_lines:
-            # padding lines before first line of interest
-            start_line_number = group[0] - cls.padding_lines
-            start_line_number = max(start_line_number, 0)
-            # padding lines after last line of interest
-            end_line_number = group[-1] + cls.padding_lines
-            end_line_number = min(end_line_number, len(lines) - 1)
-
-            segment = cls(lines[start_line_number : end_line_number + 1])
-            segments.append(segment)
+        # indexes of lines of interest (i.e. coverage changed or code changed)
+        if isinstance(lines, LineComparisons):
+            line_numbers = np.flatnonzero(lines.changed_mask())
+        else:
+            line_numbers = np.array(
+                [
+                    idx
+                    for idx, line in enumerate(lines)
+                    if line.coverage["base"] != line.coverage["head"]
+                    or line.added
+                    or line.removed
+                ],
+                dtype=np.int64,
+            )
 
-        return segments
+        if line_numbers.size == 0:
+            return []
+
+        # a new group of lines starts wherever the gap between consecutive
+        # lines of interest exceeds `line_distance`
+        breaks = np.flatnonzero(np.diff(line_numbers) > cls.line_distance)
+        group_starts = line_numbers[np.concatenate(([0], breaks + 1))]
+        group_ends = line_numbers[np.concatenate((breaks, [line_numbers.size - 1]))]
+
+        # padding lines before first and after last line of interest
+        start_line_numbers = np.maximum(group_starts - cls.padding_lines, 0)
+        end_line_numbers = np.minimum(group_ends + cls.padding_lines, len(lines) - 1)
+
+        return [
+            cls(lines[start_line_number : end_line_number + 1])
+            for start_line_number, end_line_number in zip(
+                start_line_numbers.tolist(), end_line_numbers.tolist()
+            )
+        ]
 
     def __init__(self, lines):
         self._lines = lines
@@ -478,6 +627,57 @@ class Segment:
         return False
 
 
+def _serialize_segments(segments: List[Segment]) -> bytes:
+    """
+    Compact representation of the given segments for caching.  Only the parts
+    of the base and head `ReportLine`s which are used by `LineComparison` are
+    kept (the coverage and the ids/coverage of the head line sessions).
+    """
+    return zlib.compress(
+        json.dumps(
+            [
+                [
+                    [
+                        line.base_ln,
+                        line.head_ln,
+                        line.value,
+                        line.is_diff,
+                        line.base_line[:1] if line.base_line else None,
+                        [
+                            line.head_line[0],
+                            None,
+                            [session[:2] for session in line.head_line[2] or []],
+                        ]
+                        if line.head_line
+                        else None,
+                    ]
+                    for line in segment.lines
+                ]
+                for segment in segments
+            ]
+        ).encode()
+    )
+
+
+def _deserialize_segments(data: bytes) -> List[Segment]:
+    return [
+        Segment(
+            [
+                LineComparison(
+                    base_line=base_line,
+                    head_line=head_line,
+                    base_ln=base_ln,
+                    head_ln=head_ln,
+                    value=value,
+                    is_diff=is_diff,
+                )
+                for base_ln, head_ln, value, is_diff, base_line, head_line in lines
+            ]
+        )
+        for lines in json.loads(zlib.decompress(data))
+    ]
+
+
 class FileComparison:
     def __init__(
         self,
@@ -633,11 +833,105 @@ class Comparison(object):
         self._base_commit = base_commit
         self._head_commit = head_commit
 
+        # report chunks downloaded by `prefetch`, by commit sha
+        self._prefetched_chunks = {}
+
+    def prefetch(self):
+        """
+        Downloads the base and head report chunks in background threads while
+        fetching the git comparison from the provider, so that loading the
+        comparison costs the slowest of those calls rather than their sum.
+        Returns once all of them have completed.
+
+        The chunks are picked up by `base_report` and `head_report` when they
+        are first accessed.  Failed downloads are not retried here - they are
+        retried (and raised) on first access of the corresponding report.
+        """
+        commits = [self.base_commit, self.head_commit]
+        archive_service = ArchiveService(self.base_commit.repository)
+
+        with ThreadPoolExecutor(max_workers=len(commits)) as executor:
+            futures = {
+                commit.commitid: executor.submit(
+                    archive_service.read_chunks, commit.commitid
+                )
+                for commit in commits
+            }
+
+            # fetched from this thread while the chunks are downloading
+            self._fetch_comparison_and_reverse_comparison
+
+            for commitid, future in futures.items():
+                try:
+                    self._prefetched_chunks[commitid] = future.result()
+                except Exception:
+                    log.warning(
+                        "Comparison - couldn't prefetch report chunks",
+                        extra=dict(commitid=commitid),
+                        exc_info=True,
+                    )
+
     def validate(self):
         # make sure head and base reports exist (will throw an error if not)
         self.head_report
         self.base_report
 
+    def get_file_segments(self, file_name) -> List[Segment]:
+        """
+        Returns the segments of the file comparison (including source) for the given file.
+
+        Building them requires fetching the source from the provider as well as
+        building both reports, so when `settings.SEGMENTS_CACHE_ENABLED` is set the
+        result is cached in Redis.  Raises `MissingComparisonReport` if either
+        report is missing.
+        """
+        if not settings.SEGMENTS_CACHE_ENABLED:
+            self.validate()
+            return self.get_file_comparison(
+                file_name, with_src=True, bypass_max_diff=True
+            ).segments
+
+        key = self._segments_cache_key(file_name)
+        try:
+            data = redis.get(key)
+            if data is not None:
+                return _deserialize_segments(data)
+        except RedisError as e:
+            log.warning(f"Error connecting to redis: {e}", extra=dict(key=key))
+
+        self.validate()
+        segments = self.get_file_comparison(
+            file_name, with_src=True, bypass_max_diff=True
+        ).segments
+
+        data = _serialize_segments(segments)
+        if len(data) <= settings.SEGMENTS_CACHE_MAX_SIZE:
+            try:
+                redis.set(key, data, ex=settings.SEGMENTS_CACHE_TTL)
+            except RedisError as e:
+                log.warning(f"Error connecting to redis: {e}", extra=dict(key=key))
+
+        return segments
+
+    def _segments_cache_key(self, file_name) -> str:
+        # the commits' updatestamps change when new uploads are processed
+        return "/".join(
+            (
+                "compare-segments",
+                str(self.head_commit.repository_id),
+                self.base_commit.commitid,
+                self._commit_updated_at(self.base_commit),
+                self.head_commit.commitid,
+                self._commit_updated_at(self.head_commit),
+                hashlib.md5(file_name.encode()).hexdigest(),
+            )
+        )
+
+    def _commit_updated_at(self, commit: Commit) -> str:
+        if commit.updatestamp is None:
+            return ""
+        return str(int(commit.updatestamp.timestamp()))
+
     @cached_property
     def base_commit(self):
         return self._base_commit
@@ -691,7 +985,12 @@ class Comparison(object):
     @cached_property
     def base_report(self):
         try:
-            return report_service.build_report_from_commit(self.base_commit)
+            # the base report is modified by `update_base_report_with_pseudo_diff`
+            return report_service.build_report_from_commit(
+                self.base_commit,
+                use_cache=False,
+                chunks=self._prefetched_chunks.get(self.base_commit.commitid),
+            )
         except minio.error.S3Error as e:
             if e.code == "NoSuchKey":
                 raise MissingComparisonReport("Missing base report")
@@ -701,7 +1000,11 @@ class Comparison(object):
     @cached_property
     def head_report(self):
         try:
-            report = report_service.build_report_from_commit(self.head_commit)
+            report = report_service.build_report_from_commit(
+                self.head_commit,
+                use_cache=False,
+                chunks=self._prefetched_chunks.get(self.head_commit.commitid),
+            )
         except minio.error.S3Error as e:
             if e.code == "NoSuchKey":
                 raise MissingComparisonReport("Missing head report")
@@ -964,20 +1267,24 @@ class ComparisonReport(object):
 
     commit_comparison: CommitComparison = None
 
+    # `ImpactedFile`s are built lazily from the raw data, keyed by their index
+    _built_files: dict = field(default_factory=dict, init=False, repr=False)
+
     @cached_property
     def files(self) -> List[ImpactedFile]:
-        if not self.commit_comparison.report_storage_path:
-            return []
-
-        comparison_data = self._fetch_raw_comparison_data()
-        return [
-            ImpactedFile.create(**data) for data in comparison_data.get("files", [])
-        ]
+        return [self._impacted_file(idx) for idx in range(len(self._raw_files))]
 
     def impacted_file(self, path: str) -> Optional[ImpactedFile]:
-        for file in self.files:
-            if file.head_name == path:
-                return file
+        if self._use_sidecar_index and self._sidecar_index is not None:
+            offsets = self._sidecar_index.get(path)
+            if offsets is None:
+                return None
+            start, end = offsets
+            return ImpactedFile.create(**json.loads(self._raw_data[start:end]))
+
+        idx = self._file_index.get(path)
+        if idx is not None:
+            return self._impacted_file(idx)
 
     @cached_property
     def impacted_files(self) -> List[ImpactedFile]:
@@ -991,20 +1298,157 @@ class ComparisonReport(object):
     def impacted_files_with_direct_changes(self) -> List[ImpactedFile]:
         return [file for file in self.files if file.has_diff]
 
-    def _fetch_raw_comparison_data(self) -> dict:
+    @cached_property
+    def _raw_files(self) -> List[dict]:
+        if not self.commit_comparison.report_storage_path:
+            return []
+
+        comparison_data = self._fetch_raw_comparison_data()
+        return comparison_data.get("files", [])
+
+    @cached_property
+    def _raw_data(self) -> Optional[str]:
         """
-        Fetches the raw comparison data from storage
+        The raw comparison data (fetched once per `ComparisonReport`)
         """
         repository = self.commit_comparison.compare_commit.repository
         archive_service = ArchiveService(repository)
         try:
-            data = archive_service.read_file(self.commit_comparison.report_storage_path)
-            return json.loads(data)
+            return archive_service.read_file(self.commit_comparison.report_storage_path)
         except:
             log.error(
                 "ComparisonReport - couldn't fetch data from storage", exc_info=True
             )
+            return None
+
+    @cached_property
+    def _file_index(self) -> dict:
+        """
+        Maps each file's `head_name` to its index in the raw data
+        """
+        index = {}
+        for idx, data in enumerate(self._raw_files):
+            index.setdefault(data.get("head_name"), idx)
+        return index
+
+    def _impacted_file(self, idx: int) -> ImpactedFile:
+        if idx not in self._built_files:
+            self._built_files[idx] = ImpactedFile.create(**self._raw_files[idx])
+        return self._built_files[idx]
+
+    @property
+    def _use_sidecar_index(self) -> bool:
+        # once the full comparison data is loaded there's no point in the sidecar
+        return (
+            settings.COMPARISON_INDEX_SIDECAR_ENABLED
+            and bool(self.commit_comparison.report_storage_path)
+            and "_raw_files" not in self.__dict__
+        )
+
+    @property
+    def _sidecar_index_path(self) -> str:
+        return f"{self.commit_comparison.report_storage_path}.index"
+
+    @cached_property
+    def _sidecar_index(self) -> Optional[dict]:
+        """
+        Maps each file's `head_name` to the offsets of its entry in the raw data
+        (see `comparison_index`), from the index stored next to the comparison
+        data by the worker.  `None` if there's no index for the current data, in
+        which case the full data is parsed.
+        """
+        if self._raw_data is None:
+            return None
+
+        repository = self.commit_comparison.compare_commit.repository
+        archive_service = ArchiveService(repository)
+        try:
+            index = json.loads(archive_service.read_file(self._sidecar_index_path))
+        except FileNotInStorageError:
+            return None
+        except ValueError:
+            log.warning(
+                "ComparisonReport - invalid sidecar index",
+                extra=dict(path=self._sidecar_index_path),
+            )
+            return None
+
+        # the comparison may have been recomputed since the index was written
+        if index.get("sha256") != _sha256(self._raw_data):
+            return None
+        return index.get("files")
+
+    def _fetch_raw_comparison_data(self) -> dict:
+        """
+        Parses the raw comparison data fetched from storage
+        """
+        if self._raw_data is None:
             return {}
+        try:
+            return json.loads(self._raw_data)
+        except ValueError:
+            log.error("ComparisonReport - couldn't parse data", exc_info=True)
+            return {}
+
+
+def _sha256(data: str) -> str:
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def comparison_index(data: str) -> dict:
+    """
+    The sidecar index of the given raw comparison data (`ComparisonReport` reads
+    it from `{report_storage_path}.index`).
+    """
+    return {"sha256": _sha256(data), "files": _comparison_file_offsets(data)}
+
+
+_json_decoder = json.JSONDecoder()
+
+
+def _skip_whitespace(data: str, pos: int) -> int:
+    while pos < len(data) and data[pos] in " \t\n\r":
+        pos += 1
+    return pos
+
+
+def _comparison_file_offsets(data: str) -> dict:
+    """
+    Scans the top-level object of the raw comparison data and returns a mapping
+    of each file's `head_name` to the `(start, end)` offsets of its entry within
+    the `files` list.
+    """
+    offsets = {}
+    pos = _skip_whitespace(data, 0)
+    if data[pos] != "{":
+        raise ValueError("comparison data is not a JSON object")
+    pos = _skip_whitespace(data, pos + 1)
+
+    while data[pos] != "}":
+        key, pos = _json_decoder.raw_decode(data, pos)
+        pos = _skip_whitespace(data, pos)
+        if data[pos] != ":":
+            raise ValueError(f"expected ':' at offset {pos}")
+        pos = _skip_whitespace(data, pos + 1)
+
+        if key == "files" and data[pos] == "[":
+            pos = _skip_whitespace(data, pos + 1)
+            while data[pos] != "]":
+                start = pos
+                file, pos = _json_decoder.raw_decode(data, pos)
+                offsets.setdefault(file.get("head_name"), (start, pos))
+                pos = _skip_whitespace(data, pos)
+                if data[pos] == ",":
+                    pos = _skip_whitespace(data, pos + 1)
+            pos += 1
+        else:
+            _, pos = _json_decoder.raw_decode(data, pos)
+
+        pos = _skip_whitespace(data, pos)
+        if data[pos] == ",":
+            pos = _skip_whitespace(data, pos + 1)
+
+    return offsets
 
 
 class PullRequestComparison(Comparison):
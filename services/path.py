@@ -141,6 +141,93 @@ def dashboard_commit_file_url(
     return f"{settings.CODECOV_DASHBOARD_URL}/{service}/{owner}/{repo}/commit/{commit_sha}/{commit_path}"
 
 
+class PathTrie:
+    """
+    Directory tree of all the files in a report.  Each directory's totals are
+    aggregated from its files as the tree is built so that listing a directory
+    doesn't need to walk its descendants.
+
+    Build it with `PathTrie.for_report` so that it's cached alongside the report.
+    """
+
+    def __init__(self, report: Report):
+        self.root = Dir(full_path="", children=[])
+        self.root.totals = ReportTotals.default_totals()
+
+        # directory path -> `Dir`, including the root at ""
+        self._dirs = {"": self.root}
+        # file path -> `File`, in the report's order
+        self._files = {}
+        self._file_order = {}
+
+        for full_path in report.files:
+            self._insert(full_path, report.get(full_path).totals)
+
+    @classmethod
+    def for_report(cls, report: Report) -> "PathTrie":
+        trie = getattr(report, "_path_trie", None)
+        if trie is None:
+            trie = cls(report)
+            report._path_trie = trie
+        return trie
+
+    def _insert(self, full_path: str, totals: ReportTotals):
+        file = File(full_path=full_path, totals=totals)
+        parts = full_path.split("/")
+
+        node = self.root
+        self._add_totals(node, file)
+        for idx in range(1, len(parts)):
+            if not parts[idx - 1]:
+                # e.g. a leading `/`, the empty directory would be the root again
+                continue
+            dir_path = "/".join(parts[:idx])
+            child = self._dirs.get(dir_path)
+            if child is None:
+                child = Dir(full_path=dir_path, children=[])
+                child.totals = ReportTotals.default_totals()
+                self._dirs[dir_path] = child
+                node.children.append(child)
+            node = child
+            self._add_totals(node, file)
+
+        node.children.append(file)
+        self._file_order[full_path] = len(self._files)
+        self._files[full_path] = file
+
+    def _add_totals(self, node: Dir, file: File):
+        node.totals.lines += file.lines
+        node.totals.hits += file.hits
+        node.totals.partials += file.partials
+        node.totals.misses += file.misses
+
+    def get(self, path: str) -> Optional[PathNode]:
+        """
+        Returns the directory or file at the given path (the root for an empty path).
+        """
+        return self._dirs.get(path or "") or self._files.get(path)
+
+    def files(self, path: str = "") -> List[File]:
+        """
+        Returns all the files under the given path, in the report's order.
+        """
+        node = self.get(path)
+        if node is None:
+            return []
+        if node is self.root:
+            return list(self._files.values())
+
+        files = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, File):
+                files.append(node)
+            else:
+                stack.extend(node.children)
+        return sorted(files, key=lambda file: self._file_order[file.full_path])
+
+
 class ReportPaths:
     """
     Contains methods for getting path information out of a single report.
@@ -151,42 +238,69 @@ class ReportPaths:
     ):
         self.report = report
         self.prefix = path or ""
+        self.search_term = search_term
 
-        self._paths = [
-            PrefixedPath(full_path=full_path, prefix=self.prefix)
-            for full_path in report.files
-            if is_subpath(full_path, self.prefix)
-        ]
+    @cached_property
+    def trie(self) -> PathTrie:
+        return PathTrie.for_report(self.report)
 
-        if search_term:
-            self._paths = [
-                path for path in self.paths if search_term in path.relative_path
+    @cached_property
+    def _files(self) -> List[File]:
+        files = self.trie.files(self.prefix)
+        if self.search_term:
+            files = [
+                file
+                for file in files
+                if self.search_term
+                in PrefixedPath(
+                    full_path=file.full_path, prefix=self.prefix
+                ).relative_path
             ]
+        return files
 
     @property
     def paths(self):
-        return self._paths
+        return [
+            PrefixedPath(full_path=file.full_path, prefix=self.prefix)
+            for file in self._files
+        ]
+
+    def exists(self) -> bool:
+        """
+        Whether any file matches the path (and search term).  Without a search
+        term this is a lookup in the trie, the files aren't listed.
+        """
+        if self.search_term:
+            return len(self._files) > 0
+        node = self.trie.get(self.prefix)
+        # the root always exists, even in an empty report
+        return node is not None and (isinstance(node, File) or bool(node.children))
 
     def full_filelist(self) -> Iterable[File]:
         """
         Return a flat file list of all files under the specified `path` prefix/directory.
         """
-        return [
-            File(full_path=path.full_path, totals=self._totals(path))
-            for path in self.paths
-        ]
+        return list(self._files)
 
     def single_directory(self) -> Iterable[Union[File, Dir]]:
         """
         Return a single directory (specified by `path`) of mixed file/directory results.
         """
-        return self._single_directory_recursive(self.paths)
+        if self.search_term:
+            return self._single_directory_recursive(self.paths)
+
+        node = self.trie.get(self.prefix)
+        if node is None:
+            return []
+        if isinstance(node, File):
+            return [node]
+        return list(node.children)
 
     def _totals(self, path: PrefixedPath) -> ReportTotals:
         """
         Returns the report totals for a given prefixed path.
         """
-        return self.report.get(path.full_path).totals
+        return self.trie.get(path.full_path).totals
 
     def _single_directory_recursive(
         self, paths: Iterable[PrefixedPath]
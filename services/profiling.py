@@ -21,9 +21,15 @@ class CriticalFile:
 
 
 class ProfilingSummary:
-    def __init__(self, repo: Repository, commit_sha: Optional[str] = None):
+    def __init__(
+        self,
+        repo: Repository,
+        commit_sha: Optional[str] = None,
+        report_registry: Optional[report_service.ReportRegistry] = None,
+    ):
         self.repo = repo
         self.commit_sha = commit_sha
+        self.report_registry = report_registry
 
     def latest_profiling_commit(self) -> Optional[ProfilingCommit]:
         """
@@ -81,7 +87,10 @@ class ProfilingSummary:
             return []
         commit_sha = self.commit_sha or profiling_commit.commit_sha
         commit = Commit.objects.get(commitid=commit_sha)
-        report = report_service.build_report_from_commit(commit)
+        if self.report_registry is not None:
+            report = self.report_registry.get(commit)
+        else:
+            report = report_service.build_report_from_commit(commit)
         if report is None:
             return []
         critical_files_paths = repo_yaml["profiling"]["critical_files_paths"]
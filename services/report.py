@@ -1,9 +1,12 @@
-from typing import Optional
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
 
 from django.conf import settings
 from django.db.models import Prefetch, Q
 from django.utils.functional import cached_property
 from shared.helpers.flag import Flag
+from shared.metrics import metrics
 from shared.reports.readonly import ReadOnlyReport as SharedReadOnlyReport
 from shared.reports.resources import Report
 from shared.reports.types import ReportFileSummary, ReportTotals
@@ -54,13 +57,91 @@ def build_report(chunks, files, sessions, totals, report_class=None):
     )
 
 
-def build_report_from_commit(commit: Commit, report_class=None):
+class ReportCache:
+    """
+    Process-wide LRU cache of built reports.
+
+    Entries are weighed by the size of the chunks they were parsed from (which
+    the report keeps a reference to) and the least recently used entries are
+    evicted once the total weight exceeds `max_size` bytes.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: tuple) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is None:
+            metrics.incr("services.report.cache.miss")
+            return None
+
+        metrics.incr("services.report.cache.hit")
+        return entry[0]
+
+    def set(self, key: tuple, report: Any, size: int):
+        if size > self.max_size:
+            # would immediately evict everything else (including itself)
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self.size -= self._entries.pop(key)[1]
+            self._entries[key] = (report, size)
+            self.size += size
+
+            evicted = 0
+            while self.size > self.max_size:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+                evicted += 1
+
+        if evicted > 0:
+            metrics.incr("services.report.cache.eviction", evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+report_cache = ReportCache(max_size=settings.REPORT_CACHE_MAX_SIZE)
+
+
+def _report_updated_at(commit_report: CommitReport):
+    try:
+        return commit_report.reportdetails.updated_at
+    except CommitReport.reportdetails.RelatedObjectDoesNotExist:
+        return commit_report.updated_at
+
+
+def build_report_from_commit(
+    commit: Commit, report_class=None, use_cache=True, chunks: Optional[str] = None
+):
     """
     Builds a `shared.reports.resources.Report` from a given commit.
 
-    Chunks are fetched from archive storage and the rest of the data is sourced
-    from various `reports_*` tables in the database.
+    Chunks are fetched from archive storage (unless already fetched and passed
+    in as `chunks`) and the rest of the data is sourced from various `reports_*`
+    tables in the database.
+
+    When `settings.REPORT_CACHE_ENABLED` is set, built reports are kept in a
+    process-wide LRU cache keyed by the commit and the last time its report was
+    updated.  Cached reports are shared between callers so they must not be
+    mutated - callers that need to modify the report (i.e. `apply_diff`) should
+    pass `use_cache=False`.
     """
+    if report_class is None:
+        report_class = SerializableReport
 
     # TODO: this can be removed once confirmed working well on prod
     new_report_builder_enabled = (
@@ -71,7 +152,29 @@ def build_report_from_commit(commit: Commit, report_class=None):
     )
 
     commit_report = fetch_commit_report(commit)
-    if commit_report and new_report_builder_enabled:
+    use_new_report_builder = commit_report and new_report_builder_enabled
+
+    if use_new_report_builder:
+        report_updated_at = _report_updated_at(commit_report)
+    elif commit.report:
+        report_updated_at = None
+    else:
+        return None
+
+    use_cache = use_cache and settings.REPORT_CACHE_ENABLED
+    cache_key = (
+        commit.repository_id,
+        commit.commitid,
+        commit.updatestamp,
+        report_updated_at,
+        report_class,
+    )
+    if use_cache:
+        report = report_cache.get(cache_key)
+        if report is not None:
+            return report
+
+    if use_new_report_builder:
         files = build_files(commit_report)
         sessions = build_sessions(commit_report)
         try:
@@ -79,16 +182,51 @@ def build_report_from_commit(commit: Commit, report_class=None):
         except CommitReport.reportleveltotals.RelatedObjectDoesNotExist:
             totals = None
     else:
-        if not commit.report:
-            return None
-
         files = commit.report["files"]
         sessions = commit.report["sessions"]
         totals = commit.totals
 
-    chunks = ArchiveService(commit.repository).read_chunks(commit.commitid)
+    if chunks is None:
+        chunks = ArchiveService(commit.repository).read_chunks(commit.commitid)
+    report = build_report(chunks, files, sessions, totals, report_class=report_class)
+
+    if use_cache:
+        report_cache.set(cache_key, report, size=len(chunks or ""))
+
+    return report
+
+
+class ReportRegistry:
+    """
+    Reports built for the commits of a single request (i.e. a GraphQL request)
+    so that each of them is built once, regardless of how many `Commit`
+    instances the request loads for the same commit.
+
+    Reports of the default class are the commits' `full_report` - the first
+    instance to build it shares it with the others.
+    """
 
-    return build_report(chunks, files, sessions, totals, report_class=report_class)
+    def __init__(self):
+        self._reports = {}
+        self._lock = threading.Lock()
+
+    def get(self, commit: Commit, report_class=None):
+        key = (commit.repository_id, commit.commitid, report_class)
+        with self._lock:
+            if key in self._reports:
+                metrics.incr("services.report.registry.hit")
+                report = self._reports[key]
+            else:
+                metrics.incr("services.report.registry.miss")
+                if report_class is None:
+                    report = commit.full_report
+                else:
+                    report = build_report_from_commit(commit, report_class=report_class)
+                self._reports[key] = report
+
+        if report_class is None:
+            commit.__dict__["full_report"] = report
+        return report
 
 
 def fetch_commit_report(commit: Commit) -> Optional[CommitReport]:
@@ -0,0 +1,208 @@
+"""
+Redis cache of API responses that are invalidated by tags.
+
+Each cached response is tagged with the owners, repositories and commits it was
+built from.  Code paths that change those (webhooks, model saves) call
+`invalidate` with the matching tags to evict every response built from them.
+
+Most of the data is written by the worker though (e.g. when it processes an
+upload) so a cached response is also only served if none of the objects it's
+tagged with were updated (`updatestamp`) since the response started being
+built.  That also covers a change made while the response was being built
+(which `invalidate` can't evict since the response isn't cached yet).
+
+The worker doesn't update a row of ours when it writes measurements to
+Timescale, so responses with measurements are tagged with their repositories'
+(or owner's) measurements and are stale once any commit of those repositories
+was updated, since measurements are written when a commit is processed.  Data
+that isn't read from a tagged object is only as fresh as the objects tagged
+along with it (see `graphql_api.response_cache.cache_tags`).
+
+Redis layout:
+
+    graphql/response-cache/{key}        the JSON encoded response, its tags and
+                                        when it started being built
+    graphql/response-cache/tags/{tag}   set of the response keys with that tag
+"""
+
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from redis.exceptions import RedisError
+from shared.metrics import metrics
+
+from codecov_auth.models import Owner
+from core.models import Commit, Repository
+from reports.models import ReportLevelTotals
+from services.redis_configuration import get_redis_connection
+
+log = logging.getLogger(__name__)
+
+KEY_PREFIX = "graphql/response-cache"
+
+
+def owner_tag(ownerid: int) -> str:
+    return f"owner:{ownerid}"
+
+
+def repository_tag(repoid: int) -> str:
+    return f"repo:{repoid}"
+
+
+def commit_tag(repoid: int, commitid: str) -> str:
+    return f"commit:{repoid}:{commitid}"
+
+
+def totals_tag(totals_id: int) -> str:
+    return f"totals:{totals_id}"
+
+
+def measurements_tag(repoid: int) -> str:
+    return f"measurements:{repoid}"
+
+
+def owner_measurements_tag(ownerid: int) -> str:
+    return f"owner-measurements:{ownerid}"
+
+
+def _response_key(key: str) -> str:
+    return f"{KEY_PREFIX}/{key}"
+
+
+def _tag_key(tag: str) -> str:
+    return f"{KEY_PREFIX}/tags/{tag}"
+
+
+def _changed_since(tags: Iterable[str], since: datetime) -> bool:
+    """
+    Whether any of the objects with the given `tags` was updated since `since`
+    (checked with a single query).
+    """
+    ownerids, repoids, commits, totals_ids = [], [], Q(), []
+    measured_repoids, measured_ownerids = [], []
+    for tag in tags:
+        kind, _, value = tag.partition(":")
+        if kind == "owner":
+            ownerids.append(int(value))
+        elif kind == "repo":
+            repoids.append(int(value))
+        elif kind == "commit":
+            repoid, _, commitid = value.partition(":")
+            commits |= Q(repository_id=int(repoid), commitid=commitid)
+        elif kind == "totals":
+            totals_ids.append(int(value))
+        elif kind == "measurements":
+            measured_repoids.append(int(value))
+        elif kind == "owner-measurements":
+            measured_ownerids.append(int(value))
+
+    querysets = []
+    if ownerids:
+        querysets.append(
+            Owner.objects.filter(ownerid__in=ownerids, updatestamp__gte=since)
+        )
+    if repoids:
+        querysets.append(
+            Repository.objects.filter(repoid__in=repoids, updatestamp__gte=since)
+        )
+    if commits:
+        querysets.append(Commit.objects.filter(commits, updatestamp__gte=since))
+    if totals_ids:
+        querysets.append(
+            ReportLevelTotals.objects.filter(id__in=totals_ids, updated_at__gte=since)
+        )
+    if measured_repoids:
+        querysets.append(
+            Commit.objects.filter(
+                repository_id__in=measured_repoids, updatestamp__gte=since
+            )
+        )
+    if measured_ownerids:
+        querysets.append(
+            Commit.objects.filter(
+                repository__author_id__in=measured_ownerids, updatestamp__gte=since
+            )
+        )
+    if not querysets:
+        return False
+
+    querysets = [queryset.values_list("pk", flat=True) for queryset in querysets]
+    return querysets[0].union(*querysets[1:], all=True).exists()
+
+
+def get_response(key: str) -> Optional[dict]:
+    try:
+        cached = get_redis_connection().get(_response_key(key))
+    except RedisError:
+        log.warning("Failed to read cached response", exc_info=True)
+        return None
+
+    if cached is None:
+        metrics.incr("response_cache.miss")
+        return None
+
+    cached = json.loads(cached)
+    # `updatestamp` is when the change was made, not when it was committed so
+    # changes committed shortly after the response started being built count too
+    since = datetime.fromtimestamp(cached["built_at"], tz=timezone.utc) - timedelta(
+        seconds=settings.GRAPHQL_RESPONSE_CACHE_CHANGE_MARGIN
+    )
+    if _changed_since(cached["tags"], since):
+        metrics.incr("response_cache.stale")
+        return None
+
+    metrics.incr("response_cache.hit")
+    return cached["response"]
+
+
+def set_response(key: str, response: dict, tags: Iterable[str], built_at: datetime):
+    """
+    Caches the `response` (which started being built at `built_at`) under `key`.
+    """
+    tags = list(tags)
+    cached = {
+        "response": response,
+        "tags": tags,
+        "built_at": built_at.timestamp(),
+    }
+    ttl = settings.GRAPHQL_RESPONSE_CACHE_TTL
+    try:
+        pipeline = get_redis_connection().pipeline()
+        pipeline.set(_response_key(key), json.dumps(cached), ex=ttl)
+        for tag in tags:
+            pipeline.sadd(_tag_key(tag), key)
+            # the tagged responses expire after `ttl` anyway
+            pipeline.expire(_tag_key(tag), ttl)
+        pipeline.execute()
+    except RedisError:
+        log.warning("Failed to cache response", exc_info=True)
+
+
+def invalidate(*tags: str):
+    """
+    Evicts the cached responses tagged with any of the given `tags`.
+    """
+    if not settings.GRAPHQL_RESPONSE_CACHE_ENABLED or not tags:
+        return
+
+    redis = get_redis_connection()
+    try:
+        for tag in tags:
+            keys = redis.smembers(_tag_key(tag))
+            pipeline = redis.pipeline()
+            for key in keys:
+                if isinstance(key, bytes):
+                    key = key.decode("utf-8")
+                pipeline.delete(_response_key(key))
+            pipeline.delete(_tag_key(tag))
+            pipeline.execute()
+    except RedisError:
+        log.warning("Failed to invalidate cached responses", exc_info=True)
+        return
+
+    metrics.incr("response_cache.invalidate", len(tags))
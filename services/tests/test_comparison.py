@@ -5,12 +5,14 @@ from collections import Counter
 from datetime import datetime
 from unittest.mock import PropertyMock, patch
 
+import fakeredis
 import minio
 import pytest
 import pytz
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from shared.reports.resources import ReportFile
 from shared.reports.types import ReportTotals
+from shared.storage.exceptions import FileNotInStorageError
 from shared.utils.merge import LineType
 
 from codecov_auth.tests.factories import OwnerFactory
@@ -21,6 +23,7 @@ from core.tests.factories import CommitFactory, PullFactory, RepositoryFactory
 from reports.models import ReportDetails
 from reports.tests.factories import CommitReportFactory
 from services.comparison import (
+    COVERAGE_TYPES,
     CommitComparisonService,
     Comparison,
     ComparisonReport,
@@ -30,8 +33,10 @@ from services.comparison import (
     FileComparisonTraverseManager,
     ImpactedFile,
     LineComparison,
+    LineComparisons,
     MissingComparisonReport,
     PullRequestComparison,
+    comparison_index,
 )
 from services.report import SerializableReport
 
@@ -266,6 +271,34 @@ class FileComparisonTraverseManagerTests(TestCase):
         manager.apply([visitor])
         assert visitor.line_numbers == [(1, 1), (2, 2), (3, None), (None, 3)]
 
+    def test_apply_does_not_modify_segments(self):
+        segments = [
+            {"header": ["1", "1", "1", "2"], "lines": ["+"]},
+            {"header": ["5", "2", "6", "1"], "lines": ["-", " "]},
+        ]
+        expected_segments = deepcopy(segments)
+
+        manager = FileComparisonTraverseManager(
+            head_file_eof=8, base_file_eof=8, segments=segments
+        )
+        manager.apply([LineNumberCollector()])
+
+        assert segments == expected_segments
+
+    def test_traverse_yields_lines(self):
+        segments = [{"header": ["2", "1", "2", "2"], "lines": [" two", "+three"]}]
+        manager = FileComparisonTraverseManager(
+            head_file_eof=5,
+            base_file_eof=4,
+            segments=segments,
+            src=["one", "two", "three", "four"],
+        )
+
+        lines = manager.traverse()
+        assert next(lines) == (1, 1, "one", False)
+        assert next(lines) == (2, 2, " two", True)
+        assert list(lines) == [(None, 3, "+three", True), (3, 4, "four", False)]
+
 
 class CreateLineComparisonVisitorTests(TestCase):
     def setUp(self):
@@ -458,6 +491,69 @@ class LineComparisonTests(TestCase):
         assert lc.hit_session_ids == None
 
 
+class LineComparisonsTests(TestCase):
+    def setUp(self):
+        self.lines = LineComparisons()
+        self.lines.append([0, "", [], 0, 0], [1, "", [], 0, 0], 1, 1, "first", False)
+        self.lines.append(None, [1, "", [], 0, 0], None, 2, "+added", True)
+        self.lines.append([1, "", [], 0, 0], None, 2, None, "-removed", True)
+        self.lines.append([1, "", [], 0, 0], [1, "", [], 0, 0], 3, 3, "last", False)
+
+    def test_len(self):
+        assert len(self.lines) == 4
+        assert len(LineComparisons()) == 0
+
+    def test_getitem(self):
+        line = self.lines[1]
+        assert isinstance(line, LineComparison)
+        assert line.number == {"base": None, "head": 2}
+        assert line.coverage == {"base": None, "head": LineType.hit}
+        assert line.value == "+added"
+        assert line.is_diff == True
+        assert line.added == True
+
+        line = self.lines[-1]
+        assert line.number == {"base": 3, "head": 3}
+        assert line.value == "last"
+
+        with pytest.raises(IndexError):
+            self.lines[4]
+
+    def test_getitem_slice(self):
+        lines = self.lines[1:3]
+        assert [line.value for line in lines] == ["+added", "-removed"]
+
+    def test_iter(self):
+        assert [line.value for line in self.lines] == [
+            "first",
+            "+added",
+            "-removed",
+            "last",
+        ]
+
+    def test_coverage_arrays(self):
+        assert [COVERAGE_TYPES[code] for code in self.lines.base_coverage] == [
+            LineType.miss,
+            None,
+            LineType.hit,
+            LineType.hit,
+        ]
+        assert [COVERAGE_TYPES[code] for code in self.lines.head_coverage] == [
+            LineType.hit,
+            LineType.hit,
+            None,
+            LineType.hit,
+        ]
+
+    def test_changed_mask(self):
+        assert self.lines.changed_mask().tolist() == [True, True, True, False]
+        assert LineComparisons().changed_mask().tolist() == []
+
+    def test_equality(self):
+        assert LineComparisons() == []
+        assert self.lines != []
+
+
 class FileComparisonConstructorTests(TestCase):
     def test_constructor_no_keyError_if_diff_data_segements_is_missing(self):
         file_comp = FileComparison(
@@ -642,6 +738,28 @@ class FileComparisonTests(TestCase):
         segments = self.file_comparison.segments
         assert len(segments) == 0
 
+    @patch("services.comparison.FileComparison.lines", new_callable=PropertyMock)
+    def test_segments_line_comparisons(self, lines):
+        line_comparisons = LineComparisons()
+        for ln in range(1, 31):
+            if ln in (5, 10, 25):
+                # coverage added
+                line_comparisons.append([0], [1], ln, ln, "changed line", False)
+            else:
+                line_comparisons.append([1], [1], ln, ln, "line", False)
+        lines.return_value = line_comparisons
+
+        segments = self.file_comparison.segments
+
+        assert len(segments) == 2
+        assert [line.number["head"] for line in segments[0].lines] == list(range(2, 14))
+        assert segments[0].header == (2, 12, 2, 12)
+        assert [line.number["head"] for line in segments[1].lines] == list(
+            range(22, 29)
+        )
+        assert segments[1].header == (22, 7, 22, 7)
+        assert segments[1].has_unintended_changes
+
     def test_change_summary(self):
         head_lines = [
             [1, "", [], 0, None],
@@ -1261,6 +1379,154 @@ class PullRequestComparisonTests(TestCase):
         shift_lines_by_diff_mock.assert_called_once_with({"files": {}}, forward=True)
 
 
+@patch(
+    "services.comparison.Comparison._fetch_comparison_and_reverse_comparison",
+    new_callable=PropertyMock,
+)
+@patch("services.archive.ArchiveService.read_chunks")
+class ComparisonPrefetchTests(TestCase):
+    def setUp(self):
+        owner = OwnerFactory()
+        repo = RepositoryFactory(author=owner)
+        self.base = CommitFactory(author=owner, repository=repo)
+        self.head = CommitFactory(author=owner, repository=repo)
+        self.comparison = Comparison(
+            user=owner, base_commit=self.base, head_commit=self.head
+        )
+
+    @patch("services.report.build_report_from_commit")
+    def test_prefetch(
+        self, build_report_from_commit_mock, read_chunks_mock, fetch_comparison_mock
+    ):
+        read_chunks_mock.side_effect = lambda commitid: f"chunks {commitid}"
+        fetch_comparison_mock.return_value = ({"diff": {"files": {}}}, {})
+        build_report_from_commit_mock.return_value = SerializableReport()
+
+        self.comparison.prefetch()
+        assert read_chunks_mock.call_count == 2
+        fetch_comparison_mock.assert_called_once()
+
+        self.comparison.base_report
+        build_report_from_commit_mock.assert_called_with(
+            self.base, use_cache=False, chunks=f"chunks {self.base.commitid}"
+        )
+        self.comparison.head_report
+        build_report_from_commit_mock.assert_called_with(
+            self.head, use_cache=False, chunks=f"chunks {self.head.commitid}"
+        )
+
+    @patch("services.report.build_report_from_commit")
+    def test_prefetch_chunks_error(
+        self, build_report_from_commit_mock, read_chunks_mock, fetch_comparison_mock
+    ):
+        read_chunks_mock.side_effect = minio.error.S3Error(
+            code="NoSuchKey",
+            message=None,
+            resource=None,
+            request_id=None,
+            host_id=None,
+            response=None,
+        )
+        fetch_comparison_mock.return_value = ({"diff": {"files": {}}}, {})
+        build_report_from_commit_mock.return_value = SerializableReport()
+
+        self.comparison.prefetch()
+
+        # chunks will be fetched again when building the report
+        self.comparison.base_report
+        build_report_from_commit_mock.assert_called_with(
+            self.base, use_cache=False, chunks=None
+        )
+
+
+@override_settings(SEGMENTS_CACHE_ENABLED=True)
+@patch("services.comparison.Comparison.validate")
+@patch("services.comparison.Comparison.get_file_comparison")
+class ComparisonGetFileSegmentsTests(TestCase):
+    def setUp(self):
+        owner = OwnerFactory()
+        repo = RepositoryFactory(author=owner)
+        base = CommitFactory(author=owner, repository=repo)
+        head = CommitFactory(author=owner, repository=repo)
+        self.comparison = Comparison(user=owner, base_commit=base, head_commit=head)
+
+        lines = LineComparisons()
+        lines.append([1, "", [], 0, 0], [1, "", [], 0, 0], 1, 1, "first", False)
+        lines.append(None, [1, "", [[0, 1, 0, 0, 0]], 0, 0], None, 2, "+added", True)
+        lines.append([1, "", [], 0, 0], [1, "", [], 0, 0], 2, 3, "last", False)
+        self.file_comparison = FileComparison(
+            base_file=None, head_file=None, bypass_max_diff=True
+        )
+        self.file_comparison.lines = lines
+
+        redis_patcher = patch("services.comparison.redis", fakeredis.FakeStrictRedis())
+        self.redis = redis_patcher.start()
+        self.addCleanup(redis_patcher.stop)
+
+    def test_get_file_segments_caches_segments(
+        self, get_file_comparison_mock, validate_mock
+    ):
+        get_file_comparison_mock.return_value = self.file_comparison
+
+        segments = self.comparison.get_file_segments("file.py")
+        get_file_comparison_mock.assert_called_once_with(
+            "file.py", with_src=True, bypass_max_diff=True
+        )
+        assert len(self.redis.keys("compare-segments/*")) == 1
+
+        cached_segments = self.comparison.get_file_segments("file.py")
+        assert get_file_comparison_mock.call_count == 1
+        assert validate_mock.call_count == 1
+
+        assert len(cached_segments) == len(segments) == 1
+        assert cached_segments[0].header == segments[0].header
+        assert cached_segments[0].has_diff_changes
+        assert [
+            (line.number, line.coverage, line.value, line.hit_session_ids)
+            for line in cached_segments[0].lines
+        ] == [
+            (line.number, line.coverage, line.value, line.hit_session_ids)
+            for line in segments[0].lines
+        ]
+
+    def test_get_file_segments_key_per_path(
+        self, get_file_comparison_mock, validate_mock
+    ):
+        get_file_comparison_mock.return_value = self.file_comparison
+
+        self.comparison.get_file_segments("file.py")
+        self.comparison.get_file_segments("other.py")
+        assert get_file_comparison_mock.call_count == 2
+        assert len(self.redis.keys("compare-segments/*")) == 2
+
+    @override_settings(SEGMENTS_CACHE_MAX_SIZE=1)
+    def test_get_file_segments_too_large(self, get_file_comparison_mock, validate_mock):
+        get_file_comparison_mock.return_value = self.file_comparison
+
+        self.comparison.get_file_segments("file.py")
+        assert self.redis.keys("compare-segments/*") == []
+
+    def test_get_file_segments_missing_report(
+        self, get_file_comparison_mock, validate_mock
+    ):
+        validate_mock.side_effect = MissingComparisonReport()
+
+        with self.assertRaises(MissingComparisonReport):
+            self.comparison.get_file_segments("file.py")
+        assert self.redis.keys("compare-segments/*") == []
+
+    @override_settings(SEGMENTS_CACHE_ENABLED=False)
+    def test_get_file_segments_cache_disabled(
+        self, get_file_comparison_mock, validate_mock
+    ):
+        get_file_comparison_mock.return_value = self.file_comparison
+
+        self.comparison.get_file_segments("file.py")
+        self.comparison.get_file_segments("file.py")
+        assert get_file_comparison_mock.call_count == 2
+        assert self.redis.keys("compare-segments/*") == []
+
+
 @patch("services.comparison.Comparison.git_comparison", new_callable=PropertyMock)
 @patch("services.report.build_report_from_commit")
 class ComparisonHeadReportTests(TestCase):
@@ -1673,6 +1939,71 @@ class ComparisonReportTest(TestCase):
         impacted_file = self.comparison_report.impacted_file("fileB")
         assert impacted_file.head_name == "fileB"
 
+    @patch("services.comparison.ImpactedFile.create", wraps=ImpactedFile.create)
+    @patch("services.archive.ArchiveService.read_file")
+    def test_impacted_file_only_builds_requested_file(self, read_file, create):
+        read_file.return_value = mock_data_from_archive
+        impacted_file = self.comparison_report.impacted_file("fileB")
+        assert impacted_file.head_name == "fileB"
+        assert create.call_count == 1
+
+        # subsequent lookups reuse the built file
+        assert self.comparison_report.impacted_file("fileB") is impacted_file
+        assert self.comparison_report.files[1] is impacted_file
+        assert create.call_count == 2
+        assert read_file.call_count == 1
+
+    @patch("services.archive.ArchiveService.read_file")
+    def test_impacted_file_missing(self, read_file):
+        read_file.return_value = mock_data_from_archive
+        assert self.comparison_report.impacted_file("fileZ") is None
+
+    @override_settings(COMPARISON_INDEX_SIDECAR_ENABLED=True)
+    @patch("services.comparison.ImpactedFile.create", wraps=ImpactedFile.create)
+    @patch("services.archive.ArchiveService.read_file")
+    def test_impacted_file_sidecar_index(self, read_file, create):
+        storage = {
+            "v4/test.json": mock_data_from_archive,
+            "v4/test.json.index": json.dumps(comparison_index(mock_data_from_archive)),
+        }
+        read_file.side_effect = lambda path: storage[path]
+
+        assert self.comparison_report.impacted_file("fileB").head_name == "fileB"
+        assert self.comparison_report.impacted_file("fileA").head_name == "fileA"
+        assert self.comparison_report.impacted_file("fileZ") is None
+        # the data and the index are only fetched once
+        assert read_file.call_count == 2
+        assert create.call_count == 2
+        # the full data was never parsed
+        assert "_raw_files" not in self.comparison_report.__dict__
+
+    @override_settings(COMPARISON_INDEX_SIDECAR_ENABLED=True)
+    @patch("services.archive.ArchiveService.read_file")
+    def test_impacted_file_stale_sidecar_index(self, read_file):
+        # same length as the current data but a different content
+        stale_data = mock_data_from_archive.replace("fileA", "fileX")
+        storage = {
+            "v4/test.json": mock_data_from_archive,
+            "v4/test.json.index": json.dumps(comparison_index(stale_data)),
+        }
+        read_file.side_effect = lambda path: storage[path]
+
+        assert self.comparison_report.impacted_file("fileA").head_name == "fileA"
+        assert "_raw_files" in self.comparison_report.__dict__
+
+    @override_settings(COMPARISON_INDEX_SIDECAR_ENABLED=True)
+    @patch("services.archive.ArchiveService.read_file")
+    def test_impacted_file_without_sidecar_index(self, read_file):
+        def read(path):
+            if path != "v4/test.json":
+                raise FileNotInStorageError()
+            return mock_data_from_archive
+
+        read_file.side_effect = read
+
+        assert self.comparison_report.impacted_file("fileB").head_name == "fileB"
+        assert read_file.call_count == 2
+
     @patch("services.archive.ArchiveService.read_file")
     def test_impacted_files_filtered_by_indirect_changes(self, read_file):
         read_file.return_value = mock_data_from_archive
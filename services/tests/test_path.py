@@ -10,6 +10,7 @@ from core.tests.factories import CommitFactory
 from services.path import (
     Dir,
     File,
+    PathTrie,
     PrefixedPath,
     ReportPaths,
     dashboard_commit_file_url,
@@ -216,6 +217,15 @@ class TestReportPaths(TestCase):
     def test_invalid_path(self):
         report_paths = ReportPaths(self.report, path="wrong")
         assert report_paths.paths == []
+        assert report_paths.exists() == False
+
+    def test_exists(self):
+        assert ReportPaths(self.report).exists() == True
+        assert ReportPaths(self.report, path="dir/subdir").exists() == True
+        assert ReportPaths(self.report, path="dir/file1.py").exists() == True
+        assert ReportPaths(self.report, search_term="ile2").exists() == True
+        assert ReportPaths(self.report, search_term="nope").exists() == False
+        assert ReportPaths(SerializableReport(files={})).exists() == False
 
 
 class TestReportPathsNested(TestCase):
@@ -260,6 +270,64 @@ class TestReportPathsNested(TestCase):
         ]
 
 
+class TestPathTrie(TestCase):
+    def setUp(self):
+        files = {
+            "dir/file1.py": file_data1,
+            "dir/subdir/file2.py": file_data2,
+            "dir/subdir/file3.py": file_data3,
+            "other.py": file_data3,
+        }
+        self.report = SerializableReport(files=files)
+
+    def test_aggregates_totals(self):
+        trie = PathTrie(self.report)
+        assert (trie.root.lines, trie.root.hits, trie.root.misses) == (40, 22, 8)
+
+        subdir = trie.get("dir/subdir")
+        assert subdir.full_path == "dir/subdir"
+        assert (subdir.lines, subdir.hits, subdir.misses) == (20, 11, 4)
+        assert subdir.totals.lines == sum(child.lines for child in subdir.children)
+
+    def test_leading_slash(self):
+        trie = PathTrie(SerializableReport(files={"/dir/file1.py": file_data1}))
+        assert trie.root.lines == totals1.lines
+        assert trie.get("/dir").lines == totals1.lines
+        assert [child.full_path for child in trie.root.children] == ["/dir"]
+
+    def test_get(self):
+        trie = PathTrie(self.report)
+        assert trie.get("") is trie.root
+        assert trie.get("dir/file1.py") == File(
+            full_path="dir/file1.py", totals=totals1
+        )
+        assert [child.name for child in trie.get("dir").children] == [
+            "file1.py",
+            "subdir",
+        ]
+        assert trie.get("dir/sub") is None
+
+    def test_files(self):
+        trie = PathTrie(self.report)
+        assert [file.full_path for file in trie.files("dir")] == [
+            "dir/file1.py",
+            "dir/subdir/file2.py",
+            "dir/subdir/file3.py",
+        ]
+        assert list(trie.files("wrong")) == []
+
+    def test_for_report_is_cached(self):
+        trie = PathTrie.for_report(self.report)
+        assert PathTrie.for_report(self.report) is trie
+        assert ReportPaths(self.report).trie is trie
+
+    def test_single_directory_of_file(self):
+        report_paths = ReportPaths(self.report, path="dir/file1.py")
+        assert report_paths.single_directory() == [
+            File(full_path="dir/file1.py", totals=totals1),
+        ]
+
+
 class MockedProviderAdapter:
     async def list_files(self, *args, **kwargs):
         return []
@@ -10,6 +10,7 @@ from shared.profiling import ProfilingSummaryDataAnalyzer
 from core.tests.factories import CommitFactory, RepositoryFactory
 from profiling.tests.factories import ProfilingCommitFactory
 from services.profiling import ProfilingSummary
+from services.report import ReportRegistry
 
 test_summary = """
 {
@@ -293,6 +294,29 @@ class ProfilingSummaryTests(TestCase):
         )
         mocked_reportservice.assert_called()
 
+    @patch("services.report.build_report_from_commit")
+    @patch("services.profiling.UserYaml.get_final_yaml")
+    def test_critical_files_from_yaml_report_registry(
+        self, mocked_useryaml, mocked_reportservice
+    ):
+        commit = CommitFactory(repository=self.repo)
+        mocked_useryaml.return_value = dict(
+            profiling=dict(critical_files_paths=["batata.txt"])
+        )
+        mock_report = MagicMock()
+        mock_report.files = ["some_file.txt", "batata.txt"]
+        mocked_reportservice.return_value = mock_report
+
+        report_registry = ReportRegistry()
+        assert report_registry.get(commit) is mock_report
+
+        service = ProfilingSummary(
+            self.repo, commit_sha=commit.commitid, report_registry=report_registry
+        )
+        assert service._get_critical_files_from_yaml() == ["batata.txt"]
+        # the report built for the commit is reused
+        assert mocked_reportservice.call_count == 1
+
     @patch("services.report.build_report_from_commit")
     @patch("services.profiling.UserYaml.get_final_yaml")
     @patch("services.profiling.ProfilingSummary.summary_data")
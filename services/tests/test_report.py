@@ -2,16 +2,24 @@ from decimal import Decimal
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from shared.utils.sessions import SessionType
 
+from core.models import Commit
 from core.tests.factories import CommitFactory, CommitWithReportFactory
 from reports.tests.factories import (
     UploadFactory,
     UploadFlagMembershipFactory,
     UploadLevelTotalsFactory,
 )
-from services.report import build_report, build_report_from_commit
+from services.report import (
+    ReadOnlyReport,
+    ReportCache,
+    ReportRegistry,
+    build_report,
+    build_report_from_commit,
+    report_cache,
+)
 
 current_file = Path(__file__)
 
@@ -324,3 +332,177 @@ class ReportServiceTest(TestCase):
             0,
             [1, 2, 1, 1, 0, "50.00000", 0, 0, 0, 0, 0, 0, 0],
         ]
+
+
+class ReportCacheTest(TestCase):
+    def test_get_missing(self):
+        cache = ReportCache(max_size=100)
+        assert cache.get(("a",)) is None
+
+    def test_set_and_get(self):
+        cache = ReportCache(max_size=100)
+        report = MagicMock()
+        cache.set(("a",), report, size=10)
+        assert cache.get(("a",)) is report
+        assert cache.size == 10
+
+    def test_set_existing_key(self):
+        cache = ReportCache(max_size=100)
+        cache.set(("a",), MagicMock(), size=10)
+        report = MagicMock()
+        cache.set(("a",), report, size=20)
+        assert cache.get(("a",)) is report
+        assert cache.size == 20
+        assert len(cache) == 1
+
+    def test_evicts_least_recently_used(self):
+        cache = ReportCache(max_size=30)
+        cache.set(("a",), MagicMock(), size=10)
+        cache.set(("b",), MagicMock(), size=10)
+        cache.set(("c",), MagicMock(), size=10)
+
+        # mark as recently used
+        cache.get(("a",))
+
+        cache.set(("d",), MagicMock(), size=10)
+        assert cache.get(("b",)) is None
+        assert cache.get(("a",)) is not None
+        assert cache.get(("c",)) is not None
+        assert cache.get(("d",)) is not None
+        assert cache.size == 30
+
+    def test_too_large(self):
+        cache = ReportCache(max_size=30)
+        cache.set(("a",), MagicMock(), size=10)
+        cache.set(("b",), MagicMock(), size=40)
+        assert cache.get(("a",)) is not None
+        assert cache.get(("b",)) is None
+
+    @patch("services.report.metrics")
+    def test_metrics(self, metrics_mock):
+        cache = ReportCache(max_size=10)
+        cache.get(("a",))
+        cache.set(("a",), MagicMock(), size=10)
+        cache.get(("a",))
+        cache.set(("b",), MagicMock(), size=10)
+        metrics_mock.incr.assert_any_call("services.report.cache.miss")
+        metrics_mock.incr.assert_any_call("services.report.cache.hit")
+        metrics_mock.incr.assert_any_call("services.report.cache.eviction", 1)
+
+
+@override_settings(REPORT_CACHE_ENABLED=True)
+class ReportServiceCacheTest(TestCase):
+    def setUp(self):
+        report_cache.clear()
+        with open(current_file.parent / "samples" / "chunks.txt", "r") as f:
+            self.chunks = f.read()
+        self.commit = CommitWithReportFactory.create(commitid="abf6d4d")
+
+    def tearDown(self):
+        report_cache.clear()
+
+    @patch("services.archive.ArchiveService.read_chunks")
+    def test_build_report_from_commit_cached(self, read_chunks_mock):
+        read_chunks_mock.return_value = self.chunks
+
+        report1 = build_report_from_commit(self.commit)
+        report2 = build_report_from_commit(self.commit)
+        assert report1 is report2
+        assert read_chunks_mock.call_count == 1
+
+    @patch("services.archive.ArchiveService.read_chunks")
+    def test_build_report_from_commit_report_class(self, read_chunks_mock):
+        read_chunks_mock.return_value = self.chunks
+
+        report1 = build_report_from_commit(self.commit)
+        report2 = build_report_from_commit(self.commit, report_class=ReadOnlyReport)
+        assert report1 is not report2
+        assert isinstance(report2, ReadOnlyReport)
+        assert read_chunks_mock.call_count == 2
+
+    @patch("services.archive.ArchiveService.read_chunks")
+    def test_build_report_from_commit_report_updated(self, read_chunks_mock):
+        read_chunks_mock.return_value = self.chunks
+
+        report1 = build_report_from_commit(self.commit)
+        report_details = self.commit.reports.first().reportdetails
+        report_details.save()
+        report2 = build_report_from_commit(self.commit)
+        assert report1 is not report2
+        assert read_chunks_mock.call_count == 2
+
+    @patch("services.archive.ArchiveService.read_chunks")
+    def test_build_report_from_commit_without_cache(self, read_chunks_mock):
+        read_chunks_mock.return_value = self.chunks
+
+        report1 = build_report_from_commit(self.commit)
+        report2 = build_report_from_commit(self.commit, use_cache=False)
+        assert report1 is not report2
+        assert read_chunks_mock.call_count == 2
+
+    @patch("services.archive.ArchiveService.read_chunks")
+    def test_build_report_from_commit_with_chunks(self, read_chunks_mock):
+        report = build_report_from_commit(
+            self.commit, use_cache=False, chunks=self.chunks
+        )
+        assert len(report._chunks) == 3
+        read_chunks_mock.assert_not_called()
+
+    @override_settings(REPORT_CACHE_ENABLED=False)
+    @patch("services.archive.ArchiveService.read_chunks")
+    def test_build_report_from_commit_cache_disabled(self, read_chunks_mock):
+        read_chunks_mock.return_value = self.chunks
+
+        build_report_from_commit(self.commit)
+        build_report_from_commit(self.commit)
+        assert read_chunks_mock.call_count == 2
+
+
+@override_settings(REPORT_CACHE_ENABLED=False)
+class ReportRegistryTest(TestCase):
+    def setUp(self):
+        with open(current_file.parent / "samples" / "chunks.txt", "r") as f:
+            self.chunks = f.read()
+        self.commit = CommitWithReportFactory.create(commitid="abf6d4d")
+
+    @patch("services.archive.ArchiveService.read_chunks")
+    def test_get_builds_once(self, read_chunks_mock):
+        read_chunks_mock.return_value = self.chunks
+        registry = ReportRegistry()
+
+        report1 = registry.get(self.commit)
+        # another instance of the same commit
+        commit = Commit.objects.get(pk=self.commit.pk)
+        report2 = registry.get(commit)
+        assert report1 is report2
+        assert commit.full_report is report1
+        assert read_chunks_mock.call_count == 1
+
+    @patch("services.archive.ArchiveService.read_chunks")
+    def test_get_uses_full_report(self, read_chunks_mock):
+        read_chunks_mock.return_value = self.chunks
+        registry = ReportRegistry()
+
+        report = self.commit.full_report
+        assert registry.get(self.commit) is report
+        assert read_chunks_mock.call_count == 1
+
+    @patch("services.archive.ArchiveService.read_chunks")
+    def test_get_report_class(self, read_chunks_mock):
+        read_chunks_mock.return_value = self.chunks
+        registry = ReportRegistry()
+
+        report1 = registry.get(self.commit)
+        report2 = registry.get(self.commit, report_class=ReadOnlyReport)
+        assert report1 is not report2
+        assert isinstance(report2, ReadOnlyReport)
+        assert registry.get(self.commit, report_class=ReadOnlyReport) is report2
+        assert read_chunks_mock.call_count == 2
+
+    @patch("services.archive.ArchiveService.read_chunks")
+    def test_get_separate_registries(self, read_chunks_mock):
+        read_chunks_mock.return_value = self.chunks
+
+        ReportRegistry().get(self.commit)
+        ReportRegistry().get(Commit.objects.get(pk=self.commit.pk))
+        assert read_chunks_mock.call_count == 2
@@ -0,0 +1,107 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import fakeredis
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.models import Commit, Repository
+from core.tests.factories import CommitFactory, RepositoryFactory
+from reports.models import ReportLevelTotals
+from reports.tests.factories import ReportLevelTotalsFactory
+from services import response_cache
+
+
+@override_settings(GRAPHQL_RESPONSE_CACHE_ENABLED=True)
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        redis_patcher = patch("services.response_cache.get_redis_connection")
+        get_redis_connection = redis_patcher.start()
+        get_redis_connection.return_value = fakeredis.FakeStrictRedis()
+        self.addCleanup(redis_patcher.stop)
+
+    def test_get_set_response(self):
+        assert response_cache.get_response("key") is None
+        response_cache.set_response(
+            "key", {"data": {"a": 1}}, ["repo:1"], timezone.now()
+        )
+        assert response_cache.get_response("key") == {"data": {"a": 1}}
+
+    def test_invalidate(self):
+        response_cache.set_response(
+            "key-1", {"data": 1}, ["repo:1", "owner:1"], timezone.now()
+        )
+        response_cache.set_response(
+            "key-2", {"data": 2}, ["repo:2", "owner:1"], timezone.now()
+        )
+        response_cache.set_response("key-3", {"data": 3}, ["repo:3"], timezone.now())
+
+        response_cache.invalidate("repo:1")
+        assert response_cache.get_response("key-1") is None
+        assert response_cache.get_response("key-2") == {"data": 2}
+
+        response_cache.invalidate("owner:1")
+        assert response_cache.get_response("key-2") is None
+        assert response_cache.get_response("key-3") == {"data": 3}
+
+    @override_settings(GRAPHQL_RESPONSE_CACHE_ENABLED=False)
+    def test_invalidate_disabled(self):
+        response_cache.set_response("key", {"data": 1}, ["repo:1"], timezone.now())
+        response_cache.invalidate("repo:1")
+        assert response_cache.get_response("key") == {"data": 1}
+
+    def test_commit_saved(self):
+        commit = CommitFactory()
+        tag = response_cache.commit_tag(commit.repository_id, commit.commitid)
+        response_cache.set_response("key", {"data": 1}, [tag], timezone.now())
+
+        commit.state = "complete"
+        commit.save()
+        assert response_cache.get_response("key") is None
+
+    def test_updated_while_built(self):
+        repo = RepositoryFactory()
+        tag = response_cache.repository_tag(repo.repoid)
+
+        # e.g. the worker processed an upload while the response was built
+        built_at = timezone.now()
+        Repository.objects.filter(pk=repo.pk).update(updatestamp=timezone.now())
+        response_cache.set_response("key", {"data": 1}, [tag], built_at)
+        assert response_cache.get_response("key") is None
+
+        Repository.objects.filter(pk=repo.pk).update(
+            updatestamp=timezone.now() - timedelta(minutes=5)
+        )
+        response_cache.set_response("key", {"data": 2}, [tag], timezone.now())
+        assert response_cache.get_response("key") == {"data": 2}
+
+    def test_measurements_commit_processed(self):
+        commit = CommitFactory()
+        Commit.objects.filter(pk=commit.pk).update(
+            updatestamp=timezone.now() - timedelta(minutes=5)
+        )
+        tags = [
+            response_cache.measurements_tag(commit.repository_id),
+            response_cache.owner_measurements_tag(commit.repository.author_id),
+        ]
+        response_cache.set_response("key", {"data": 1}, tags, timezone.now())
+        assert response_cache.get_response("key") == {"data": 1}
+
+        # the worker writes the measurements of a commit when processing it
+        Commit.objects.filter(pk=commit.pk).update(updatestamp=timezone.now())
+        assert response_cache.get_response("key") is None
+
+        response_cache.set_response("key", {"data": 1}, tags[1:], timezone.now())
+        assert response_cache.get_response("key") is None
+
+    def test_totals_updated(self):
+        totals = ReportLevelTotalsFactory()
+        ReportLevelTotals.objects.filter(pk=totals.pk).update(
+            updated_at=timezone.now() - timedelta(minutes=5)
+        )
+        tags = [response_cache.totals_tag(totals.id)]
+        response_cache.set_response("key", {"data": 1}, tags, timezone.now())
+        assert response_cache.get_response("key") == {"data": 1}
+
+        totals.save()
+        assert response_cache.get_response("key") is None
@@ -2,6 +2,7 @@
 
 # starts the development server using gunicorn
 # NEVER run production with the --reload option command
+# Set SERVER_MODE=asgi to run the ASGI application on uvicorn workers
 echo "Starting gunicorn in dev mode"
 export PYTHONWARNINGS=always
 prefix=""
@@ -12,5 +13,10 @@ suffix=""
 if [[ "$STATSD_HOST" ]]; then
   suffix="--statsd-host ${STATSD_HOST}:${STATSD_PORT}"
 fi
+application="codecov.wsgi:application"
+if [ "$SERVER_MODE" = "asgi" ]; then
+  echo "Using ASGI with uvicorn workers"
+  application="codecov.asgi:application --worker-class uvicorn.workers.UvicornWorker"
+fi
 
-$prefix gunicorn codecov.wsgi:application --reload --workers=2 --bind 0.0.0.0:8000 --access-logfile '-' --timeout "${GUNICORN_TIMEOUT:-600}" $suffix
+$prefix gunicorn $application --reload --workers=2 --bind 0.0.0.0:8000 --access-logfile '-' --timeout "${GUNICORN_TIMEOUT:-600}" $suffix
@@ -1,13 +1,19 @@
+import json
+import logging
 import math
 from datetime import datetime, timedelta
-from typing import Iterable, List, Optional
+from decimal import Decimal
+from functools import partial
+from typing import Callable, Iterable, List, Optional, Tuple
 
+import numpy as np
 from django.conf import settings
 from django.db import connections
 from django.db.models import (
     Avg,
     DateTimeField,
     DecimalField,
+    ExpressionWrapper,
     F,
     FloatField,
     Func,
@@ -20,20 +26,32 @@ from django.db.models import (
 from django.db.models.fields.json import KeyTextTransform
 from django.db.models.functions import Cast
 from django.utils import timezone
+from redis.exceptions import RedisError
+from shared.metrics import metrics
 
 import services.report as report_service
 from codecov_auth.models import Owner
-from core.models import Commit, Repository
+from core.models import (
+    Commit,
+    CommitCoverageDaily,
+    DateTimeWithoutTZField,
+    Repository,
+)
 from reports.models import RepositoryFlag
+from services.redis_configuration import get_redis_connection
 from services.task import TaskService
 from timeseries.models import (
     Dataset,
     Interval,
     Measurement,
+    MeasurementDirtyBin,
     MeasurementName,
     MeasurementSummary,
+    OwnerMeasurementSummary,
 )
 
+log = logging.getLogger(__name__)
+
 interval_deltas = {
     Interval.INTERVAL_1_DAY: timedelta(days=1),
     Interval.INTERVAL_7_DAY: timedelta(days=7),
@@ -41,21 +59,103 @@ interval_deltas = {
 }
 
 
+# the continuous aggregates of each interval
+continuous_aggregates = {
+    Interval.INTERVAL_1_DAY: [
+        "timeseries_measurement_summary_1day",
+        "timeseries_owner_measurement_summary_1day",
+    ],
+    Interval.INTERVAL_7_DAY: [
+        "timeseries_measurement_summary_7day",
+        "timeseries_owner_measurement_summary_7day",
+    ],
+    Interval.INTERVAL_30_DAY: [
+        "timeseries_measurement_summary_30day",
+        "timeseries_owner_measurement_summary_30day",
+    ],
+}
+
+
+def _refresh_continuous_aggregate(
+    cursor, cagg: str, start_date: datetime, end_date: datetime
+) -> None:
+    sql = f"CALL refresh_continuous_aggregate('{cagg}', '{start_date.isoformat()}', '{end_date.isoformat()}')"
+    cursor.execute(sql)
+
+
 def refresh_measurement_summaries(start_date: datetime, end_date: datetime) -> None:
     """
     Refresh the measurement summaries for the given time range.
     This calls a TimescaleDB provided SQL function for each of the continuous aggregates
     to refresh the aggregate data in the provided time range.
     """
-    continuous_aggregates = [
-        "timeseries_measurement_summary_1day",
-        "timeseries_measurement_summary_7day",
-        "timeseries_measurement_summary_30day",
-    ]
     with connections["timeseries"].cursor() as cursor:
-        for cagg in continuous_aggregates:
-            sql = f"CALL refresh_continuous_aggregate('{cagg}', '{start_date.isoformat()}', '{end_date.isoformat()}')"
-            cursor.execute(sql)
+        for caggs in continuous_aggregates.values():
+            for cagg in caggs:
+                _refresh_continuous_aggregate(cursor, cagg, start_date, end_date)
+
+
+def dirty_windows(
+    interval: Interval, dirty_bins: Iterable[datetime]
+) -> List[Tuple[datetime, datetime]]:
+    """
+    Coalesces the dirty 1 day bins into the `(start_date, end_date)` windows of
+    adjacent `interval` bins that contain them.
+    """
+    delta = interval_deltas[interval]
+    bins = sorted(
+        set(
+            aligned_start_date(interval, _aware(timestamp_bin))
+            for timestamp_bin in dirty_bins
+        )
+    )
+
+    windows = []
+    for start_date in bins:
+        if windows and windows[-1][1] == start_date:
+            windows[-1] = (windows[-1][0], start_date + delta)
+        else:
+            windows.append((start_date, start_date + delta))
+    return windows
+
+
+dirty_bins_delete_batch_size = 10000
+
+
+def refresh_dirty_measurement_summaries() -> int:
+    """
+    Refreshes the continuous aggregates over the windows containing the days
+    recorded in the `MeasurementDirtyBin` ledger (rather than over a whole time
+    range) and clears those days.  Returns the number of refreshed windows.
+    """
+    # read from the primary since a lagging replica would hold back the refreshes
+    dirty = list(
+        MeasurementDirtyBin.objects.using("timeseries").values_list(
+            "id", "timestamp_bin"
+        )
+    )
+    if not dirty:
+        return 0
+
+    count = 0
+    dirty_bins = set(timestamp_bin for _, timestamp_bin in dirty)
+    with connections["timeseries"].cursor() as cursor:
+        for interval, caggs in continuous_aggregates.items():
+            for start_date, end_date in dirty_windows(interval, dirty_bins):
+                for cagg in caggs:
+                    _refresh_continuous_aggregate(cursor, cagg, start_date, end_date)
+                count += 1
+
+    # only the changes that were read are cleared (the ones recorded since then
+    # are refreshed next time)
+    ids = [id for id, _ in dirty]
+    for i in range(0, len(ids), dirty_bins_delete_batch_size):
+        MeasurementDirtyBin.objects.filter(
+            id__in=ids[i : i + dirty_bins_delete_batch_size]
+        ).delete()
+
+    metrics.incr("timeseries.refresh_dirty_windows", count)
+    return count
 
 
 def aggregate_measurements(
@@ -144,9 +244,43 @@ def coverage_measurements(
         return aggregate_measurements(queryset).order_by("timestamp_bin")
 
 
+def owner_coverage_measurements(
+    owner_id: int,
+    interval: Interval,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    **filters,
+):
+    """
+    Coverage of the default branches of all the owner's repositories, from the
+    owner-level summaries (rather than from the summaries of each repository).
+    """
+    timestamp_filters = {}
+    if start_date is not None:
+        timestamp_filters["timestamp_bin__gte"] = start_date
+    if end_date is not None:
+        timestamp_filters["timestamp_bin__lte"] = end_date
+
+    summaries = OwnerMeasurementSummary.agg_by(interval).filter(
+        owner_id=owner_id,
+        name=MeasurementName.OWNER_COVERAGE.value,
+    )
+    queryset = summaries.filter(**timestamp_filters).filter(**filters)
+
+    if start_date:
+        # carry an older datapoint forward (see `coverage_measurements`)
+        older = summaries.filter(timestamp_bin__lt=start_date).filter(**filters)
+        older = aggregate_measurements(older).order_by("-timestamp_bin")[:1]
+
+        return older.union(aggregate_measurements(queryset)).order_by("timestamp_bin")
+    else:
+        return aggregate_measurements(queryset).order_by("timestamp_bin")
+
+
 def trigger_backfill(dataset: Dataset):
     """
-    Triggers a backfill for the full timespan of the dataset's repo's commits.
+    Triggers a backfill for the full timespan of the dataset's repo's commits,
+    in windows of `BACKFILL_WINDOW`.
     """
     oldest_commit = (
         Commit.objects.filter(repository_id=dataset.repository_id)
@@ -167,12 +301,31 @@ def trigger_backfill(dataset: Dataset):
         end_date = newest_commit.timestamp.date() + timedelta(days=1)
         end_date = datetime.fromordinal(end_date.toordinal())
 
-        TaskService().backfill_dataset(
-            dataset,
-            start_date=start_date,
-            end_date=end_date,
+        dataset.backfill_start_date = start_date
+        dataset.backfill_end_date = end_date
+        dataset.backfill_enqueued_at = datetime.now()
+        dataset.backfill_done_start_date = None
+        dataset.backfilled = False
+        dataset.save(
+            update_fields=[
+                "backfill_start_date",
+                "backfill_end_date",
+                "backfill_enqueued_at",
+                "backfill_done_start_date",
+                "backfilled",
+            ]
         )
 
+        # the windows are enqueued newest first so that recent measurements (which
+        # are the most viewed) are backfilled first
+        task_service = TaskService()
+        for window_start_date, window_end_date in dataset.backfill_windows():
+            task_service.backfill_dataset(
+                dataset,
+                start_date=window_start_date,
+                end_date=window_end_date,
+            )
+
 
 def aligned_start_date(interval: Interval, date: datetime) -> datetime:
     """
@@ -193,66 +346,145 @@ def aligned_start_date(interval: Interval, date: datetime) -> datetime:
     return aligning_date + (intervals_before * delta)
 
 
+def lttb_downsample(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Returns the indices of (at most) `max_points` points of the series that
+    preserve its shape using the largest-triangle-three-buckets algorithm.
+    The first and last points are always kept.
+    """
+    if max_points < 2:
+        raise ValueError("max_points must be at least 2")
+
+    count = len(x)
+    if max_points >= count:
+        return np.arange(count)
+    if max_points == 2:
+        return np.array([0, count - 1], dtype=np.int64)
+
+    # the points between the first and the last are split into buckets and the
+    # point of each bucket forming the largest triangle with the point selected
+    # in the previous bucket and the average of the next bucket is selected
+    bucket_size = (count - 2) / (max_points - 2)
+    indices = np.empty(max_points, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = count - 1
+
+    selected = 0
+    for bucket in range(max_points - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+        next_end = min(int((bucket + 2) * bucket_size) + 1, count)
+
+        next_x = x[end:next_end].mean()
+        next_y = y[end:next_end].mean()
+        areas = np.abs(
+            (x[selected] - next_x) * (y[start:end] - y[selected])
+            - (x[selected] - x[start:end]) * (next_y - y[selected])
+        )
+        selected = start + int(np.argmax(areas))
+        indices[bucket + 1] = selected
+
+    return indices
+
+
 def fill_sparse_measurements(
     measurements: Iterable[dict],
     interval: Interval,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-) -> Iterable[dict]:
+    max_points: Optional[int] = None,
+) -> List[dict]:
     """
     Fill in sparse array of measurements with values such that we
     have an entry for every interval within the requested time range.
     Those placeholder entries will have empty measurement values.
+
+    If there would be more than `max_points` entries then only the non-empty
+    ones are returned, downsampled to `max_points` (see `lttb_downsample`).
+    `max_points` below 2 is raised to 2 (the first and last points).
     """
-    by_timestamp = {
-        measurement["timestamp_bin"].replace(tzinfo=timezone.utc): measurement
-        for measurement in measurements
-    }
-    timestamps = sorted(by_timestamp.keys())
-    if len(timestamps) == 0:
+    if max_points is not None:
+        max_points = max(max_points, 2)
+
+    measurements = list(measurements)
+    if len(measurements) == 0:
         return []
 
+    # seconds since the epoch
+    timestamps = np.array(
+        [
+            measurement["timestamp_bin"].replace(tzinfo=timezone.utc).timestamp()
+            for measurement in measurements
+        ],
+        dtype=np.int64,
+    )
+    # the last one wins if several measurements have the oldest timestamp
+    oldest = int(np.flatnonzero(timestamps == timestamps.min())[-1])
+
     delta = interval_deltas[interval]
 
     if start_date is None:
-        start_date = timestamps[0]
+        start_date = datetime.fromtimestamp(int(timestamps[oldest]), tz=timezone.utc)
     start_date = aligned_start_date(interval, start_date)
 
     if end_date is None:
         end_date = timezone.now()
 
-    intervals = []
+    count = 0
+    if end_date >= start_date:
+        count = math.floor((end_date - start_date) / delta) + 1
 
-    current_date = start_date
-    while current_date <= end_date:
-        if current_date in by_timestamp:
-            intervals.append(by_timestamp[current_date])
-        else:
-            # interval not found
-            intervals.append(
-                {
-                    "timestamp_bin": current_date,
-                    "avg": None,
-                    "min": None,
-                    "max": None,
-                }
-            )
-        current_date += delta
-
-    if len(timestamps) > 0:
-        oldest_date = timestamps[0]
-        if (
-            oldest_date <= start_date
-            and len(intervals) > 0
-            and intervals[0]["avg"] is None
-        ):
-            # we're missing the first datapoint but we can carry forward
-            # and older measurement that was selected
-            measurement = by_timestamp[oldest_date]
-            intervals[0] = {
-                **measurement,
-                "timestamp_bin": start_date,
-            }
+    # index of the measurement in each interval (or -1)
+    offsets = timestamps - int(start_date.timestamp())
+    step = int(delta.total_seconds())
+    in_range = (offsets >= 0) & (offsets % step == 0) & (offsets // step < count)
+    slots = np.full(count, -1, dtype=np.int64)
+    slots[offsets[in_range] // step] = np.flatnonzero(in_range)
+
+    carry_forward = (
+        count > 0
+        and timestamps[oldest] <= start_date.timestamp()
+        and (slots[0] < 0 or measurements[slots[0]]["avg"] is None)
+    )
+
+    if max_points is not None and count > max_points:
+        points = [measurements[slot] for slot in slots[slots >= 0].tolist()]
+        if carry_forward:
+            if slots[0] >= 0:
+                points.pop(0)
+            points.insert(0, {**measurements[oldest], "timestamp_bin": start_date})
+        points = [point for point in points if point["avg"] is not None]
+        if len(points) <= max_points:
+            return points
+
+        x = np.array(
+            [
+                point["timestamp_bin"].replace(tzinfo=timezone.utc).timestamp()
+                for point in points
+            ]
+        )
+        y = np.array([float(point["avg"]) for point in points])
+        return [points[idx] for idx in lttb_downsample(x, y, max_points)]
+
+    intervals = [
+        measurements[slot]
+        if slot >= 0
+        else {
+            "timestamp_bin": start_date + idx * delta,
+            "avg": None,
+            "min": None,
+            "max": None,
+        }
+        for idx, slot in enumerate(slots.tolist())
+    ]
+
+    if carry_forward:
+        # we're missing the first datapoint but we can carry forward
+        # and older measurement that was selected
+        intervals[0] = {
+            **measurements[oldest],
+            "timestamp_bin": start_date,
+        }
 
     return intervals
 
@@ -265,52 +497,74 @@ def coverage_fallback_query(
     **filters,
 ):
     """
-    Query for coverage timeseries directly from the database
+    Query for coverage timeseries directly from the database (from the daily
+    rollup of the commits' coverage when `COMMIT_COVERAGE_ROLLUP_ENABLED` is set)
     """
+    if settings.COMMIT_COVERAGE_ROLLUP_ENABLED:
+        queryset = CommitCoverageDaily.objects.all()
+        timestamp_field = "day"
+        coverage = _rollup_coverage
+        # the rollup has a row per day rather than a timestamp per commit
+        filters = {
+            key.replace("timestamp", timestamp_field, 1)
+            if key.startswith("timestamp__")
+            else key: value
+            for key, value in filters.items()
+        }
+    else:
+        queryset = Commit.objects.all()
+        timestamp_field = "timestamp"
+        coverage = _commits_coverage
+
     timestamp_filters = {}
     if start_date is not None:
-        timestamp_filters["timestamp__gte"] = start_date
+        timestamp_filters[f"{timestamp_field}__gte"] = start_date
     if end_date is not None:
-        timestamp_filters["timestamp__lte"] = end_date
-    commits = Commit.objects.filter(**timestamp_filters).filter(**filters)
-    commits = _filter_repos(commits, repos, column_name="repoid")
-    commits = _commits_coverage(commits, interval)
+        timestamp_filters[f"{timestamp_field}__lte"] = end_date
+    measurements = queryset.filter(**timestamp_filters).filter(**filters)
+    measurements = _filter_repos(measurements, repos, column_name="repoid")
+    measurements = coverage(measurements, interval)
 
     if start_date:
         # The first measurement of the specified range (`start_date` through `end_date`)
         # may be missing the first datapoint.  In order for consumers of this API to have
         # usable data to show we can carry an older datapoint forward to the first time bin.
         # Including this older datapoint in the result set makes that possible.
-        older = Commit.objects.filter(
-            timestamp__lt=start_date,
+        older = queryset.filter(
+            **{f"{timestamp_field}__lt": start_date},
         ).filter(**filters)
         older = _filter_repos(older, repos, column_name="repoid")
-        older = _commits_coverage(older, interval).order_by("-timestamp_bin")[:1]
+        older = coverage(older, interval).order_by("-timestamp_bin")[:1]
 
-        return older.union(commits).order_by("timestamp_bin")
+        return older.union(measurements).order_by("timestamp_bin")
     else:
-        return commits.order_by("timestamp_bin")
+        return measurements.order_by("timestamp_bin")
+
+
+_date_bin_intervals = {
+    Interval.INTERVAL_1_DAY: "1 day",
+    Interval.INTERVAL_7_DAY: "7 days",
+    Interval.INTERVAL_30_DAY: "30 days",
+}
+
+
+def _date_bin(interval: Interval, expression) -> Func:
+    return Func(
+        Value(_date_bin_intervals[interval]),
+        expression,
+        Value("2000-01-03"),  # mimic how Timescale aligns bins
+        function="date_bin",
+        template="%(function)s(%(expressions)s) at time zone 'utc'",
+        output_field=DateTimeField(),
+    )
 
 
 def _commits_coverage(
     commits_queryset: QuerySet[Commit], interval: Interval
 ) -> QuerySet[Commit]:
-    intervals = {
-        Interval.INTERVAL_1_DAY: "1 day",
-        Interval.INTERVAL_7_DAY: "7 days",
-        Interval.INTERVAL_30_DAY: "30 days",
-    }
-
     return (
         commits_queryset.annotate(
-            timestamp_bin=Func(
-                Value(intervals[interval]),
-                F("timestamp"),
-                Value("2000-01-03"),  # mimic how Timescale aligns bins
-                function="date_bin",
-                template="%(function)s(%(expressions)s) at time zone 'utc'",
-                output_field=DateTimeField(),
-            ),
+            timestamp_bin=_date_bin(interval, F("timestamp")),
             coverage=Cast(KeyTextTransform("c", "totals"), output_field=FloatField()),
         )
         .filter(coverage__isnull=False)
@@ -324,6 +578,251 @@ def _commits_coverage(
     )
 
 
+def _rollup_coverage(
+    rollup_queryset: QuerySet[CommitCoverageDaily], interval: Interval
+) -> QuerySet[CommitCoverageDaily]:
+    return (
+        rollup_queryset.annotate(
+            timestamp_bin=_date_bin(
+                interval, Cast("day", output_field=DateTimeWithoutTZField())
+            ),
+        )
+        .values("timestamp_bin")
+        .annotate(
+            min=Min("coverage_min"),
+            max=Max("coverage_max"),
+            avg=ExpressionWrapper(
+                Sum("coverage_sum") / Sum("commit_count"), output_field=FloatField()
+            ),
+        )
+        .order_by("timestamp_bin")
+    )
+
+
+# bins that ended more recently than this may still get measurements (from
+# uploads that are still processing or pending continuous aggregate refreshes)
+closed_bin_delay = timedelta(days=1)
+
+
+def _aware(date: datetime) -> datetime:
+    if timezone.is_naive(date):
+        return timezone.make_aware(date, timezone.utc)
+    return date
+
+
+def _encode_measurement(measurement: dict) -> dict:
+    return {
+        "timestamp_bin": measurement["timestamp_bin"].isoformat(),
+        "min": measurement["min"],
+        "max": measurement["max"],
+        "avg": str(measurement["avg"]) if measurement["avg"] is not None else None,
+    }
+
+
+def _decode_measurement(measurement: dict) -> dict:
+    return {
+        "timestamp_bin": datetime.fromisoformat(measurement["timestamp_bin"]),
+        "min": measurement["min"],
+        "max": measurement["max"],
+        "avg": Decimal(measurement["avg"]) if measurement["avg"] is not None else None,
+    }
+
+
+# number of bins of the blocks the closed bins are cached in
+cache_block_bins = 30
+
+
+def _cache_block_start(interval: Interval, date: datetime) -> datetime:
+    """
+    Start of the cache block containing `date`.  The blocks are aligned like
+    TimescaleDB's time buckets so that they're the same for every request.
+    """
+    block_delta = interval_deltas[interval] * cache_block_bins
+    aligning_date = datetime(2000, 1, 3, tzinfo=timezone.utc)
+    return (
+        aligning_date + math.floor((date - aligning_date) / block_delta) * block_delta
+    )
+
+
+def _cached_coverage_blocks(
+    repository: Repository,
+    interval: Interval,
+    block_starts: List[datetime],
+    branch: str,
+) -> List[List[dict]]:
+    """
+    Coverage measurements of each of the given (closed) cache blocks, including
+    the older measurement carried forward to the start of the block.
+    """
+    delta = interval_deltas[interval]
+    keys = [
+        "/".join(
+            [
+                "timeseries/coverage",
+                str(repository.pk),
+                interval.name,
+                block_start.isoformat(),
+                branch,
+            ]
+        )
+        for block_start in block_starts
+    ]
+
+    redis = get_redis_connection()
+    try:
+        cached = redis.mget(keys)
+    except RedisError:
+        log.warning("Failed to read cached measurements", exc_info=True)
+        cached = [None] * len(keys)
+
+    blocks = []
+    for key, block_start, measurements in zip(keys, block_starts, cached):
+        if measurements is not None:
+            metrics.incr("timeseries.measurements_cache.hit")
+            blocks.append([_decode_measurement(m) for m in json.loads(measurements)])
+            continue
+
+        metrics.incr("timeseries.measurements_cache.miss")
+        measurements = list(
+            coverage_measurements(
+                interval,
+                start_date=block_start,
+                end_date=block_start + (cache_block_bins - 1) * delta,
+                owner_id=repository.author_id,
+                repo_id=repository.pk,
+                measurable_id=str(repository.pk),
+                branch=branch,
+            )
+        )
+        try:
+            redis.set(
+                key,
+                json.dumps([_encode_measurement(m) for m in measurements]),
+                ex=settings.TIMESERIES_MEASUREMENTS_CACHE_TTL,
+            )
+        except RedisError:
+            log.warning("Failed to cache measurements", exc_info=True)
+        blocks.append(measurements)
+    return blocks
+
+
+def cached_repository_coverage_measurements(
+    repository: Repository,
+    interval: Interval,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    branch: Optional[str] = None,
+) -> List[dict]:
+    """
+    Same as `coverage_measurements` for a repository but the blocks of
+    `cache_block_bins` bins that are closed (i.e. won't get new measurements)
+    are served from a cache.  Only the bins of the block that is still open are
+    queried every time.
+    """
+    branch = branch or repository.branch
+    filters = dict(
+        owner_id=repository.author_id,
+        repo_id=repository.pk,
+        measurable_id=str(repository.pk),
+        branch=branch,
+    )
+    start_date = _aware(start_date) if start_date is not None else None
+    end_date = _aware(end_date) if end_date is not None else None
+
+    open_bin = aligned_start_date(interval, timezone.now() - closed_bin_delay)
+    # the blocks before this one only have closed bins
+    open_block = _cache_block_start(interval, open_bin)
+
+    if start_date is not None:
+        start_bin = aligned_start_date(interval, start_date)
+    else:
+        start_bin = (
+            MeasurementSummary.agg_by(interval)
+            .filter(name=MeasurementName.COVERAGE.value, **filters)
+            .order_by("timestamp_bin")
+            .values_list("timestamp_bin", flat=True)
+            .first()
+        )
+        if start_bin is None:
+            return []
+
+    if start_bin >= open_block or (end_date is not None and end_date < start_bin):
+        # nothing to read from the cache
+        return list(
+            coverage_measurements(
+                interval, start_date=start_date, end_date=end_date, **filters
+            )
+        )
+
+    block_delta = interval_deltas[interval] * cache_block_bins
+    block_starts = []
+    block_start = _cache_block_start(interval, start_bin)
+    while block_start < open_block and (end_date is None or block_start <= end_date):
+        block_starts.append(block_start)
+        block_start += block_delta
+
+    measurements = []
+    for block_start, block in zip(
+        block_starts,
+        _cached_coverage_blocks(repository, interval, block_starts, branch),
+    ):
+        if measurements:
+            # only the first block needs its carried forward measurement
+            block = [m for m in block if m["timestamp_bin"] >= block_start]
+        measurements += block
+
+    if end_date is None or end_date >= open_block:
+        measurements += list(
+            coverage_measurements(
+                interval, end_date=end_date, timestamp_bin__gte=open_block, **filters
+            )
+        )
+
+    if start_date is None:
+        start_date = start_bin
+        older = []
+    else:
+        # only the latest measurement before `start_date` is kept (like
+        # `coverage_measurements`)
+        older = [m for m in measurements if m["timestamp_bin"] < start_date][-1:]
+    return older + [
+        m
+        for m in measurements
+        if m["timestamp_bin"] >= start_date
+        and (end_date is None or m["timestamp_bin"] <= end_date)
+    ]
+
+
+def _partially_backfilled_measurements(
+    interval: Interval,
+    backfilled_since: datetime,
+    timescale_query: Callable[..., Iterable[dict]],
+    fallback_query: Callable[..., Iterable[dict]],
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+) -> Iterable[dict]:
+    """
+    Returns the measurements of the bins after `backfilled_since` from Timescale
+    and computes the older ones from the primary database.
+    """
+    # the first bin that is entirely backfilled
+    split_date = aligned_start_date(interval, _aware(backfilled_since))
+    if split_date < _aware(backfilled_since):
+        split_date += interval_deltas[interval]
+
+    if start_date is not None and _aware(start_date) >= split_date:
+        return timescale_query(start_date=start_date, end_date=end_date)
+    if end_date is not None and _aware(end_date) < split_date:
+        return fallback_query(start_date=start_date, end_date=end_date)
+
+    return [
+        *fallback_query(
+            start_date=start_date, end_date=end_date, timestamp__lt=split_date
+        ),
+        *timescale_query(end_date=end_date, timestamp_bin__gte=split_date),
+    ]
+
+
 def repository_coverage_measurements_with_fallback(
     repository: Repository,
     interval: Interval,
@@ -345,6 +844,14 @@ def repository_coverage_measurements_with_fallback(
 
     if settings.TIMESERIES_ENABLED and dataset and dataset.is_backfilled():
         # timeseries data is ready
+        if settings.TIMESERIES_MEASUREMENTS_CACHE_ENABLED:
+            return cached_repository_coverage_measurements(
+                repository,
+                interval,
+                start_date=start_date,
+                end_date=end_date,
+                branch=branch,
+            )
         return coverage_measurements(
             interval,
             start_date=start_date,
@@ -354,6 +861,30 @@ def repository_coverage_measurements_with_fallback(
             measurable_id=str(repository.pk),
             branch=branch or repository.branch,
         )
+
+    backfilled_since = dataset.backfilled_since() if dataset else None
+    if settings.TIMESERIES_ENABLED and backfilled_since is not None:
+        # the most recent windows are backfilled
+        return _partially_backfilled_measurements(
+            interval,
+            backfilled_since,
+            partial(
+                coverage_measurements,
+                interval,
+                owner_id=repository.author_id,
+                repo_id=repository.pk,
+                measurable_id=str(repository.pk),
+                branch=branch or repository.branch,
+            ),
+            partial(
+                coverage_fallback_query,
+                interval,
+                repository_id=repository.pk,
+                branch=branch or repository.branch,
+            ),
+            start_date=start_date,
+            end_date=end_date,
+        )
     else:
         if settings.TIMESERIES_ENABLED and not dataset:
             # we need to backfill
@@ -373,6 +904,28 @@ def repository_coverage_measurements_with_fallback(
         )
 
 
+def _owner_measurements_ready(
+    owner: Owner, repo_ids: Iterable[int], owner_datasets: Iterable[Dataset]
+) -> bool:
+    """
+    Whether the owner-level measurements can be used for the given repos (i.e.
+    they're all of the owner's repos and their owner-level measurements are
+    backfilled).
+    """
+    if len(owner_datasets) != len(repo_ids) or not all(
+        dataset.is_backfilled() for dataset in owner_datasets
+    ):
+        return False
+
+    # `repo_ids` are the owner's repos so they're all of them unless there's
+    # another one
+    return (
+        not Repository.objects.filter(author_id=owner.pk)
+        .exclude(repoid__in=repo_ids)
+        .exists()
+    )
+
+
 def owner_coverage_measurements_with_fallback(
     owner: Owner,
     repo_ids: Iterable[str],
@@ -385,29 +938,78 @@ def owner_coverage_measurements_with_fallback(
     If those are not available then we trigger a backfill and return computed results
     directly from the primary database (much slower to query).
     """
+    owner_measurements_enabled = (
+        settings.TIMESERIES_ENABLED and settings.TIMESERIES_OWNER_MEASUREMENTS_ENABLED
+    )
+
     datasets = []
+    owner_datasets = []
     if settings.TIMESERIES_ENABLED:
-        datasets = Dataset.objects.filter(
-            name=MeasurementName.COVERAGE.value,
-            repository_id__in=repo_ids,
+        names = [MeasurementName.COVERAGE.value]
+        if owner_measurements_enabled:
+            names.append(MeasurementName.OWNER_COVERAGE.value)
+        for dataset in Dataset.objects.filter(
+            name__in=names, repository_id__in=repo_ids
+        ):
+            if dataset.name == MeasurementName.OWNER_COVERAGE.value:
+                owner_datasets.append(dataset)
+            else:
+                datasets.append(dataset)
+
+    if owner_measurements_enabled:
+        # the owner-level measurements are backfilled per repo as well
+        owner_dataset_repo_ids = set(
+            dataset.repository_id for dataset in owner_datasets
+        )
+        created_datasets = Dataset.objects.bulk_create(
+            [
+                Dataset(
+                    name=MeasurementName.OWNER_COVERAGE.value, repository_id=repo_id
+                )
+                for repo_id in set(repo_ids) - owner_dataset_repo_ids
+            ]
         )
+        for dataset in created_datasets:
+            trigger_backfill(dataset)
 
     all_backfilled = len(datasets) == len(repo_ids) and all(
         dataset.is_backfilled() for dataset in datasets
     )
 
     # we can't join across databases so we need to load all this into memory.
-    # select just the needed columns to keep this manageable
+    # select just the needed columns to keep this manageable (it's only loaded
+    # when the measurements of each repo or the fallback are queried)
     repos = Repository.objects.filter(repoid__in=repo_ids).only("repoid", "branch")
 
+    if owner_measurements_enabled and _owner_measurements_ready(
+        owner, repo_ids, owner_datasets
+    ):
+        # the owner-level measurements cover exactly these repos so there's no
+        # need to filter by each of them
+        timescale_query = partial(owner_coverage_measurements, owner.pk, interval)
+    else:
+        timescale_query = partial(
+            coverage_measurements, interval, owner_id=owner.pk, repos=repos
+        )
+
     if settings.TIMESERIES_ENABLED and all_backfilled:
         # timeseries data is ready
-        return coverage_measurements(
+        return timescale_query(start_date=start_date, end_date=end_date)
+
+    backfilled_since = [dataset.backfilled_since() for dataset in datasets]
+    if (
+        settings.TIMESERIES_ENABLED
+        and len(datasets) == len(repo_ids)
+        and all(since is not None for since in backfilled_since)
+    ):
+        # the most recent windows of every dataset are backfilled
+        return _partially_backfilled_measurements(
             interval,
+            max(backfilled_since),
+            timescale_query,
+            partial(coverage_fallback_query, interval, repos=repos),
             start_date=start_date,
             end_date=end_date,
-            owner_id=owner.pk,
-            repos=repos,
         )
     else:
         if settings.TIMESERIES_ENABLED:
@@ -0,0 +1,34 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from timeseries.helpers import refresh_dirty_measurement_summaries
+
+
+class Command(BaseCommand):
+    """
+    Refreshes the continuous aggregates over the days whose measurements changed
+    (see `MeasurementDirtyBin`).  Meant to be run periodically, either by a
+    scheduler or with `--every`.
+    """
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--every",
+            type=int,
+            help="keep refreshing every given number of seconds",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.TIMESERIES_ENABLED:
+            self.stderr.write("timeseries is not enabled")
+            return
+
+        while True:
+            count = refresh_dirty_measurement_summaries()
+            self.stdout.write(f"refreshed {count} windows")
+
+            if not options["every"]:
+                break
+            time.sleep(options["every"])
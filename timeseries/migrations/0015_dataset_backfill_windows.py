@@ -0,0 +1,33 @@
+# Generated by Django 4.2.2 on 2023-07-11 14:02
+
+from django.db import migrations
+
+import core.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        (
+            "timeseries",
+            "0014_remove_measurement_timeseries_measurement_flag_unique_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dataset",
+            name="backfill_end_date",
+            field=core.models.DateTimeWithoutTZField(null=True),
+        ),
+        migrations.AddField(
+            model_name="dataset",
+            name="backfill_enqueued_at",
+            field=core.models.DateTimeWithoutTZField(null=True),
+        ),
+        migrations.AddField(
+            model_name="dataset",
+            name="backfill_start_date",
+            field=core.models.DateTimeWithoutTZField(null=True),
+        ),
+    ]
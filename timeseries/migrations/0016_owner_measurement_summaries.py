@@ -0,0 +1,83 @@
+# Generated by Django 4.2.2 on 2023-08-10 09:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_model(days):
+    return migrations.CreateModel(
+        name=f"OwnerMeasurementSummary{days}Day",
+        fields=[
+            (
+                "timestamp_bin",
+                models.DateTimeField(primary_key=True, serialize=False),
+            ),
+            ("owner_id", models.BigIntegerField()),
+            ("name", models.TextField()),
+            ("value_avg", models.FloatField()),
+            ("value_max", models.FloatField()),
+            ("value_min", models.FloatField()),
+            ("value_count", models.FloatField()),
+        ],
+        options={
+            "db_table": f"timeseries_owner_measurement_summary_{days}day",
+            "ordering": ["timestamp_bin"],
+            "abstract": False,
+            "managed": False,
+        },
+    )
+
+
+class Migration(migrations.Migration):
+    """
+    Continuous aggregates of the owner-level measurements.  Timescale indexes
+    the `(owner_id, timestamp_bin)` and `(name, timestamp_bin)` columns of the
+    aggregates so charting an owner is a single range scan.
+    """
+
+    dependencies = [
+        ("timeseries", "0015_dataset_backfill_windows"),
+    ]
+
+    operations = (
+        [create_model(days) for days in [1, 7, 30]]
+        + [
+            migrations.RunSQL(
+                f"""
+                create materialized view timeseries_owner_measurement_summary_{days}day
+                with (timescaledb.continuous) as
+                select
+                    owner_id,
+                    name,
+                    time_bucket(interval '{days} days', timestamp) as timestamp_bin,
+                    avg(value) as value_avg,
+                    max(value) as value_max,
+                    min(value) as value_min,
+                    count(value) as value_count
+                from timeseries_measurement
+                where name = 'owner_coverage'
+                group by
+                    owner_id, name, timestamp_bin
+                with no data;
+                select add_continuous_aggregate_policy(
+                    'timeseries_owner_measurement_summary_{days}day',
+                    start_offset => NULL,
+                    end_offset => NULL,
+                    schedule_interval => INTERVAL '1 h'
+                );
+                """,
+                reverse_sql=f"drop materialized view timeseries_owner_measurement_summary_{days}day;",
+            )
+            for days in [1, 7, 30]
+        ]
+        + [
+            migrations.RunSQL(
+                f"""
+                alter materialized view timeseries_owner_measurement_summary_{days}day set (timescaledb.materialized_only = true);
+                """,
+                reverse_sql=migrations.RunSQL.noop,
+            )
+            for days in [1, 7, 30]
+            if not settings.TIMESERIES_REAL_TIME_AGGREGATES
+        ]
+    )
@@ -0,0 +1,67 @@
+# Generated by Django 4.2.2 on 2023-08-14 15:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Measurements are inserted by the worker so the changed days are recorded
+    by a trigger.  Marking a day that's already dirty only bumps `dirtied_at`
+    (which keeps a day changed during a refresh from being cleared by it).
+    """
+
+    dependencies = [
+        ("timeseries", "0016_owner_measurement_summaries"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MeasurementDirtyBin",
+            fields=[
+                (
+                    "timestamp_bin",
+                    models.DateTimeField(primary_key=True, serialize=False),
+                ),
+                ("dirtied_at", models.DateTimeField()),
+            ],
+        ),
+        migrations.RunSQL(
+            """
+            create or replace function timeseries_measurement_mark_dirty(_timestamp timestamptz)
+            returns void as $$
+            begin
+                insert into timeseries_measurementdirtybin (timestamp_bin, dirtied_at)
+                values (time_bucket(interval '1 day', _timestamp), now())
+                on conflict (timestamp_bin) do update
+                set dirtied_at = excluded.dirtied_at;
+            end;
+            $$ language plpgsql;
+
+            create or replace function timeseries_measurement_dirty() returns trigger as $$
+            begin
+                if tg_op in ('INSERT', 'UPDATE') then
+                    perform timeseries_measurement_mark_dirty(new.timestamp);
+                end if;
+                if tg_op = 'DELETE' or (
+                    tg_op = 'UPDATE'
+                    and time_bucket(interval '1 day', old.timestamp)
+                        <> time_bucket(interval '1 day', new.timestamp)
+                ) then
+                    perform timeseries_measurement_mark_dirty(old.timestamp);
+                end if;
+                return null;
+            end;
+            $$ language plpgsql;
+
+            create trigger timeseries_measurement_dirty
+            after insert or update or delete on timeseries_measurement
+            for each row
+            execute procedure timeseries_measurement_dirty();
+            """,
+            reverse_sql="""
+            drop trigger if exists timeseries_measurement_dirty on timeseries_measurement;
+            drop function if exists timeseries_measurement_dirty();
+            drop function if exists timeseries_measurement_mark_dirty(timestamptz);
+            """,
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.2 on 2023-08-16 10:12
+
+from django.db import migrations
+
+import core.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("timeseries", "0017_measurementdirtybin"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dataset",
+            name="backfill_done_start_date",
+            field=core.models.DateTimeWithoutTZField(null=True),
+        ),
+    ]
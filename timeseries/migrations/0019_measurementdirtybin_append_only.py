@@ -0,0 +1,93 @@
+# Generated by Django 4.2.2 on 2023-08-16 11:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Upserting a row per day serialized all the measurement writes of a day on
+    that row (and `now()` is the transaction start so a slow write could be
+    cleared by a refresh that never saw it).  The ledger is append-only instead:
+    every change inserts a row and the refresh deletes the rows it read.
+    Timescale doesn't support transition tables on hypertables so this stays a
+    row-level trigger.
+    """
+
+    dependencies = [
+        ("timeseries", "0018_dataset_backfill_done_start_date"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RemoveField(
+                    model_name="measurementdirtybin",
+                    name="dirtied_at",
+                ),
+                migrations.AlterField(
+                    model_name="measurementdirtybin",
+                    name="timestamp_bin",
+                    field=models.DateTimeField(),
+                ),
+                migrations.AddField(
+                    model_name="measurementdirtybin",
+                    name="id",
+                    field=models.BigAutoField(primary_key=True, serialize=False),
+                    preserve_default=False,
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    """
+                    alter table timeseries_measurementdirtybin
+                    drop constraint timeseries_measurementdirtybin_pkey;
+
+                    alter table timeseries_measurementdirtybin
+                    drop column dirtied_at;
+
+                    alter table timeseries_measurementdirtybin
+                    add column id bigserial primary key;
+                    """,
+                    reverse_sql="""
+                    delete from timeseries_measurementdirtybin a
+                    using timeseries_measurementdirtybin b
+                    where a.timestamp_bin = b.timestamp_bin and a.id < b.id;
+
+                    alter table timeseries_measurementdirtybin
+                    drop column id;
+
+                    alter table timeseries_measurementdirtybin
+                    add column dirtied_at timestamptz not null default now();
+
+                    alter table timeseries_measurementdirtybin
+                    alter column dirtied_at drop default;
+
+                    alter table timeseries_measurementdirtybin
+                    add primary key (timestamp_bin);
+                    """,
+                ),
+            ],
+        ),
+        migrations.RunSQL(
+            """
+            create or replace function timeseries_measurement_mark_dirty(_timestamp timestamptz)
+            returns void as $$
+            begin
+                insert into timeseries_measurementdirtybin (timestamp_bin)
+                values (time_bucket(interval '1 day', _timestamp));
+            end;
+            $$ language plpgsql;
+            """,
+            reverse_sql="""
+            create or replace function timeseries_measurement_mark_dirty(_timestamp timestamptz)
+            returns void as $$
+            begin
+                insert into timeseries_measurementdirtybin (timestamp_bin, dirtied_at)
+                values (time_bucket(interval '1 day', _timestamp), now())
+                on conflict (timestamp_bin) do update
+                set dirtied_at = excluded.dirtied_at;
+            end;
+            $$ language plpgsql;
+            """,
+        ),
+    ]
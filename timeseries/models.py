@@ -1,10 +1,13 @@
 from datetime import datetime, timedelta
 from enum import Enum
+from typing import List, Optional, Tuple
 
 import django.db.models as models
+from django.db.models import Exists, OuterRef
 from django.utils import timezone
 
-from core.models import DateTimeWithoutTZField
+from core.models import Commit, DateTimeWithoutTZField
+from reports.models import UploadFlagMembership
 
 
 class Interval(Enum):
@@ -17,6 +20,9 @@ class MeasurementName(Enum):
     COVERAGE = "coverage"
     FLAG_COVERAGE = "flag_coverage"
     COMPONENT_COVERAGE = "component_coverage"
+    # coverage of the commits on the default branch of any of the owner's
+    # repositories (`measurable_id` is the owner id)
+    OWNER_COVERAGE = "owner_coverage"
 
 
 class Measurement(models.Model):
@@ -121,6 +127,77 @@ class MeasurementSummary30Day(MeasurementSummary):
         db_table = "timeseries_measurement_summary_30day"
 
 
+class OwnerMeasurementSummary(models.Model):
+    """
+    Owner-level summaries, aggregated over all the owner's repositories.
+    """
+
+    timestamp_bin = models.DateTimeField(primary_key=True)
+    owner_id = models.BigIntegerField()
+    name = models.TextField()
+    value_avg = models.FloatField()
+    value_max = models.FloatField()
+    value_min = models.FloatField()
+    value_count = models.FloatField()
+
+    @classmethod
+    def agg_by(cls, interval: Interval) -> models.Manager:
+        model_classes = {
+            Interval.INTERVAL_1_DAY: OwnerMeasurementSummary1Day,
+            Interval.INTERVAL_7_DAY: OwnerMeasurementSummary7Day,
+            Interval.INTERVAL_30_DAY: OwnerMeasurementSummary30Day,
+        }
+
+        model_class = model_classes.get(interval)
+        if not model_class:
+            raise ValueError(f"cannot aggregate by '{interval}'")
+        return model_class.objects
+
+    class Meta:
+        abstract = True
+        # these are backed by TimescaleDB "continuous aggregates"
+        # (materialized views)
+        managed = False
+        ordering = ["timestamp_bin"]
+
+
+class OwnerMeasurementSummary1Day(OwnerMeasurementSummary):
+    class Meta(OwnerMeasurementSummary.Meta):
+        db_table = "timeseries_owner_measurement_summary_1day"
+
+
+class OwnerMeasurementSummary7Day(OwnerMeasurementSummary):
+    class Meta(OwnerMeasurementSummary.Meta):
+        db_table = "timeseries_owner_measurement_summary_7day"
+
+
+class OwnerMeasurementSummary30Day(OwnerMeasurementSummary):
+    class Meta(OwnerMeasurementSummary.Meta):
+        db_table = "timeseries_owner_measurement_summary_30day"
+
+
+class MeasurementDirtyBin(models.Model):
+    """
+    Append-only ledger of the days whose measurements changed since the
+    continuous aggregates were last refreshed.  A trigger on the measurements
+    table records a row for every change (measurements are mostly written by
+    the worker) so concurrent writes never wait on each other.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    # start of the 1 day bin
+    timestamp_bin = models.DateTimeField()
+
+
+# size of the time windows that backfills are split into
+BACKFILL_WINDOW = timedelta(days=90)
+
+# a window is treated as backfilled this long (per window enqueued before it,
+# itself included) after the backfill was enqueued, even if some of its commits
+# have no measurements - the worker can't measure every commit
+BACKFILL_WINDOW_TIMEOUT = timedelta(hours=1)
+
+
 class Dataset(models.Model):
     id = models.AutoField(primary_key=True)
 
@@ -131,11 +208,20 @@ class Dataset(models.Model):
     # different database
     repository_id = models.IntegerField(null=False)
 
-    # indicates whether the backfill task has completed for this dataset
-    # TODO: We're not really using this field anymore as a backfill task takes very long for this to be populated when finished.
-    # The solution would be to somehow have a celery task return when it's done, hence the TODO
+    # indicates whether the backfill task has completed for this dataset - set
+    # once every window of the backfill is confirmed to be done
     backfilled = models.BooleanField(null=False, default=False)
 
+    # the time range being backfilled - it's backfilled in windows of
+    # `BACKFILL_WINDOW`, newest first, starting at `backfill_enqueued_at`
+    backfill_start_date = DateTimeWithoutTZField(null=True)
+    backfill_end_date = DateTimeWithoutTZField(null=True)
+    backfill_enqueued_at = DateTimeWithoutTZField(null=True)
+
+    # the start of the oldest window confirmed to be backfilled (the windows
+    # newer than it are done too)
+    backfill_done_start_date = DateTimeWithoutTZField(null=True)
+
     created_at = DateTimeWithoutTZField(default=timezone.now, null=True)
     updated_at = DateTimeWithoutTZField(default=timezone.now, null=True)
 
@@ -160,10 +246,110 @@ class Dataset(models.Model):
 
     def is_backfilled(self):
         """
-        Returns `False` for an hour after creation.
-
-        TODO: this should eventually read `self.backfilled` which will be updated via the worker
+        Returns `True` once every window of the backfill is done.  Datasets that
+        weren't backfilled in windows return `False` for an hour after creation.
         """
+        if self.backfilled:
+            return True
+
+        if self.backfill_enqueued_at is not None and self.backfill_windows():
+            return self.backfilled_since() == self.backfill_start_date
+
         if not self.created_at:
             return False
         return datetime.now() > self.created_at + timedelta(hours=1)
+
+    def backfill_windows(self) -> List[Tuple[datetime, datetime]]:
+        """
+        The `(start_date, end_date)` windows of the backfill, newest first.
+        """
+        windows = []
+        if self.backfill_start_date is None or self.backfill_end_date is None:
+            return windows
+
+        end_date = self.backfill_end_date
+        while end_date > self.backfill_start_date:
+            start_date = max(end_date - BACKFILL_WINDOW, self.backfill_start_date)
+            windows.append((start_date, end_date))
+            end_date = start_date
+        return windows
+
+    def backfilled_since(self) -> Optional[datetime]:
+        """
+        Returns the date since which the measurements are backfilled (the newer
+        ones are saved as uploads are processed), or `None` if no window of the
+        backfill is done yet.
+
+        The windows are enqueued newest first.  A window counts as done once
+        its measurements are in Timescale (see `_is_window_backfilled`) or once
+        its `BACKFILL_WINDOW_TIMEOUT` has passed, and the progress is saved so
+        done windows aren't checked again.
+        """
+        windows = self.backfill_windows()
+        if self.backfill_enqueued_at is None or not windows:
+            return datetime.min if self.is_backfilled() else None
+
+        now = datetime.now()
+        done_start_date = self.backfill_done_start_date
+        for idx, (start_date, end_date) in enumerate(windows):
+            if done_start_date is not None and start_date >= done_start_date:
+                continue
+            timed_out = now > (
+                self.backfill_enqueued_at + BACKFILL_WINDOW_TIMEOUT * (idx + 1)
+            )
+            if not timed_out and not self._is_window_backfilled(start_date, end_date):
+                break
+            done_start_date = start_date
+
+        if done_start_date != self.backfill_done_start_date:
+            self.backfill_done_start_date = done_start_date
+            self.backfilled = done_start_date == self.backfill_start_date
+            self.save(update_fields=["backfill_done_start_date", "backfilled"])
+
+        return done_start_date
+
+    def _is_window_backfilled(self, start_date: datetime, end_date: datetime) -> bool:
+        """
+        Whether the measurements of the commits in the window have been saved.
+
+        Coverage has a measurement per commit with totals and flag coverage
+        one per flag of the commits with flagged uploads, so each such commit
+        must be measured.  The other datasets measure some of the commits
+        (components are configured in the YAML, the owner's coverage only
+        covers the default branch) so for those a window is done once any of
+        its commits is measured (or there's nothing to measure).
+        """
+        commits = Commit.objects.filter(
+            repository_id=self.repository_id,
+            timestamp__gte=start_date,
+            timestamp__lt=end_date,
+            totals__isnull=False,
+        )
+        if self.name == MeasurementName.FLAG_COVERAGE.value:
+            commits = commits.filter(
+                Exists(
+                    UploadFlagMembership.objects.filter(
+                        report_session__report__commit_id=OuterRef("pk")
+                    )
+                )
+            )
+        commit_count = commits.count()
+        if commit_count == 0:
+            return True
+
+        measured = (
+            Measurement.objects.filter(
+                name=self.name,
+                repo_id=self.repository_id,
+                timestamp__gte=timezone.make_aware(start_date, timezone.utc),
+                timestamp__lt=timezone.make_aware(end_date, timezone.utc),
+            )
+            .values("commit_sha")
+            .distinct()
+        )
+        if self.name in (
+            MeasurementName.COVERAGE.value,
+            MeasurementName.FLAG_COVERAGE.value,
+        ):
+            return measured.count() >= commit_count
+        return measured.exists()
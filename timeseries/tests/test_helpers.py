@@ -1,9 +1,11 @@
 from datetime import datetime, timezone
 from unittest.mock import call, patch
 
+import fakeredis
+import numpy as np
 import pytest
 from django.conf import settings
-from django.test import TransactionTestCase
+from django.test import TransactionTestCase, override_settings
 from django.utils import timezone
 from freezegun import freeze_time
 from freezegun.api import FakeDatetime
@@ -14,13 +16,23 @@ from codecov_auth.tests.factories import OwnerFactory
 from core.tests.factories import CommitFactory, RepositoryFactory
 from reports.tests.factories import RepositoryFlagFactory
 from timeseries.helpers import (
+    cached_repository_coverage_measurements,
     coverage_measurements,
+    dirty_windows,
     fill_sparse_measurements,
+    lttb_downsample,
     owner_coverage_measurements_with_fallback,
+    refresh_dirty_measurement_summaries,
     refresh_measurement_summaries,
     repository_coverage_measurements_with_fallback,
 )
-from timeseries.models import Dataset, Interval, Measurement, MeasurementName
+from timeseries.models import (
+    Dataset,
+    Interval,
+    Measurement,
+    MeasurementDirtyBin,
+    MeasurementName,
+)
 from timeseries.tests.factories import DatasetFactory, MeasurementFactory
 
 
@@ -61,15 +73,148 @@ class RefreshMeasurementSummariesTest(TransactionTestCase):
             end_date=datetime(2022, 1, 2, 0, 0, 0),
         )
 
-        assert execute.call_count == 3
+        assert execute.call_count == 6
         sql_statements = [call[0][0] for call in execute.call_args_list]
         assert sql_statements == [
             "CALL refresh_continuous_aggregate('timeseries_measurement_summary_1day', '2022-01-01T00:00:00', '2022-01-02T00:00:00')",
+            "CALL refresh_continuous_aggregate('timeseries_owner_measurement_summary_1day', '2022-01-01T00:00:00', '2022-01-02T00:00:00')",
             "CALL refresh_continuous_aggregate('timeseries_measurement_summary_7day', '2022-01-01T00:00:00', '2022-01-02T00:00:00')",
+            "CALL refresh_continuous_aggregate('timeseries_owner_measurement_summary_7day', '2022-01-01T00:00:00', '2022-01-02T00:00:00')",
             "CALL refresh_continuous_aggregate('timeseries_measurement_summary_30day', '2022-01-01T00:00:00', '2022-01-02T00:00:00')",
+            "CALL refresh_continuous_aggregate('timeseries_owner_measurement_summary_30day', '2022-01-01T00:00:00', '2022-01-02T00:00:00')",
         ]
 
 
+def test_dirty_windows():
+    dirty_bins = [
+        datetime(2022, 1, 1, tzinfo=timezone.utc),
+        datetime(2022, 1, 2, tzinfo=timezone.utc),
+        datetime(2022, 1, 5, tzinfo=timezone.utc),
+        datetime(2022, 1, 1, tzinfo=timezone.utc),
+    ]
+
+    assert dirty_windows(Interval.INTERVAL_1_DAY, dirty_bins) == [
+        (
+            datetime(2022, 1, 1, tzinfo=timezone.utc),
+            datetime(2022, 1, 3, tzinfo=timezone.utc),
+        ),
+        (
+            datetime(2022, 1, 5, tzinfo=timezone.utc),
+            datetime(2022, 1, 6, tzinfo=timezone.utc),
+        ),
+    ]
+    # weekly bins start on Mondays (2021-12-27 and 2022-01-03)
+    assert dirty_windows(Interval.INTERVAL_7_DAY, dirty_bins) == [
+        (
+            datetime(2021, 12, 27, tzinfo=timezone.utc),
+            datetime(2022, 1, 10, tzinfo=timezone.utc),
+        ),
+    ]
+    assert dirty_windows(Interval.INTERVAL_1_DAY, []) == []
+
+
+@pytest.mark.skipif(
+    not settings.TIMESERIES_ENABLED, reason="requires timeseries data storage"
+)
+class RefreshDirtyMeasurementSummariesTest(TransactionTestCase):
+    databases = {"timeseries"}
+
+    def test_measurements_mark_bins_dirty(self):
+        MeasurementFactory(
+            measurable_id="1",
+            commit_sha="commit1",
+            timestamp=datetime(2022, 1, 1, 1, 0, 0),
+        )
+        MeasurementFactory(
+            measurable_id="1",
+            commit_sha="commit2",
+            timestamp=datetime(2022, 1, 1, 2, 0, 0),
+        )
+        MeasurementFactory(
+            measurable_id="1",
+            commit_sha="commit3",
+            timestamp=datetime(2022, 1, 3, 2, 0, 0),
+        )
+
+        # a row for every change
+        assert list(
+            MeasurementDirtyBin.objects.order_by("id").values_list(
+                "timestamp_bin", flat=True
+            )
+        ) == [
+            datetime(2022, 1, 1, tzinfo=timezone.utc),
+            datetime(2022, 1, 1, tzinfo=timezone.utc),
+            datetime(2022, 1, 3, tzinfo=timezone.utc),
+        ]
+
+        MeasurementDirtyBin.objects.all().delete()
+        Measurement.objects.filter(commit_sha="commit1").update(
+            timestamp=datetime(2022, 1, 5, 1, 0, 0, tzinfo=timezone.utc)
+        )
+        assert list(
+            MeasurementDirtyBin.objects.order_by("timestamp_bin").values_list(
+                "timestamp_bin", flat=True
+            )
+        ) == [
+            datetime(2022, 1, 1, tzinfo=timezone.utc),
+            datetime(2022, 1, 5, tzinfo=timezone.utc),
+        ]
+
+    @patch("timeseries.helpers._refresh_continuous_aggregate")
+    def test_refresh_dirty_measurement_summaries(self, refresh_continuous_aggregate):
+        MeasurementDirtyBin.objects.create(
+            timestamp_bin=datetime(2022, 1, 1, tzinfo=timezone.utc),
+        )
+
+        assert refresh_dirty_measurement_summaries() == 3
+
+        windows = {
+            Interval.INTERVAL_1_DAY: (
+                datetime(2022, 1, 1, tzinfo=timezone.utc),
+                datetime(2022, 1, 2, tzinfo=timezone.utc),
+            ),
+            Interval.INTERVAL_7_DAY: (
+                datetime(2021, 12, 27, tzinfo=timezone.utc),
+                datetime(2022, 1, 3, tzinfo=timezone.utc),
+            ),
+            Interval.INTERVAL_30_DAY: (
+                datetime(2021, 12, 8, tzinfo=timezone.utc),
+                datetime(2022, 1, 7, tzinfo=timezone.utc),
+            ),
+        }
+        assert [
+            call_args[0][1:]
+            for call_args in refresh_continuous_aggregate.call_args_list
+        ] == [
+            (f"timeseries_{prefix}measurement_summary_{interval.value}day", *window)
+            for interval, window in windows.items()
+            for prefix in ["", "owner_"]
+        ]
+
+    def test_refresh_clears_refreshed_bins(self):
+        MeasurementDirtyBin.objects.create(
+            timestamp_bin=datetime(2022, 1, 1, tzinfo=timezone.utc),
+        )
+
+        with patch(
+            "timeseries.helpers._refresh_continuous_aggregate"
+        ) as refresh_continuous_aggregate:
+            # the bin changes again during the refresh
+            refresh_continuous_aggregate.side_effect = (
+                lambda *args: MeasurementDirtyBin.objects.create(
+                    timestamp_bin=datetime(2022, 1, 1, tzinfo=timezone.utc)
+                )
+            )
+            assert refresh_dirty_measurement_summaries() == 3
+        assert MeasurementDirtyBin.objects.count() == 6
+
+        with patch("timeseries.helpers._refresh_continuous_aggregate"):
+            assert refresh_dirty_measurement_summaries() == 3
+        assert MeasurementDirtyBin.objects.count() == 0
+
+        assert refresh_dirty_measurement_summaries() == 0
+
+
 @pytest.mark.skipif(
     not settings.TIMESERIES_ENABLED, reason="requires timeseries data storage"
 )
@@ -381,6 +526,88 @@ class FillSparseMeasurementsTest(TransactionTestCase):
     def test_fill_sparse_measurements_no_measurements(self):
         assert fill_sparse_measurements([], Interval.INTERVAL_1_DAY, None, None) == []
 
+    def test_fill_sparse_measurements_max_points(self):
+        measurements = [
+            {
+                "timestamp_bin": datetime(2022, 1, day, 0, 0, tzinfo=timezone.utc),
+                "avg": avg,
+                "min": avg,
+                "max": avg,
+            }
+            for day, avg in [(1, 80.0), (2, 90.0), (4, 70.0), (5, 75.0), (6, 76.0)]
+        ]
+
+        # there are less intervals than `max_points`
+        assert (
+            len(
+                fill_sparse_measurements(
+                    measurements,
+                    Interval.INTERVAL_1_DAY,
+                    start_date=datetime(2022, 1, 1, 0, 0, tzinfo=timezone.utc),
+                    end_date=datetime(2022, 1, 7, 0, 0, tzinfo=timezone.utc),
+                    max_points=10,
+                )
+            )
+            == 7
+        )
+
+        # the empty intervals are dropped
+        assert (
+            fill_sparse_measurements(
+                measurements,
+                Interval.INTERVAL_1_DAY,
+                start_date=datetime(2022, 1, 1, 0, 0, tzinfo=timezone.utc),
+                end_date=datetime(2022, 1, 7, 0, 0, tzinfo=timezone.utc),
+                max_points=5,
+            )
+            == measurements
+        )
+
+        # downsampled keeping the first, the last and the extreme values
+        assert fill_sparse_measurements(
+            measurements,
+            Interval.INTERVAL_1_DAY,
+            start_date=datetime(2022, 1, 1, 0, 0, tzinfo=timezone.utc),
+            end_date=datetime(2022, 1, 7, 0, 0, tzinfo=timezone.utc),
+            max_points=4,
+        ) == [measurements[0], measurements[1], measurements[2], measurements[4]]
+
+        # at least the first and the last
+        for max_points in [-1, 0, 1, 2]:
+            assert fill_sparse_measurements(
+                measurements,
+                Interval.INTERVAL_1_DAY,
+                start_date=datetime(2022, 1, 1, 0, 0, tzinfo=timezone.utc),
+                end_date=datetime(2022, 1, 7, 0, 0, tzinfo=timezone.utc),
+                max_points=max_points,
+            ) == [measurements[0], measurements[4]]
+
+
+class TestLttbDownsample:
+    def test_keeps_all_points(self):
+        x = np.arange(5.0)
+        assert lttb_downsample(x, x, 5).tolist() == [0, 1, 2, 3, 4]
+        assert lttb_downsample(x, x, 10).tolist() == [0, 1, 2, 3, 4]
+
+    def test_first_and_last(self):
+        x = np.arange(5.0)
+        assert lttb_downsample(x, x, 2).tolist() == [0, 4]
+        with pytest.raises(ValueError):
+            lttb_downsample(x, x, 1)
+
+    def test_preserves_peaks(self):
+        x = np.arange(9.0)
+        y = np.array([0.0, 0.0, 10.0, 0.0, 0.0, 0.0, -10.0, 0.0, 0.0])
+        assert lttb_downsample(x, y, 4).tolist() == [0, 2, 6, 8]
+
+    def test_bounded(self):
+        x = np.arange(1000.0)
+        indices = lttb_downsample(x, np.sin(x / 50), 50)
+        assert len(indices) == 50
+        assert indices[0] == 0
+        assert indices[-1] == 999
+        assert (np.diff(indices) > 0).all()
+
 
 @pytest.mark.skipif(
     not settings.TIMESERIES_ENABLED, reason="requires timeseries data storage"
@@ -600,6 +827,61 @@ class RepositoryCoverageMeasurementsWithFallbackTest(TransactionTestCase):
             },
         ]
 
+    @override_settings(COMMIT_COVERAGE_ROLLUP_ENABLED=True)
+    @patch("timeseries.models.Dataset.is_backfilled")
+    def test_unbackfilled_dataset_from_rollup(self, is_backfilled):
+        is_backfilled.return_value = False
+
+        for commitid, branch, timestamp, coverage in [
+            ("commit0", "master", datetime(2021, 12, 1, 1, 0, 0), "70.00"),
+            ("commit1", "master", datetime(2022, 1, 1, 1, 0, 0), "80.00"),
+            ("commit2", "master", datetime(2022, 1, 1, 2, 0, 0), "85.00"),
+            ("commit3", "other", datetime(2022, 1, 1, 3, 0, 0), "90.00"),
+            ("commit4", "master", datetime(2022, 1, 2, 1, 0, 0), "80.00"),
+        ]:
+            CommitFactory(
+                commitid=commitid,
+                repository_id=self.repo.pk,
+                branch=branch,
+                timestamp=timestamp.replace(tzinfo=timezone.utc),
+                totals={"c": coverage},
+            )
+
+        DatasetFactory(
+            name=MeasurementName.COVERAGE.value,
+            repository_id=self.repo.pk,
+        )
+
+        res = repository_coverage_measurements_with_fallback(
+            self.repo,
+            Interval.INTERVAL_1_DAY,
+            start_date=datetime(2021, 12, 31, 0, 0, 0, tzinfo=timezone.utc),
+            end_date=datetime(2022, 1, 3, 0, 0, 0, tzinfo=timezone.utc),
+        )
+        assert list(res) == [
+            {
+                # older datapoint carried forward
+                "timestamp_bin": datetime(2021, 12, 1, 0, 0, 0, tzinfo=timezone.utc),
+                "avg": 70.0,
+                "min": 70.0,
+                "max": 70.0,
+            },
+            {
+                # aggregates over 2 commits on main branch (commit1, commit2)
+                "timestamp_bin": datetime(2022, 1, 1, 0, 0, 0, tzinfo=timezone.utc),
+                "avg": 82.5,
+                "min": 80.0,
+                "max": 85.0,
+            },
+            {
+                # aggregates over 1 commit (commit4)
+                "timestamp_bin": datetime(2022, 1, 2, 0, 0, 0, tzinfo=timezone.utc),
+                "avg": 80.0,
+                "min": 80.0,
+                "max": 80.0,
+            },
+        ]
+
     @patch("timeseries.models.Dataset.is_backfilled")
     def test_unbackfilled_dataset_no_start_end_dates(self, is_backfilled):
         is_backfilled.return_value = False
@@ -663,6 +945,68 @@ class RepositoryCoverageMeasurementsWithFallbackTest(TransactionTestCase):
             },
         ]
 
+    @freeze_time("2022-01-10T00:20:00")
+    def test_partially_backfilled_dataset(self):
+        CommitFactory(
+            commitid="commit1",
+            repository_id=self.repo.pk,
+            branch="master",
+            timestamp=datetime(2021, 10, 4, 1, 0, 0, 0, tzinfo=timezone.utc),
+            totals={"c": "80.00"},
+        )
+        CommitFactory(
+            commitid="commit2",
+            repository_id=self.repo.pk,
+            branch="master",
+            timestamp=datetime(2022, 1, 2, 1, 0, 0, 0, tzinfo=timezone.utc),
+            totals={"c": "80.00"},
+        )
+        # not measured yet
+        CommitFactory(
+            commitid="commit3",
+            repository_id=self.repo.pk,
+            branch="master",
+            timestamp=datetime(2021, 10, 4, 2, 0, 0, 0, tzinfo=timezone.utc),
+            totals={"c": "80.00"},
+        )
+        for commit_sha, timestamp, value in [
+            # in the window that is not backfilled yet
+            ("commit1", datetime(2021, 10, 4, 1, 0, 0), 10.0),
+            ("commit2", datetime(2022, 1, 2, 1, 0, 0), 90.0),
+        ]:
+            MeasurementFactory(
+                name=MeasurementName.COVERAGE.value,
+                owner_id=self.repo.author_id,
+                repo_id=self.repo.pk,
+                measurable_id=str(self.repo.pk),
+                timestamp=timestamp,
+                value=value,
+                branch="master",
+                commit_sha=commit_sha,
+            )
+
+        # the 2021-10-05 - 2022-01-03 window is backfilled
+        DatasetFactory(
+            name=MeasurementName.COVERAGE.value,
+            repository_id=self.repo.pk,
+            backfill_start_date=datetime(2021, 6, 1),
+            backfill_end_date=datetime(2022, 1, 3),
+            backfill_enqueued_at=datetime(2022, 1, 10),
+        )
+
+        res = repository_coverage_measurements_with_fallback(
+            self.repo,
+            Interval.INTERVAL_1_DAY,
+            start_date=datetime(2021, 10, 1, 0, 0, 0, tzinfo=timezone.utc),
+            end_date=datetime(2022, 1, 3, 0, 0, 0, tzinfo=timezone.utc),
+        )
+        assert [(m["timestamp_bin"], m["avg"]) for m in res] == [
+            # from the primary database
+            (datetime(2021, 10, 4, 0, 0, 0, tzinfo=timezone.utc), 80.0),
+            # from timescale
+            (datetime(2022, 1, 2, 0, 0, 0, tzinfo=timezone.utc), 90.0),
+        ]
+
     @patch("timeseries.helpers.trigger_backfill")
     def test_no_dataset(self, trigger_backfill):
         CommitFactory(
@@ -729,6 +1073,139 @@ class RepositoryCoverageMeasurementsWithFallbackTest(TransactionTestCase):
         trigger_backfill.assert_called_once_with(dataset)
 
 
+@pytest.mark.skipif(
+    not settings.TIMESERIES_ENABLED, reason="requires timeseries data storage"
+)
+# the cache blocks of 1 day bins around that time start on 2021-12-08, 2022-01-07
+# and 2022-02-06 (which is still open)
+@freeze_time("2022-02-10T12:00:00")
+@patch("timeseries.helpers.get_redis_connection")
+class CachedRepositoryCoverageMeasurementsTest(TransactionTestCase):
+    databases = {"default", "timeseries"}
+
+    def setUp(self):
+        self.repo = RepositoryFactory(branch="master")
+        for day, value in [(1, 80.0), (5, 85.0), (10, 90.0)]:
+            self._measurement(datetime(2022, 1, day, 1, 0, 0), value)
+
+    def _measurement(self, timestamp, value):
+        MeasurementFactory(
+            name=MeasurementName.COVERAGE.value,
+            owner_id=self.repo.author_id,
+            repo_id=self.repo.pk,
+            measurable_id=str(self.repo.pk),
+            timestamp=timestamp,
+            value=value,
+            branch="master",
+        )
+
+    def _measurements(self, **kwargs):
+        return [
+            (m["timestamp_bin"], m["avg"])
+            for m in cached_repository_coverage_measurements(
+                self.repo, Interval.INTERVAL_1_DAY, **kwargs
+            )
+        ]
+
+    def test_same_as_coverage_measurements(self, get_redis_connection):
+        get_redis_connection.return_value = fakeredis.FakeStrictRedis()
+
+        start_date = datetime(2022, 1, 2, 12, 0, 0, tzinfo=timezone.utc)
+        end_date = datetime(2022, 1, 10, 12, 0, 0, tzinfo=timezone.utc)
+        expected = [
+            (m["timestamp_bin"], m["avg"])
+            for m in coverage_measurements(
+                Interval.INTERVAL_1_DAY,
+                start_date=start_date,
+                end_date=end_date,
+                owner_id=self.repo.author_id,
+                repo_id=self.repo.pk,
+                measurable_id=str(self.repo.pk),
+                branch="master",
+            )
+        ]
+        assert expected == [
+            (datetime(2022, 1, 1, tzinfo=timezone.utc), 80.0),
+            (datetime(2022, 1, 5, tzinfo=timezone.utc), 85.0),
+            (datetime(2022, 1, 10, tzinfo=timezone.utc), 90.0),
+        ]
+
+        assert self._measurements(start_date=start_date, end_date=end_date) == expected
+        # served from the cache
+        assert self._measurements(start_date=start_date, end_date=end_date) == expected
+        assert self._measurements(end_date=end_date) == expected
+        assert self._measurements() == expected
+
+    def test_only_open_bins_are_queried(self, get_redis_connection):
+        get_redis_connection.return_value = fakeredis.FakeStrictRedis()
+
+        start_date = datetime(2022, 1, 2, 0, 0, 0, tzinfo=timezone.utc)
+        self._measurements(start_date=start_date)
+
+        self._measurement(datetime(2022, 1, 6, 1, 0, 0), 70.0)
+        self._measurement(datetime(2022, 1, 10, 2, 0, 0), 100.0)
+        self._measurement(datetime(2022, 2, 7, 1, 0, 0), 60.0)
+        assert self._measurements(start_date=start_date) == [
+            (datetime(2022, 1, 1, tzinfo=timezone.utc), 80.0),
+            # the closed blocks are cached
+            (datetime(2022, 1, 5, tzinfo=timezone.utc), 85.0),
+            (datetime(2022, 1, 10, tzinfo=timezone.utc), 90.0),
+            # the open block is queried
+            (datetime(2022, 2, 7, tzinfo=timezone.utc), 60.0),
+        ]
+
+    def test_cached_per_block(self, get_redis_connection):
+        redis = fakeredis.FakeStrictRedis()
+        get_redis_connection.return_value = redis
+
+        self._measurements(
+            start_date=datetime(2022, 1, 2, tzinfo=timezone.utc),
+            end_date=datetime(2022, 1, 5, tzinfo=timezone.utc),
+        )
+        self._measurements(start_date=datetime(2022, 1, 8, tzinfo=timezone.utc))
+        self._measurements()
+
+        keys = sorted(key.decode() for key in redis.keys())
+        assert keys == [
+            f"timeseries/coverage/{self.repo.pk}/INTERVAL_1_DAY/2021-12-08T00:00:00+00:00/master",
+            f"timeseries/coverage/{self.repo.pk}/INTERVAL_1_DAY/2022-01-07T00:00:00+00:00/master",
+        ]
+        for key in keys:
+            assert 0 < redis.ttl(key) <= settings.TIMESERIES_MEASUREMENTS_CACHE_TTL
+
+    def test_open_bins(self, get_redis_connection):
+        redis = fakeredis.FakeStrictRedis()
+        get_redis_connection.return_value = redis
+
+        assert self._measurements(
+            start_date=datetime(2022, 2, 7, 12, 0, 0, tzinfo=timezone.utc)
+        ) == [
+            (datetime(2022, 1, 10, tzinfo=timezone.utc), 90.0),
+        ]
+        assert redis.keys() == []
+
+    @override_settings(TIMESERIES_MEASUREMENTS_CACHE_ENABLED=True)
+    @patch("timeseries.models.Dataset.is_backfilled")
+    def test_with_fallback(self, is_backfilled, get_redis_connection):
+        is_backfilled.return_value = True
+        get_redis_connection.return_value = fakeredis.FakeStrictRedis()
+        DatasetFactory(
+            name=MeasurementName.COVERAGE.value,
+            repository_id=self.repo.pk,
+        )
+
+        res = repository_coverage_measurements_with_fallback(
+            self.repo,
+            Interval.INTERVAL_1_DAY,
+            start_date=datetime(2022, 1, 5, tzinfo=timezone.utc),
+        )
+        assert [(m["timestamp_bin"], m["avg"]) for m in res] == [
+            (datetime(2022, 1, 1, tzinfo=timezone.utc), 80.0),
+            (datetime(2022, 1, 5, tzinfo=timezone.utc), 85.0),
+            (datetime(2022, 1, 10, tzinfo=timezone.utc), 90.0),
+        ]
+
+
 @pytest.mark.skipif(
     not settings.TIMESERIES_ENABLED, reason="requires timeseries data storage"
 )
@@ -882,6 +1359,153 @@ class OwnerCoverageMeasurementsWithFallbackTest(TransactionTestCase):
             },
         ]
 
+    @override_settings(TIMESERIES_OWNER_MEASUREMENTS_ENABLED=True)
+    @patch("timeseries.models.Dataset.is_backfilled")
+    def test_backfilled_datasets_owner_measurements(self, is_backfilled):
+        is_backfilled.return_value = True
+
+        for repo, timestamp, value in [
+            (self.repo1, datetime(2022, 1, 1, 1, 0, 0), 80.0),
+            (self.repo1, datetime(2022, 1, 1, 2, 0, 0), 85.0),
+            (self.repo2, datetime(2022, 1, 2, 1, 0, 0), 90.0),
+        ]:
+            MeasurementFactory(
+                name=MeasurementName.OWNER_COVERAGE.value,
+                owner_id=self.owner.pk,
+                repo_id=repo.pk,
+                measurable_id=str(self.owner.pk),
+                timestamp=timestamp,
+                value=value,
+                branch="master",
+                commit_sha=f"commit-{value}",
+            )
+        # repo-level measurement (not used)
+        MeasurementFactory(
+            name=MeasurementName.COVERAGE.value,
+            owner_id=self.owner.pk,
+            repo_id=self.repo1.pk,
+            measurable_id=str(self.repo1.pk),
+            timestamp=datetime(2022, 1, 1, 1, 0, 0),
+            value=10.0,
+            branch="master",
+            commit_sha="commit1",
+        )
+
+        DatasetFactory(
+            name=MeasurementName.COVERAGE.value,
+            repository_id=self.repo1.pk,
+        )
+        DatasetFactory(
+            name=MeasurementName.COVERAGE.value,
+            repository_id=self.repo2.pk,
+        )
+        for repo in [self.repo1, self.repo2]:
+            DatasetFactory(
+                name=MeasurementName.OWNER_COVERAGE.value,
+                repository_id=repo.pk,
+            )
+
+        res = owner_coverage_measurements_with_fallback(
+            owner=self.owner,
+            repo_ids=[self.repo1.pk, self.repo2.pk],
+            interval=Interval.INTERVAL_1_DAY,
+            start_date=datetime(2021, 12, 31, 0, 0, 0, tzinfo=timezone.utc),
+            end_date=datetime(2022, 1, 3, 0, 0, 0, tzinfo=timezone.utc),
+        )
+        assert list(res) == [
+            {
+                "timestamp_bin": datetime(2022, 1, 1, 0, 0, tzinfo=timezone.utc),
+                "avg": 82.5,
+                "min": 80.0,
+                "max": 85.0,
+            },
+            {
+                "timestamp_bin": datetime(2022, 1, 2, 0, 0, tzinfo=timezone.utc),
+                "avg": 90.0,
+                "min": 90.0,
+                "max": 90.0,
+            },
+        ]
+
+        # a subset of the owner's repos is charted from their own measurements
+        res = owner_coverage_measurements_with_fallback(
+            owner=self.owner,
+            repo_ids=[self.repo1.pk],
+            interval=Interval.INTERVAL_1_DAY,
+            start_date=datetime(2021, 12, 31, 0, 0, 0, tzinfo=timezone.utc),
+            end_date=datetime(2022, 1, 3, 0, 0, 0, tzinfo=timezone.utc),
+        )
+        assert list(res) == [
+            {
+                "timestamp_bin": datetime(2022, 1, 1, 0, 0, tzinfo=timezone.utc),
+                "avg": 10.0,
+                "min": 10.0,
+                "max": 10.0,
+            },
+        ]
+
+    @override_settings(TIMESERIES_OWNER_MEASUREMENTS_ENABLED=True)
+    @patch("timeseries.helpers.trigger_backfill")
+    @patch("timeseries.models.Dataset.is_backfilled")
+    def test_backfilled_datasets_owner_measurements_not_backfilled(
+        self, is_backfilled, trigger_backfill
+    ):
+        is_backfilled.return_value = True
+
+        # owner-level measurement (not backfilled yet)
+        MeasurementFactory(
+            name=MeasurementName.OWNER_COVERAGE.value,
+            owner_id=self.owner.pk,
+            repo_id=self.repo1.pk,
+            measurable_id=str(self.owner.pk),
+            timestamp=datetime(2022, 1, 1, 1, 0, 0),
+            value=90.0,
+            branch="master",
+            commit_sha="commit1",
+        )
+        MeasurementFactory(
+            name=MeasurementName.COVERAGE.value,
+            owner_id=self.owner.pk,
+            repo_id=self.repo1.pk,
+            measurable_id=str(self.repo1.pk),
+            timestamp=datetime(2022, 1, 1, 1, 0, 0),
+            value=10.0,
+            branch="master",
+            commit_sha="commit1",
+        )
+
+        for repo in [self.repo1, self.repo2]:
+            DatasetFactory(
+                name=MeasurementName.COVERAGE.value,
+                repository_id=repo.pk,
+            )
+        DatasetFactory(
+            name=MeasurementName.OWNER_COVERAGE.value,
+            repository_id=self.repo1.pk,
+        )
+
+        res = owner_coverage_measurements_with_fallback(
+            owner=self.owner,
+            repo_ids=[self.repo1.pk, self.repo2.pk],
+            interval=Interval.INTERVAL_1_DAY,
+            start_date=datetime(2021, 12, 31, 0, 0, 0, tzinfo=timezone.utc),
+            end_date=datetime(2022, 1, 3, 0, 0, 0, tzinfo=timezone.utc),
+        )
+        assert list(res) == [
+            {
+                "timestamp_bin": datetime(2022, 1, 1, 0, 0, tzinfo=timezone.utc),
+                "avg": 10.0,
+                "min": 10.0,
+                "max": 10.0,
+            },
+        ]
+
+        dataset = Dataset.objects.get(
+            name=MeasurementName.OWNER_COVERAGE.value,
+            repository_id=self.repo2.pk,
+        )
+        trigger_backfill.assert_called_once_with(dataset)
+
     @patch("timeseries.models.Dataset.is_backfilled")
     def test_unbackfilled_dataset(self, is_backfilled):
         is_backfilled.return_value = False
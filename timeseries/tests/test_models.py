@@ -5,6 +5,13 @@ from django.conf import settings
 from django.test import TransactionTestCase
 from freezegun import freeze_time
 
+from core.tests.factories import CommitFactory, RepositoryFactory
+from reports.tests.factories import (
+    CommitReportFactory,
+    RepositoryFlagFactory,
+    UploadFactory,
+    UploadFlagMembershipFactory,
+)
 from timeseries.models import Dataset, Interval, MeasurementName, MeasurementSummary
 
 from .factories import DatasetFactory, MeasurementFactory
@@ -99,7 +106,7 @@ class MeasurementTests(TransactionTestCase):
     not settings.TIMESERIES_ENABLED, reason="requires timeseries data storage"
 )
 class DatasetTests(TransactionTestCase):
-    databases = {"timeseries"}
+    databases = {"default", "timeseries"}
 
     @freeze_time("2022-01-01T01:00:01+0000")
     def test_is_backfilled_true(self):
@@ -130,3 +137,175 @@ class DatasetTests(TransactionTestCase):
 
         dataset.refresh_from_db()
         assert dataset.is_backfilled() == False
+
+    def test_backfill_windows(self):
+        dataset = DatasetFactory(
+            backfill_start_date=datetime(2021, 10, 1),
+            backfill_end_date=datetime(2022, 6, 1),
+        )
+        assert dataset.backfill_windows() == [
+            (datetime(2022, 3, 3), datetime(2022, 6, 1)),
+            (datetime(2021, 12, 3), datetime(2022, 3, 3)),
+            (datetime(2021, 10, 1), datetime(2021, 12, 3)),
+        ]
+
+    def test_backfill_windows_not_backfilled(self):
+        dataset = DatasetFactory()
+        assert dataset.backfill_windows() == []
+
+    @freeze_time("2022-06-01T12:30:00")
+    def test_backfilled_since(self):
+        repo = RepositoryFactory()
+        dataset = DatasetFactory(
+            name=MeasurementName.COVERAGE.value,
+            repository_id=repo.pk,
+            backfill_start_date=datetime(2021, 10, 1),
+            backfill_end_date=datetime(2022, 6, 1),
+            backfill_enqueued_at=datetime(2022, 6, 1, 12, 0, 0),
+        )
+
+        # one commit in each window, oldest window first
+        commits = [
+            CommitFactory(
+                repository=repo,
+                timestamp=timestamp,
+                totals={"c": "80.00"},
+            )
+            for timestamp in [
+                datetime(2021, 11, 1),
+                datetime(2022, 1, 1),
+                datetime(2022, 4, 1),
+            ]
+        ]
+
+        def measure(commit):
+            MeasurementFactory(
+                name=MeasurementName.COVERAGE.value,
+                owner_id=repo.author_id,
+                repo_id=repo.pk,
+                measurable_id=str(repo.pk),
+                commit_sha=commit.commitid,
+                timestamp=commit.timestamp.replace(tzinfo=timezone.utc),
+            )
+
+        assert dataset.backfilled_since() is None
+        assert dataset.is_backfilled() == False
+
+        # an older window being done doesn't matter until the newer ones are
+        measure(commits[1])
+        assert dataset.backfilled_since() is None
+
+        measure(commits[2])
+        assert dataset.backfilled_since() == datetime(2021, 12, 3)
+        assert dataset.is_backfilled() == False
+
+        measure(commits[0])
+        assert dataset.backfilled_since() == datetime(2021, 10, 1)
+        assert dataset.is_backfilled() == True
+
+        dataset.refresh_from_db()
+        assert dataset.backfill_done_start_date == datetime(2021, 10, 1)
+        assert dataset.backfilled == True
+
+    @freeze_time("2022-06-01T12:30:00")
+    def test_backfilled_since_partially_measured_window(self):
+        repo = RepositoryFactory()
+        dataset = DatasetFactory(
+            name=MeasurementName.COVERAGE.value,
+            repository_id=repo.pk,
+            backfill_start_date=datetime(2022, 3, 3),
+            backfill_end_date=datetime(2022, 6, 1),
+            backfill_enqueued_at=datetime(2022, 6, 1, 12, 0, 0),
+        )
+        commit = CommitFactory(
+            repository=repo,
+            timestamp=datetime(2022, 4, 1),
+            totals={"c": "80.00"},
+        )
+        CommitFactory(
+            repository=repo,
+            timestamp=datetime(2022, 4, 2),
+            totals={"c": "80.00"},
+        )
+        MeasurementFactory(
+            name=MeasurementName.COVERAGE.value,
+            owner_id=repo.author_id,
+            repo_id=repo.pk,
+            measurable_id=str(repo.pk),
+            commit_sha=commit.commitid,
+            timestamp=datetime(2022, 4, 1, tzinfo=timezone.utc),
+        )
+
+        assert dataset.backfilled_since() is None
+        assert dataset.is_backfilled() == False
+
+        # the window is given up on once its timeout has passed
+        with freeze_time("2022-06-01T13:00:01"):
+            assert dataset.backfilled_since() == datetime(2022, 3, 3)
+            assert dataset.is_backfilled() == True
+
+    @freeze_time("2022-06-01T12:30:00")
+    def test_backfilled_since_flag_coverage(self):
+        repo = RepositoryFactory()
+        dataset = DatasetFactory(
+            name=MeasurementName.FLAG_COVERAGE.value,
+            repository_id=repo.pk,
+            backfill_start_date=datetime(2022, 3, 3),
+            backfill_end_date=datetime(2022, 6, 1),
+            backfill_enqueued_at=datetime(2022, 6, 1, 12, 0, 0),
+        )
+        # commits without flagged uploads have no flag measurements
+        CommitFactory(
+            repository=repo,
+            timestamp=datetime(2022, 4, 1),
+            totals={"c": "80.00"},
+        )
+        assert dataset.backfilled_since() == datetime(2022, 3, 3)
+
+        dataset = DatasetFactory(
+            name=MeasurementName.FLAG_COVERAGE.value,
+            repository_id=repo.pk,
+            backfill_start_date=datetime(2022, 3, 3),
+            backfill_end_date=datetime(2022, 6, 1),
+            backfill_enqueued_at=datetime(2022, 6, 1, 12, 0, 0),
+        )
+        flagged_commit = CommitFactory(
+            repository=repo,
+            timestamp=datetime(2022, 4, 2),
+            totals={"c": "80.00"},
+        )
+        UploadFlagMembershipFactory(
+            report_session=UploadFactory(
+                report=CommitReportFactory(commit=flagged_commit)
+            ),
+            flag=RepositoryFlagFactory(repository=repo),
+        )
+        assert dataset.backfilled_since() is None
+
+        MeasurementFactory(
+            name=MeasurementName.FLAG_COVERAGE.value,
+            owner_id=repo.author_id,
+            repo_id=repo.pk,
+            measurable_id="1",
+            commit_sha=flagged_commit.commitid,
+            timestamp=datetime(2022, 4, 2, tzinfo=timezone.utc),
+        )
+        assert dataset.backfilled_since() == datetime(2022, 3, 3)
+
+    @freeze_time("2022-01-01T01:00:01+0000")
+    def test_backfilled_since_without_windows(self):
+        dataset = DatasetFactory()
+
+        Dataset.objects.filter(pk=dataset.pk).update(
+            created_at=datetime(2022, 1, 1, 0, 0, 0)
+        )
+
+        dataset.refresh_from_db()
+        assert dataset.backfilled_since() == datetime.min
+
+        Dataset.objects.filter(pk=dataset.pk).update(
+            created_at=datetime(2022, 1, 1, 0, 30, 0)
+        )
+
+        dataset.refresh_from_db()
+        assert dataset.backfilled_since() is None
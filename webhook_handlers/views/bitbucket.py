@@ -7,6 +7,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from shared.helpers.yaml import walk
 
+import services.response_cache as response_cache
 from codecov_auth.models import Owner
 from core.models import Branch, Commit, Pull, PullStates, Repository
 from services.task import TaskService
@@ -73,6 +74,7 @@ class BitbucketWebhookHandler(APIView):
             repository__repoid=repo.repoid,
             pullid=self.request.data["pullrequest"]["id"],
         ).update(state=state)
+        response_cache.invalidate(response_cache.repository_tag(repo.repoid))
 
         return Response()
 
@@ -82,6 +84,7 @@ class BitbucketWebhookHandler(APIView):
                 # when a branch is deleted, new is null
                 branch_name = change["old"]["name"]
                 Branch.objects.filter(repository=repo, name=branch_name).delete()
+                response_cache.invalidate(response_cache.repository_tag(repo.repoid))
 
         for change in self.request.data["push"]["changes"]:
             if change["new"]:
@@ -7,6 +7,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from shared.helpers.yaml import walk
 
+import services.response_cache as response_cache
 from codecov_auth.models import Owner
 from core.models import Branch, Commit, Pull, PullStates, Repository
 from services.task import TaskService
@@ -75,6 +76,7 @@ class BitbucketServerWebhookHandler(APIView):
             repository__repoid=repo.repoid,
             pullid=self.request.data["pullRequest"]["id"],
         ).update(state=state)
+        response_cache.invalidate(response_cache.repository_tag(repo.repoid))
 
         return Response()
 
@@ -85,6 +87,7 @@ class BitbucketServerWebhookHandler(APIView):
                 repository=repo,
                 name=self.request.data["push"]["changes"]["old"]["name"],
             ).delete()
+            response_cache.invalidate(response_cache.repository_tag(repo.repoid))
         if self.request.data["push"]["changes"]["new"]:
             return Response(data="Synchronize codecov.yml skipped")
         return Response()
@@ -12,6 +12,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from shared.metrics import metrics
 
+import services.response_cache as response_cache
 from codecov_auth.models import Owner
 from core.models import Branch, Commit, Pull, Repository
 from services.archive import ArchiveService
@@ -208,6 +209,7 @@ class GithubWebhookHandler(APIView):
         Branch.objects.filter(
             repository=self._get_repo(request), name=branch_name
         ).delete()
+        response_cache.invalidate(response_cache.repository_tag(repo.repoid))
         log.info(
             f"Branch '{branch_name}' deleted",
             extra=dict(repoid=repo.repoid, github_webhook_event=self.event),
@@ -270,6 +272,8 @@ class GithubWebhookHandler(APIView):
                 ),
             )
 
+        response_cache.invalidate(response_cache.repository_tag(repo.repoid))
+
         log.info(
             f"Branch name updated for commits to {branch_name}",
             extra=dict(
@@ -388,6 +392,7 @@ class GithubWebhookHandler(APIView):
             Pull.objects.filter(repository=repo, pullid=pullid).update(
                 title=request.data.get("pull_request", {}).get("title")
             )
+            response_cache.invalidate(response_cache.repository_tag(repo.repoid))
 
         return Response()
 
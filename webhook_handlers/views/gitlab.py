@@ -9,6 +9,7 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+import services.response_cache as response_cache
 from codecov_auth.models import Owner
 from core.models import Branch, Commit, Pull, PullStates, Repository
 from services.task import TaskService
@@ -111,6 +112,7 @@ class GitLabWebhookHandler(APIView):
             Pull.objects.filter(repository__repoid=repoid, pullid=pull["iid"]).update(
                 state=PullStates.CLOSED
             )
+            response_cache.invalidate(response_cache.repository_tag(repoid))
             message = "Pull request closed"
 
         elif action == "merge":